@@ -0,0 +1,48 @@
+# Arquivo: apps/matching/admin.py
+
+from django.contrib import admin
+from .models import (
+    EmbeddingCandidato, EmbeddingSecao, EmbeddingSkill, EmbeddingVaga, RecomendacoesCandidato, VersaoModelo,
+)
+
+@admin.register(EmbeddingCandidato)
+class EmbeddingCandidatoAdmin(admin.ModelAdmin):
+    list_display = ('candidato', 'modelo', 'hash_texto', 'desatualizado', 'atualizado_em')
+    list_filter = ('modelo', 'desatualizado')
+    raw_id_fields = ('candidato',)
+    exclude = ('vetor',) # Bytes crus não são editáveis no admin
+
+@admin.register(EmbeddingVaga)
+class EmbeddingVagaAdmin(admin.ModelAdmin):
+    list_display = ('vaga', 'modelo', 'hash_texto', 'desatualizado', 'atualizado_em')
+    list_filter = ('modelo', 'desatualizado')
+    raw_id_fields = ('vaga',)
+    exclude = ('vetor',)
+
+@admin.register(EmbeddingSecao)
+class EmbeddingSecaoAdmin(admin.ModelAdmin):
+    list_display = ('candidato', 'chave', 'modelo', 'hash_texto', 'atualizado_em')
+    list_filter = ('modelo',)
+    raw_id_fields = ('candidato',)
+    exclude = ('vetor',)
+
+@admin.register(EmbeddingSkill)
+class EmbeddingSkillAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'modelo', 'criado_em')
+    list_filter = ('modelo',)
+    search_fields = ('nome',)
+    exclude = ('vetor',)
+
+@admin.register(RecomendacoesCandidato)
+class RecomendacoesCandidatoAdmin(admin.ModelAdmin):
+    list_display = ('candidato', 'modelo', 'calculado_em')
+    list_filter = ('modelo',)
+    raw_id_fields = ('candidato',)
+    readonly_fields = ('vagas', 'carimbo_vagas') # Recalculado pelo atualizador
+
+@admin.register(VersaoModelo)
+class VersaoModeloAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'status', 'criado_em', 'ativado_em')
+    list_filter = ('status',)
+    # A troca de modelo passa pela checagem de cobertura: `manage.py modelo_embeddings ativar`
+    readonly_fields = ('status', 'ativado_em')
@@ -0,0 +1,351 @@
+# Arquivo: apps/matching/ann.py
+#
+# Índice aproximado (ANN) dos embeddings de candidatos, no formato IVF:
+#   1. Os vetores são agrupados em `n_listas` grupos com k-means (centróides).
+#   2. Na busca, só os `n_sondas` grupos mais próximos da vaga são pontuados.
+# Assim o Radar olha uma fração do banco em vez de todos os candidatos.
+# Tudo em NumPy puro: roda em CPU, dentro do próprio worker, sem dependência nova.
+
+import datetime
+import os
+import threading
+
+import numpy as np
+
+from .compartilhada import ler_linhas
+from .models import EmbeddingCandidato
+from .quantizacao import desquantizar_matriz, produto_matriz_vetor, quantizar_matriz
+
+
+# Linhas sorteadas (do índice inteiro) para estimar quantos candidatos das listas NÃO
+# visitadas passam do limiar: o total do Radar sem pontuar o banco todo
+AMOSTRA_TOTAL = 2048
+
+
+class IndiceIVF:
+    """
+    Índice IVF (Inverted File) com produto escalar (vetores normalizados).
+    Cada lista guarda os vetores em int8 + 1 escala por linha (1/4 da memória do float32).
+    Suporta inserção/remoção incremental (em lote) e reconstrução completa.
+    """
+
+    def __init__(self, n_listas=None, n_sondas=8):
+        self.n_listas = n_listas
+        self.n_sondas = n_sondas
+        self.centroides = None
+        # Uma tupla (ids, códigos int8, escalas) por lista, sempre trocada inteira:
+        # uma busca em outra thread nunca vê ids e vetores de versões diferentes
+        self._listas = []
+        self._lista_de = {}  # candidato_id -> índice da lista onde está
+        self.total_construcao = 0
+        self.insercoes = 0
+        self.remocoes = 0
+        self._amostra = None  # (vetores, lista de cada linha), ver _preparar_amostra
+        # Última `atualizado_em` já refletida no índice (para as inserções incrementais)
+        self.sincronizado_ate = None
+
+    def __len__(self):
+        return len(self._lista_de)
+
+    # --- CONSTRUÇÃO ---
+
+    def construir(self, ids, matriz, escalas=None, n_iter=10, max_treino=50000, semente=42, bloco=8192):
+        """
+        Treina os centróides (k-means esférico) e distribui todos os vetores.
+        `matriz` pode vir compacta (int8/float16 + escalas, como a da MatrizCandidatos):
+        só a amostra de treino e um bloco por vez viram float32.
+        Pensado para rodar offline (manage.py construir_indice_ann).
+        """
+        total = matriz.shape[0]
+        if total == 0:
+            raise ValueError("Não há vetores para construir o índice.")
+
+        # Regra de bolso: ~sqrt(N) listas
+        n_listas = self.n_listas or max(1, int(np.sqrt(total)))
+        n_listas = min(n_listas, total)
+        rng = np.random.default_rng(semente)
+
+        # Treina em uma amostra para limitar tempo e memória
+        linhas = np.sort(rng.choice(total, max_treino, replace=False)) if total > max_treino else slice(None)
+        treino = desquantizar_matriz(matriz[linhas], None if escalas is None else escalas[linhas])
+
+        centroides = treino[rng.choice(treino.shape[0], n_listas, replace=False)].copy()
+        for _ in range(n_iter):
+            grupos = np.argmax(treino @ centroides.T, axis=1)
+            for g in range(n_listas):
+                membros = treino[grupos == g]
+                if len(membros):
+                    c = membros.sum(axis=0)
+                    centroides[g] = c / (np.linalg.norm(c) or 1.0)
+
+        self.centroides = centroides
+        self.n_listas = n_listas
+        grupos = np.empty(total, dtype=np.int64)
+        codigos = np.empty(matriz.shape, dtype=np.int8)
+        escalas_i8 = np.empty(total, dtype=np.float32)
+        for inicio in range(0, total, bloco):
+            fatia = slice(inicio, inicio + bloco)
+            grupos[fatia], codigos[fatia], escalas_i8[fatia] = self._preparar_linhas(
+                matriz[fatia], None if escalas is None else escalas[fatia]
+            )
+
+        # Ordena por lista: cada lista é uma fatia contígua do mesmo array
+        ids = np.asarray(ids, dtype=np.int64)
+        ordem = np.argsort(grupos, kind='stable')
+        ids, codigos, escalas_i8, grupos = ids[ordem], codigos[ordem], escalas_i8[ordem], grupos[ordem]
+        limites = np.searchsorted(grupos, np.arange(n_listas + 1))
+        self._listas = [
+            (ids[a:b], codigos[a:b], escalas_i8[a:b]) for a, b in zip(limites[:-1], limites[1:])
+        ]
+        self._lista_de = dict(zip(ids.tolist(), grupos.tolist()))
+
+        self.total_construcao = total
+        self.insercoes = 0
+        self.remocoes = 0
+        self._amostra = None
+
+    def _preparar_linhas(self, matriz, escalas):
+        """
+        Para um bloco de vetores (compactos ou não): (lista mais próxima, códigos int8, escalas).
+        """
+        vetores = desquantizar_matriz(matriz, escalas)
+        grupos = np.argmax(vetores @ self.centroides.T, axis=1)
+        if matriz.dtype == np.int8 and escalas is not None:
+            return grupos, matriz, np.asarray(escalas, dtype=np.float32)
+        codigos, escalas_i8 = quantizar_matriz(vetores, 'i8')
+        return grupos, codigos, escalas_i8
+
+    # --- ATUALIZAÇÃO INCREMENTAL ---
+
+    def remover(self, candidato_id, contar=True):
+        self.remover_varios([candidato_id], contar=contar)
+
+    def remover_varios(self, candidato_ids, contar=True):
+        """
+        Tira vários candidatos: cada lista afetada é filtrada UMA vez para o lote todo.
+        """
+        por_lista = {}
+        for candidato_id in candidato_ids:
+            g = self._lista_de.pop(int(candidato_id), None)
+            if g is not None:
+                por_lista.setdefault(g, []).append(int(candidato_id))
+        for g, removidos in por_lista.items():
+            ids, codigos, escalas = self._listas[g]
+            manter = ~np.isin(ids, removidos)
+            self._listas[g] = (ids[manter], codigos[manter], escalas[manter])
+            if contar:
+                self.remocoes += len(removidos)
+
+    def inserir(self, candidato_id, vetor):
+        """
+        Insere (ou substitui) um candidato sem retreinar os centróides.
+        """
+        self.inserir_varios([candidato_id], np.asarray(vetor, dtype=np.float32)[None, :])
+
+    def inserir_varios(self, candidato_ids, matriz, escalas=None):
+        """
+        Insere (ou substitui) vários candidatos (ids sem repetição) sem retreinar os
+        centróides. Cada lista afetada é concatenada UMA vez para o lote todo.
+        `matriz` pode vir compacta (int8 + escalas), como a lida do banco.
+        """
+        candidato_ids = np.asarray(candidato_ids, dtype=np.int64)
+        if candidato_ids.size == 0:
+            return
+        self.remover_varios(candidato_ids.tolist(), contar=False)
+        grupos, codigos, escalas_i8 = self._preparar_linhas(matriz, escalas)
+        for g in np.unique(grupos).tolist():
+            novos = grupos == g
+            ids, codigos_lista, escalas_lista = self._listas[g]
+            self._listas[g] = (
+                np.concatenate([ids, candidato_ids[novos]]),
+                np.concatenate([codigos_lista, codigos[novos]]),
+                np.concatenate([escalas_lista, escalas_i8[novos]]),
+            )
+        self._lista_de.update(zip(candidato_ids.tolist(), grupos.tolist()))
+        self.insercoes += len(candidato_ids)
+
+    def ids(self):
+        return self._lista_de.keys()
+
+    def precisa_reconstruir(self, fracao=0.2):
+        """
+        Muitas inserções/remoções desde a construção deixam os centróides desbalanceados
+        (o recall cai sem aviso): hora de reconstruir. Chamado pela varredura do atualizador.
+        """
+        return self.insercoes + self.remocoes > fracao * max(self.total_construcao, 1)
+
+    # --- BUSCA ---
+
+    def _sondar(self, vetor, n_sondas):
+        n_sondas = min(n_sondas or self.n_sondas, self.n_listas)
+        proximos = np.argpartition(-(self.centroides @ vetor), n_sondas - 1)[:n_sondas]
+        listas = [self._listas[g] for g in proximos]
+        ids = np.concatenate([ids for ids, _, _ in listas])
+        if ids.size == 0:
+            return proximos, ids, np.empty(0, dtype=np.float32)
+        codigos = np.concatenate([codigos for _, codigos, _ in listas])
+        escalas = np.concatenate([escalas for _, _, escalas in listas])
+        return proximos, ids, produto_matriz_vetor(codigos, escalas, vetor)
+
+    @staticmethod
+    def _top(ids, scores, top_k):
+        if ids.size > top_k:
+            melhores = np.argpartition(-scores, top_k - 1)[:top_k]
+            ids, scores = ids[melhores], scores[melhores]
+        ordem = np.argsort(-scores, kind='stable')
+        return ids[ordem], scores[ordem]
+
+    def buscar(self, vetor, top_k=50, n_sondas=None):
+        """
+        Retorna (ids, scores) dos top_k candidatos mais parecidos, em ordem decrescente.
+        """
+        _, ids, scores = self._sondar(np.asarray(vetor, dtype=np.float32), n_sondas)
+        return self._top(ids, scores, top_k)
+
+    def buscar_com_total(self, vetor, top_k=50, limiar=20, n_sondas=None):
+        """
+        Igual ao buscar, mais o total ESTIMADO de candidatos com score (0 a 100) acima do limiar:
+        exato nas listas visitadas + estimativa por amostragem nas outras.
+        """
+        vetor = np.asarray(vetor, dtype=np.float32)
+        proximos, ids, scores = self._sondar(vetor, n_sondas)
+        total = int(np.count_nonzero(np.rint(np.maximum(scores, 0) * 100) > limiar))
+        total += self._estimar_fora(vetor, proximos, limiar)
+        ids, scores = self._top(ids, scores, top_k)
+        return ids, scores, total
+
+    def _tamanhos(self):
+        return np.array([len(ids) for ids, _, _ in self._listas], dtype=np.int64)
+
+    def _preparar_amostra(self, semente=42):
+        tamanhos = self._tamanhos()
+        listas = np.repeat(np.arange(self.n_listas), tamanhos)
+        if listas.size == 0:
+            return np.empty((0, self.centroides.shape[1]), np.float32), listas
+        linhas = np.sort(np.random.default_rng(semente).choice(
+            listas.size, min(AMOSTRA_TOTAL, listas.size), replace=False
+        ))
+        listas = listas[linhas]
+        posicoes = linhas - (np.cumsum(tamanhos) - tamanhos)[listas]
+        codigos = np.stack([self._listas[g][1][p] for g, p in zip(listas.tolist(), posicoes.tolist())])
+        escalas = np.array([self._listas[g][2][p] for g, p in zip(listas.tolist(), posicoes.tolist())])
+        return desquantizar_matriz(codigos, escalas), listas
+
+    def _estimar_fora(self, vetor, visitadas, limiar):
+        """
+        Estimativa estratificada: cada linha sorteada de uma lista não visitada que passa
+        do limiar vale (tamanho atual da lista / linhas sorteadas dela).
+        """
+        if self._amostra is None:
+            self._amostra = self._preparar_amostra()
+        vetores, listas = self._amostra
+        fora = ~np.isin(listas, visitadas)
+        if not fora.any():
+            return 0
+        vetores, listas = vetores[fora], listas[fora]
+        acima = np.rint(np.maximum(vetores @ vetor, 0) * 100) > limiar
+        sorteadas = np.bincount(listas, minlength=self.n_listas)
+        tamanhos = self._tamanhos().astype(np.float64)
+        return int(round(float((tamanhos[listas[acima]] / sorteadas[listas[acima]]).sum())))
+
+    # --- PERSISTÊNCIA ---
+
+    def salvar(self, caminho):
+        dimensao = self.centroides.shape[1]
+        tmp = f"{caminho}.tmp.npz"
+        np.savez(
+            tmp,
+            centroides=self.centroides,
+            tamanhos=self._tamanhos(),
+            ids=np.concatenate([ids for ids, _, _ in self._listas]) if len(self) else np.empty(0, np.int64),
+            codigos=(
+                np.concatenate([codigos for _, codigos, _ in self._listas]) if len(self)
+                else np.empty((0, dimensao), np.int8)
+            ),
+            escalas=np.concatenate([escalas for _, _, escalas in self._listas]) if len(self) else np.empty(0, np.float32),
+            n_sondas=self.n_sondas,
+            sincronizado_ate=self.sincronizado_ate.isoformat() if self.sincronizado_ate else '',
+        )
+        os.replace(tmp, caminho)  # Troca atômica: workers nunca leem arquivo pela metade
+
+    @classmethod
+    def carregar(cls, caminho):
+        dados = np.load(caminho)
+        indice = cls(n_listas=dados['centroides'].shape[0], n_sondas=int(dados['n_sondas']))
+        indice.centroides = dados['centroides']
+        tamanhos = dados['tamanhos']
+        limites = np.concatenate([[0], np.cumsum(tamanhos)])
+        ids, codigos, escalas = dados['ids'], dados['codigos'], dados['escalas']
+        indice._listas = [
+            (ids[a:b], codigos[a:b], escalas[a:b]) for a, b in zip(limites[:-1], limites[1:])
+        ]
+        indice._lista_de = dict(zip(ids.tolist(), np.repeat(np.arange(indice.n_listas), tamanhos).tolist()))
+        indice.total_construcao = len(indice)
+        if str(dados['sincronizado_ate']):
+            indice.sincronizado_ate = datetime.datetime.fromisoformat(str(dados['sincronizado_ate']))
+        return indice
+
+
+def reconstruir(modelo, caminho, n_listas=None, n_sondas=8, n_iter=10):
+    """
+    Constrói o índice com todos os vetores do modelo e grava em `caminho` (troca atômica).
+    Usado pelo `manage.py construir_indice_ann` e pela varredura do atualizador.
+    Retorna o índice, ou None se ainda não houver vetores.
+    """
+    from django.db.models import Max
+
+    from .matriz import matriz_candidatos
+
+    # Pega a data ANTES de ler: o que mudar durante a leitura entra depois como inserção incremental
+    sincronizado_ate = EmbeddingCandidato.objects.filter(modelo=modelo).aggregate(
+        ultima=Max('atualizado_em')
+    )['ultima']
+    ids, matriz, escalas = matriz_candidatos.obter(modelo)
+    if len(ids) == 0:
+        return None
+
+    indice = IndiceIVF(n_listas=n_listas, n_sondas=n_sondas)
+    # Direto da matriz compacta: sem uma cópia float32 do banco inteiro
+    indice.construir(ids, matriz, escalas, n_iter=n_iter)
+    indice.sincronizado_ate = sincronizado_ate
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    indice.salvar(caminho)
+    return indice
+
+
+class IndiceANNCandidatos:
+    """
+    Mantém, por processo, o índice carregado do disco e em dia com o banco:
+    recarrega quando o arquivo é reconstruído e insere os vetores alterados depois disso.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indice = None
+        self._mtime = None
+
+    def obter(self, caminho, modelo):
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(caminho)
+            except OSError:
+                return None  # Índice ainda não foi construído: o Radar usa a busca exata
+
+            if self._indice is None or mtime != self._mtime:
+                self._indice = IndiceIVF.carregar(caminho)
+                self._mtime = mtime
+
+            # Inserções incrementais: perfis salvos depois da construção/último sincronismo,
+            # lidos já em int8 e inseridos em UM lote (cada lista é concatenada uma vez só)
+            ids, codigos, escalas, ultima = ler_linhas(
+                'candidatos', modelo, 'i8', depois_de=self._indice.sincronizado_ate
+            )
+            if codigos is not None:
+                self._indice.inserir_varios(ids, codigos, escalas)
+            self._indice.sincronizado_ate = ultima
+
+            return self._indice
+
+
+# Instância única por processo
+indice_candidatos = IndiceANNCandidatos()
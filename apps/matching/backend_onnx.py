@@ -0,0 +1,135 @@
+# Arquivo: apps/matching/backend_onnx.py
+#
+# Backend alternativo de inferência: o SentenceTransformer exportado para ONNX
+# e executado pelo onnxruntime (CPU). Sem torch em produção: import mais rápido
+# e bem menos memória por processo. O int8 (quantização dinâmica) reduz ainda mais.
+#
+# A exportação (exportar_onnx) usa torch + sentence-transformers; a execução
+# (ModeloONNX) só precisa de numpy, onnxruntime e tokenizers.
+# Este módulo não importa o Django (também é usado dentro do benchmark).
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+ARQUIVO_FP32 = 'modelo.onnx'
+ARQUIVO_INT8 = 'modelo_int8.onnx'
+ARQUIVO_CONFIG = 'vagalume_onnx.json'
+
+
+def exportar_onnx(nome_modelo, pasta, opset=14):
+    """
+    Exporta o modelo inteiro (transformer + pooling + dense) para `pasta/modelo.onnx`.
+    A saída é o embedding SEM normalizar, igual ao `encode` do sentence-transformers.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    modelo = SentenceTransformer(nome_modelo, device='cpu')
+    modelo.eval()
+
+    class _Exportavel(torch.nn.Module):
+        def __init__(self, st):
+            super().__init__()
+            self.st = st
+
+        def forward(self, input_ids, attention_mask):
+            return self.st({'input_ids': input_ids, 'attention_mask': attention_mask})['sentence_embedding']
+
+    exemplo = modelo.tokenizer(['texto de exemplo'], return_tensors='pt')
+    with torch.no_grad():
+        torch.onnx.export(
+            _Exportavel(modelo),
+            (exemplo['input_ids'], exemplo['attention_mask']),
+            str(pasta / ARQUIVO_FP32),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['embedding'],
+            dynamic_axes={
+                'input_ids': {0: 'lote', 1: 'tokens'},
+                'attention_mask': {0: 'lote', 1: 'tokens'},
+                'embedding': {0: 'lote'},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    # tokenizer.json: lido pela biblioteca `tokenizers`, sem precisar do transformers/torch
+    modelo.tokenizer.save_pretrained(str(pasta))
+    config = {
+        'modelo': nome_modelo,
+        'max_seq_length': int(modelo.max_seq_length),
+        'dimensao': int(modelo.get_sentence_embedding_dimension()),
+    }
+    (pasta / ARQUIVO_CONFIG).write_text(json.dumps(config, indent=2))
+    return pasta / ARQUIVO_FP32
+
+
+def quantizar_onnx(pasta):
+    """
+    Quantização dinâmica int8 dos pesos (MatMul/Gemm). Gera `pasta/modelo_int8.onnx`.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    pasta = Path(pasta)
+    quantize_dynamic(str(pasta / ARQUIVO_FP32), str(pasta / ARQUIVO_INT8), weight_type=QuantType.QInt8)
+    return pasta / ARQUIVO_INT8
+
+
+def existe_onnx(pasta):
+    pasta = Path(pasta)
+    return (pasta / ARQUIVO_CONFIG).exists() and (pasta / ARQUIVO_FP32).exists()
+
+
+class ModeloONNX:
+    """
+    Mesmo `encode` do SentenceTransformer (a engine não percebe a diferença).
+    """
+
+    def __init__(self, pasta, quantizado=True, threads=0):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        pasta = Path(pasta)
+        config = json.loads((pasta / ARQUIVO_CONFIG).read_text())
+        arquivo = pasta / ARQUIVO_INT8
+        if not quantizado or not arquivo.exists():
+            arquivo = pasta / ARQUIVO_FP32
+        self.arquivo = arquivo
+        self.nome = config['modelo']
+
+        opcoes = onnxruntime.SessionOptions()
+        opcoes.intra_op_num_threads = threads  # 0 = o onnxruntime escolhe (todos os núcleos)
+        opcoes.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.sessao = onnxruntime.InferenceSession(str(arquivo), opcoes, providers=['CPUExecutionProvider'])
+
+        self.tokenizer = Tokenizer.from_file(str(pasta / 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=config['max_seq_length'])
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id('[PAD]') or 0)
+
+    def encode(self, textos, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        unico = isinstance(textos, str)
+        textos = [textos] if unico else list(textos)
+        if not textos:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Textos de tamanho parecido no mesmo lote: menos padding (igual ao sentence-transformers)
+        ordem = np.argsort([-len(t) for t in textos], kind='stable')
+        saida = [None] * len(textos)
+        for inicio in range(0, len(textos), batch_size):
+            indices = ordem[inicio:inicio + batch_size]
+            codificados = self.tokenizer.encode_batch([textos[i] for i in indices])
+            entradas = {
+                'input_ids': np.array([c.ids for c in codificados], dtype=np.int64),
+                'attention_mask': np.array([c.attention_mask for c in codificados], dtype=np.int64),
+            }
+            vetores = self.sessao.run(None, entradas)[0]
+            for i, vetor in zip(indices, vetores):
+                saida[i] = vetor
+
+        vetores = np.vstack(saida).astype(np.float32, copy=False)
+        if normalize_embeddings:
+            vetores /= np.maximum(np.linalg.norm(vetores, axis=1, keepdims=True), 1e-12)
+        return vetores[0] if unico else vetores
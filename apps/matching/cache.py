@@ -0,0 +1,107 @@
+# Arquivo: apps/matching/cache.py
+#
+# Cache de embeddings por texto: se o mesmo texto (mesmo hash) já foi codificado,
+# o vetor vem da memória e o modelo nem é chamado.
+#   1º nível: LRU em memória do processo, limitado em BYTES (não em itens).
+#   2º nível (opcional): o cache do Django (MATCHING_CACHE_DJANGO=True), compartilhado entre workers.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache as cache_django
+
+
+class CacheEmbeddings:
+    """
+    LRU thread-safe de vetores, indexado por (modelo, hash do texto).
+    """
+
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_usados = 0
+        self.acertos_memoria = 0
+        self.acertos_django = 0
+        self.faltas = 0
+
+    def _chave_django(self, chave):
+        modelo, hash_atual = chave
+        return f"matching:emb:{modelo}:{hash_atual}"
+
+    def obter_varios(self, chaves):
+        """
+        Retorna {chave: vetor} só com o que foi encontrado (memória ou cache do Django).
+        """
+        encontrados = {}
+        with self._lock:
+            for chave in chaves:
+                vetor = self._itens.get(chave)
+                if vetor is not None:
+                    self._itens.move_to_end(chave)  # Usado agora: vai para o fim da fila
+                    encontrados[chave] = vetor
+            self.acertos_memoria += len(encontrados)
+
+        faltando = [c for c in chaves if c not in encontrados]
+        if faltando and settings.MATCHING_CACHE_DJANGO:
+            nomes = {self._chave_django(c): c for c in faltando}
+            for nome, dados in cache_django.get_many(list(nomes)).items():
+                vetor = np.frombuffer(dados, dtype=np.float32)
+                encontrados[nomes[nome]] = vetor
+                self._guardar_memoria(nomes[nome], vetor)
+                with self._lock:
+                    self.acertos_django += 1
+
+        with self._lock:
+            self.faltas += len([c for c in chaves if c not in encontrados])
+        return encontrados
+
+    def guardar_varios(self, itens):
+        """
+        itens = {chave: vetor}. Grava nos dois níveis.
+        """
+        for chave, vetor in itens.items():
+            self._guardar_memoria(chave, vetor)
+        if itens and settings.MATCHING_CACHE_DJANGO:
+            cache_django.set_many(
+                {self._chave_django(c): np.asarray(v, dtype=np.float32).tobytes() for c, v in itens.items()},
+                timeout=settings.MATCHING_CACHE_DJANGO_TIMEOUT,
+            )
+
+    def _guardar_memoria(self, chave, vetor):
+        # Cópia própria: não segura viva a matriz inteira de onde o vetor saiu
+        vetor = np.array(vetor, dtype=np.float32, copy=True)
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self.bytes_usados -= antigo.nbytes
+            self._itens[chave] = vetor
+            self.bytes_usados += vetor.nbytes
+            # Estourou o limite de memória: descarta os menos usados recentemente
+            while self.bytes_usados > self.limite_bytes and self._itens:
+                _, removido = self._itens.popitem(last=False)
+                self.bytes_usados -= removido.nbytes
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos_memoria + self.acertos_django + self.faltas
+            return {
+                'itens': len(self._itens),
+                'bytes_usados': self.bytes_usados,
+                'limite_bytes': self.limite_bytes,
+                'acertos_memoria': self.acertos_memoria,
+                'acertos_django': self.acertos_django,
+                'faltas': self.faltas,
+                'taxa_acerto': round((consultas - self.faltas) / consultas, 4) if consultas else 0.0,
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self.bytes_usados = 0
+
+
+# Instância única por processo
+cache_embeddings = CacheEmbeddings(limite_bytes=settings.MATCHING_CACHE_MB * 1024 * 1024)
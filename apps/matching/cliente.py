@@ -0,0 +1,51 @@
+# Arquivo: apps/matching/cliente.py
+#
+# Cliente do servidor local de embeddings (apps/matching/servidor.py).
+# Se o servidor não responder, devolve None e a engine codifica no próprio worker.
+
+import base64
+import json
+import time
+import urllib.request
+
+import numpy as np
+from django.conf import settings
+
+# Depois de uma falha, não tenta o servidor de novo por alguns segundos
+# (evita pagar o timeout em toda requisição enquanto ele está fora do ar)
+PAUSA_APOS_FALHA = 30
+_fora_do_ar_ate = 0.0
+
+
+def codificar_remoto(textos, modelo):
+    """
+    Envia os textos ao servidor e retorna a matriz de vetores, ou None se indisponível.
+    """
+    global _fora_do_ar_ate
+    if time.monotonic() < _fora_do_ar_ate:
+        return None
+
+    corpo = json.dumps({'textos': list(textos)}).encode('utf-8')
+    requisicao = urllib.request.Request(
+        settings.MATCHING_SERVIDOR_URL.rstrip('/') + '/codificar',
+        data=corpo,
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(requisicao, timeout=settings.MATCHING_SERVIDOR_TIMEOUT) as resposta:
+            dados = json.loads(resposta.read())
+
+        # Nunca misturar vetores de modelos diferentes
+        if dados['modelo'] != modelo:
+            print(f"Servidor de embeddings usa o modelo {dados['modelo']}, esperado {modelo}.")
+            _fora_do_ar_ate = time.monotonic() + PAUSA_APOS_FALHA
+            return None
+
+        vetores = np.frombuffer(base64.b64decode(dados['vetores']), dtype=np.float32)
+        return vetores.reshape(len(textos), dados['dimensao'])
+
+    except Exception as e:
+        print(f"Servidor de embeddings indisponível ({e}). Codificando localmente.")
+        _fora_do_ar_ate = time.monotonic() + PAUSA_APOS_FALHA
+        return None
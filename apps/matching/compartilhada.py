@@ -0,0 +1,265 @@
+# Arquivo: apps/matching/compartilhada.py
+#
+# Matriz de embeddings COMPARTILHADA entre os workers via np.memmap.
+#
+# Sem isso, cada worker do gunicorn carrega todos os vetores no próprio heap
+# (memória x número de workers). Aqui os vetores são exportados para arquivos .npy
+# e cada worker abre o mesmo arquivo só para leitura: as páginas ficam no page
+# cache do sistema operacional, uma única vez para todos.
+#
+#   base  -> arquivo exportado (manage.py exportar_matriz), imutável
+#   delta -> linhas do banco alteradas DEPOIS da exportação, pequeno, no heap
+#            (linhas da base apagadas do banco depois da exportação ficam de fora)
+# Quando o delta cresce demais, um worker refaz a exportação (base + delta).
+
+import datetime
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from .models import EmbeddingCandidato, EmbeddingVaga
+from .quantizacao import FORMATOS, quantizar
+
+TIPOS = {
+    'candidatos': (EmbeddingCandidato, 'candidato_id'),
+    'vagas': (EmbeddingVaga, 'vaga_id'),
+}
+
+
+def _pasta(tipo, modelo):
+    return settings.MATCHING_DIR / f"matriz_{tipo}_{modelo}"
+
+
+def _formato(matriz):
+    return {np.dtype(v): k for k, v in FORMATOS.items()}[matriz.dtype]
+
+
+def _travar_sem_esperar(arquivo):
+    """
+    Trava exclusiva no arquivo aberto, sem esperar. Retorna True (travou),
+    False (outro processo já tem a trava) ou None (sem fcntl nem msvcrt).
+    A trava cai sozinha quando o arquivo é fechado (ou o processo morre).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    try:
+        import msvcrt  # Windows
+    except ImportError:
+        return None
+    try:
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def ler_linhas(tipo, modelo, formato, depois_de=None, ids=None):
+    """
+    Lê as linhas do banco já no formato da matriz: (ids, matriz, escalas, ultima_atualizacao).
+    depois_de: só as alteradas depois dessa data; ids: só as desses donos.
+    """
+    classe, campo_id = TIPOS[tipo]
+    registros = classe.objects.filter(modelo=modelo)
+    if depois_de is not None:
+        registros = registros.filter(atualizado_em__gt=depois_de)
+    if ids is not None:
+        registros = registros.filter(**{f'{campo_id}__in': [int(i) for i in ids]})
+
+    ids, vetores, escalas, ultima = [], [], [], depois_de
+    for dono_id, vetor, formato_linha, escala, atualizado_em in (
+        registros.order_by(campo_id)
+        .values_list(campo_id, 'vetor', 'formato', 'escala', 'atualizado_em')
+        .iterator(chunk_size=2000)
+    ):
+        vetor = np.frombuffer(bytes(vetor), dtype=FORMATOS[formato_linha])
+        if formato_linha != formato:
+            vetor, escala = quantizar(vetor.astype(np.float32) * np.float32(escala), formato)
+        ids.append(dono_id)
+        vetores.append(vetor)
+        escalas.append(escala)
+        if ultima is None or atualizado_em > ultima:
+            ultima = atualizado_em
+
+    if not vetores:
+        return np.empty(0, np.int64), None, np.empty(0, np.float32), ultima
+    return (
+        np.array(ids, dtype=np.int64),
+        np.vstack(vetores).astype(FORMATOS[formato], copy=False),
+        np.array(escalas, dtype=np.float32),
+        ultima,
+    )
+
+
+def exportar(tipo, modelo, formato=None):
+    """
+    Grava a base (ids.npy, vetores.npy, escalas.npy) em uma pasta nova e troca o
+    ponteiro `atual.json` de forma atômica. Workers com a base antiga aberta
+    continuam lendo normalmente até perceberem a troca.
+    """
+    formato = formato or settings.MATCHING_FORMATO_MATRIZ
+    pasta = _pasta(tipo, modelo)
+    pasta.mkdir(parents=True, exist_ok=True)
+
+    # Pega a data ANTES de ler: o que mudar durante a leitura entra no próximo delta
+    classe, _ = TIPOS[tipo]
+    exportado_ate = classe.objects.filter(modelo=modelo).aggregate(ultima=Max('atualizado_em'))['ultima']
+    ids, matriz, escalas, _ = ler_linhas(tipo, modelo, formato)
+    if matriz is None:
+        return 0
+
+    geracao = f"g{int(time.time() * 1000)}"
+    destino = pasta / geracao
+    destino.mkdir()
+    np.save(destino / 'ids.npy', ids)
+    np.save(destino / 'vetores.npy', matriz)
+    np.save(destino / 'escalas.npy', escalas)
+
+    ponteiro = {
+        'geracao': geracao,
+        'formato': formato,
+        'total': int(len(ids)),
+        'exportado_ate': exportado_ate.isoformat() if exportado_ate else None,
+    }
+    tmp = pasta / 'atual.json.tmp'
+    tmp.write_text(json.dumps(ponteiro))
+    os.replace(tmp, pasta / 'atual.json')
+
+    # Remove gerações antigas (workers que ainda as têm abertas mantêm o arquivo até fechar)
+    for antiga in pasta.iterdir():
+        if antiga.is_dir() and antiga.name != geracao:
+            shutil.rmtree(antiga, ignore_errors=True)
+    return len(ids)
+
+
+class MatrizCompartilhada:
+    """
+    Visão, por processo, de uma matriz exportada (memmap) + delta do banco.
+    """
+
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self._lock = threading.Lock()
+        self._base = {}    # modelo -> (geracao, ids, matriz, escalas, exportado_ate)
+        self._delta = {}   # modelo -> (carimbo, ids, matriz, escalas, base_ativa)
+        self._mesclando = False
+        self._sem_trava = False  # Plataforma sem trava de arquivo: nunca mescla
+
+    def disponivel(self, modelo):
+        return (_pasta(self.tipo, modelo) / 'atual.json').exists()
+
+    def _abrir_base(self, modelo):
+        pasta = _pasta(self.tipo, modelo)
+        ponteiro = json.loads((pasta / 'atual.json').read_text())
+        atual = self._base.get(modelo)
+        if atual is not None and atual[0] == ponteiro['geracao']:
+            return atual
+
+        destino = pasta / ponteiro['geracao']
+        exportado_ate = ponteiro['exportado_ate']
+        base = (
+            ponteiro['geracao'],
+            np.load(destino / 'ids.npy'),
+            np.load(destino / 'vetores.npy', mmap_mode='r'),  # zero-cópia, só leitura
+            np.load(destino / 'escalas.npy'),
+            datetime.datetime.fromisoformat(exportado_ate) if exportado_ate else None,
+        )
+        self._base[modelo] = base
+        self._delta.pop(modelo, None)
+        return base
+
+    def _carregar_delta(self, modelo, ids_base, exportado_ate, formato):
+        classe, campo_id = TIPOS[self.tipo]
+        linhas = classe.objects.filter(modelo=modelo)
+        if exportado_ate is not None:
+            resumo = linhas.aggregate(
+                total=Count('id'), alterados=Count('id', filter=Q(atualizado_em__gt=exportado_ate)),
+                ultima=Max('atualizado_em'),
+            )
+        else:
+            resumo = linhas.aggregate(total=Count('id'), ultima=Max('atualizado_em'))
+            resumo['alterados'] = resumo['total']
+        # O total entra no carimbo: apagar uma linha da base também vence o delta
+        carimbo = (resumo['total'], resumo['alterados'], resumo['ultima'])
+
+        atual = self._delta.get(modelo)
+        if atual is None or atual[0] != carimbo:
+            ids, matriz, escalas, _ = ler_linhas(self.tipo, modelo, formato, depois_de=exportado_ate)
+            # Linhas da base reescritas no delta deixam de valer (senão o id apareceria 2x)
+            base_ativa = ~np.isin(ids_base, ids)
+            # Linhas apagadas depois da exportação continuam no arquivo: se a contagem do banco
+            # não bate com base + delta, lê os ids existentes (só nesse caso) e tira as apagadas
+            if resumo['total'] != int(base_ativa.sum()) + len(ids):
+                existentes = np.fromiter(linhas.values_list(campo_id, flat=True).iterator(), dtype=np.int64)
+                base_ativa &= np.isin(ids_base, existentes)
+            atual = (carimbo, ids, matriz, escalas, None if base_ativa.all() else base_ativa)
+            self._delta[modelo] = atual
+        return atual
+
+    def obter(self, modelo):
+        """
+        Retorna a lista de segmentos [(ids, matriz, escalas, ativos), ...] para pontuar.
+        `ativos` é uma máscara booleana (ou None = todas as linhas valem).
+        """
+        with self._lock:
+            _, ids_base, matriz_base, escalas_base, exportado_ate = self._abrir_base(modelo)
+            _, ids_delta, matriz_delta, escalas_delta, base_ativa = self._carregar_delta(
+                modelo, ids_base, exportado_ate, _formato(matriz_base)
+            )
+
+        segmentos = [(ids_base, matriz_base, escalas_base, base_ativa)]
+        if matriz_delta is not None:
+            segmentos.append((ids_delta, matriz_delta, escalas_delta, None))
+            if len(ids_delta) > settings.MATCHING_DELTA_MAX:
+                self._mesclar_em_segundo_plano(modelo)
+        return segmentos
+
+    def _mesclar_em_segundo_plano(self, modelo):
+        """
+        Delta grande: refaz a exportação em uma thread. A trava no arquivo garante
+        que só UM worker faz isso de cada vez; os outros seguem usando base + delta.
+        Sem trava disponível na plataforma, não mescla (base + delta continuam valendo).
+        """
+        if self._mesclando or self._sem_trava:
+            return
+        self._mesclando = True
+
+        def mesclar():
+            from django.db import connection
+            try:
+                caminho_trava = _pasta(self.tipo, modelo) / 'mesclagem.lock'
+                with open(caminho_trava, 'w') as trava:
+                    travou = _travar_sem_esperar(trava)
+                    if travou is None:
+                        self._sem_trava = True
+                        print(f"Sem trava de arquivo nesta plataforma: delta da matriz de {self.tipo} não será mesclado")
+                        return
+                    if not travou:
+                        return  # Outro worker já está mesclando
+                    exportar(self.tipo, modelo)
+            except Exception as e:
+                print(f"Erro ao mesclar o delta da matriz de {self.tipo}: {e}")
+            finally:
+                connection.close()
+                self._mesclando = False
+
+        threading.Thread(target=mesclar, daemon=True).start()
+
+
+# Instâncias únicas por processo
+matriz_compartilhada_candidatos = MatrizCompartilhada('candidatos')
+matriz_compartilhada_vagas = MatrizCompartilhada('vagas')
@@ -1,23 +1,176 @@
 # Arquivo: apps/matching/engine.py (VERSÃO "IA")
 
-# 1. Importe as bibliotecas de IA
-from sentence_transformers import SentenceTransformer, util
+# 1. Importe as bibliotecas
+#    (sentence_transformers/torch NÃO são importados aqui: só quando o modelo for usado)
+import functools
+import threading
+import time
+import numpy as np
 from apps.usuarios.models import Candidato
 from apps.vagas.models import Vaga
+from . import cliente, secoes, skills, vetores
+from .cache import cache_embeddings
+from .lotes import FilaDeLotes
+from .matriz import estimar_total, matriz_candidatos, pontuar_segmentos, pontuar_segmentos_lote
+from .compartilhada import matriz_compartilhada_candidatos
+from .ann import indice_candidatos
+from .lexico import indice_lexico
+from .backend_onnx import ARQUIVO_INT8, existe_onnx
+from .paralelo import criar_modelo
+from .tarefas import atualizador_embeddings
+from django.conf import settings
+from django.db.models import Q
 
-# 2. Carregue o modelo de IA (só uma vez, quando o app inicia)
-#    Vamos usar um modelo pré-treinado para o português.
-try:
-    # Este é um modelo leve e bom para o português
-    model = SentenceTransformer('distiluse-base-multilingual-cased-v1')
-except Exception as e:
-    # Se der erro no carregamento, você saberá
-    print(f"Erro ao carregar o modelo de IA: {e}")
-    model = None
+# Nome do modelo padrão: fica gravado junto de cada vetor salvo no banco.
+# O modelo em uso de verdade é o "ativo" da tabela VersaoModelo (ver modelo_ativo()).
+MODELO_NOME = settings.MATCHING_MODELO_PADRAO
 
-def get_texto_candidato(candidato: Candidato) -> str:
+# O runtime faz parte do id do modelo: "<nome>" roda no torch, "<nome>@onnx" e
+# "<nome>@onnx-int8" no onnxruntime. Vetores de runtimes diferentes nunca se misturam,
+# e trocar de backend é uma troca de modelo como outra qualquer (sombra, reembed, ativar).
+VARIANTES_ONNX = {'onnx': False, 'onnx-int8': True}
+
+_modelo_ativo = (None, 0.0)  # (nome, quando foi lido do banco)
+
+def id_do_modelo(nome, backend=None, int8=None):
+    """
+    Id com que os vetores de `nome` são gravados no runtime `backend` (padrão:
+    MATCHING_BACKEND e MATCHING_ONNX_INT8). Um id que já tem o runtime volta igual
+    ("<nome>@torch" vira "<nome>").
+    """
+    if '@' in nome:
+        base, _, variante = nome.partition('@')
+        return base if variante == 'torch' else nome
+    if (backend or settings.MATCHING_BACKEND) != 'onnx':
+        return nome
+    int8 = settings.MATCHING_ONNX_INT8 if int8 is None else int8
+    return f"{nome}@onnx-int8" if int8 else f"{nome}@onnx"
+
+def ler_id_do_modelo(id_modelo):
+    """
+    (nome do sentence-transformers, backend, int8) de um id gerado pelo id_do_modelo.
+    """
+    nome, _, variante = id_modelo.partition('@')
+    if not variante:
+        return nome, 'torch', False
+    if variante not in VARIANTES_ONNX:
+        raise ValueError(f"Runtime desconhecido no modelo {id_modelo} (use @onnx ou @onnx-int8)")
+    return nome, 'onnx', VARIANTES_ONNX[variante]
+
+def modelo_ativo() -> str:
+    """
+    Nome do modelo ativo. Lido do banco no máximo a cada MATCHING_MODELO_VERIFICAR_S
+    segundos, então a troca (manage.py modelo_embeddings ativar) chega a todos os
+    workers sem reiniciar nada.
+    """
+    global _modelo_ativo
+    nome, lido_em = _modelo_ativo
+    if nome is not None and time.monotonic() - lido_em < settings.MATCHING_MODELO_VERIFICAR_S:
+        return nome
+
+    try:
+        from .models import VersaoModelo
+        nome = VersaoModelo.objects.filter(status='ativo').values_list('nome', flat=True).first()
+    except Exception as e:
+        # Ex.: tabela ainda não migrada
+        print(f"Erro ao ler o modelo ativo: {e}")
+        nome = None
+    nome = nome or id_do_modelo(MODELO_NOME)
+    _modelo_ativo = (nome, time.monotonic())
+    return nome
+
+# 2. Carregamento PREGUIÇOSO do modelo de IA
+#    O import do torch e o carregamento dos pesos só acontecem na primeira codificação.
+#    Páginas que só leem vetores salvos nunca pagam esse custo.
+_modelos = {}  # nome -> SentenceTransformer (só o último usado fica na memória)
+_modelo_lock = threading.Lock()
+_ultima_falha = 0.0
+INTERVALO_NOVA_TENTATIVA = 60  # segundos entre tentativas se o carregamento falhar
+
+def get_modelo(nome=None):
+    """
+    Retorna o SentenceTransformer (do modelo ativo, se `nome` não for informado),
+    carregando na primeira chamada (thread-safe).
+    Retorna None se o modelo não puder ser carregado.
+    """
+    global _modelos, _ultima_falha
+    nome = nome or modelo_ativo()
+    modelo = _modelos.get(nome)
+    if modelo is not None:
+        return modelo
+
+    with _modelo_lock:
+        if nome not in _modelos and time.monotonic() - _ultima_falha > INTERVALO_NOVA_TENTATIVA:
+            try:
+                # Troca de modelo: o anterior é descartado para não dobrar a memória
+                _modelos = {nome: _carregar_modelo(nome)}
+            except Exception as e:
+                # Se der erro no carregamento, você saberá
+                print(f"Erro ao carregar o modelo de IA {nome}: {e}")
+                _ultima_falha = time.monotonic()
+    return _modelos.get(nome)
+
+def caminho_onnx(nome=None):
+    # Uma exportação por nome: o fp32 e o int8 ficam na mesma pasta
+    nome, _, _ = ler_id_do_modelo(nome or modelo_ativo())
+    return settings.MATCHING_DIR / 'onnx' / nome.replace('/', '__')
+
+def opcoes_do_modelo(id_modelo):
+    """
+    Como carregar o modelo `id_modelo` (argumentos do paralelo.criar_modelo).
+    "@onnx"/"@onnx-int8": usa o modelo exportado (manage.py exportar_onnx) no onnxruntime.
+    Sem a exportação, falha em vez de cair para o torch: os vetores gravados com esse id
+    têm que sair sempre do mesmo runtime.
+    """
+    nome, backend, int8 = ler_id_do_modelo(id_modelo)
+    pasta = None
+    if backend == 'onnx':
+        pasta = caminho_onnx(nome)
+        if not existe_onnx(pasta) or (int8 and not (pasta / ARQUIVO_INT8).exists()):
+            raise FileNotFoundError(
+                f"Modelo ONNX de {nome} não encontrado em {pasta} "
+                f"(rode manage.py exportar_onnx --modelo {nome}{' --int8' if int8 else ''})"
+            )
+    return {
+        'nome': nome,
+        'pasta_onnx': str(pasta) if pasta else None,
+        'quantizado': int8,
+        'threads': settings.MATCHING_ONNX_THREADS,
+    }
+
+def _carregar_modelo(nome):
+    # Mesma fábrica dos processos do `reembed`
+    return criar_modelo(**opcoes_do_modelo(nome))
+
+def preload_modelo():
+    """
+    Carrega o modelo ANTES do fork dos workers (gunicorn com preload_app).
+    Os workers herdam os pesos por copy-on-write em vez de cada um ter sua cópia.
+    """
+    modelo = get_modelo()
+    if settings.MATCHING_RERANK_ATIVO:
+        from .rerank import reordenador
+        reordenador.carregar()
+    # modelo_ativo() consultou o banco: a conexão não pode ser herdada pelos workers
+    from django.db import connections
+    connections.close_all()
+    if modelo is not None:
+        import gc
+        # Move os objetos atuais para uma geração "congelada": o GC dos workers
+        # não toca nessas páginas e elas continuam compartilhadas com o master.
+        gc.freeze()
+    return modelo
+
+def _modelo_obrigatorio(nome=None):
+    modelo = get_modelo(nome)
+    if modelo is None:
+        raise RuntimeError("Modelo de IA não carregado.")
+    return modelo
+
+def get_texto_candidato(candidato: Candidato, incluir_skills=True) -> str:
     """
     Junta todo o perfil de texto do candidato em uma única string.
+    incluir_skills=False: só o texto livre (as skills entram pela composição, ver skills.py).
     """
     textos = []
     
@@ -26,7 +179,7 @@ def get_texto_candidato(candidato: Candidato) -> str:
         textos.append(candidato.resumo_profissional.texto)
         
     # Pega as Skills
-    skills = [skill.nome for skill in candidato.skills.all()]
+    skills = [skill.nome for skill in candidato.skills.all()] if incluir_skills else []
     if skills:
         textos.append("Habilidades: " + ", ".join(skills))
         
@@ -40,6 +193,22 @@ def get_texto_candidato(candidato: Candidato) -> str:
         
     return ". ".join(textos)
 
+def chave_candidato(candidato: Candidato):
+    """
+    (o que vai para o modelo, hash do vetor final, skills [(nome, peso)]).
+    Com MATCHING_VETOR_POR_SECAO, "o que vai para o modelo" é a lista de seções
+    (ver secoes.py); senão, o texto único do get_texto_candidato. Perfil vazio: hash None.
+    """
+    if not settings.MATCHING_VETOR_POR_SECAO:
+        texto = get_texto_candidato(candidato)
+        return texto, (vetores.hash_texto(texto) if texto else None), []
+
+    lista_secoes = secoes.secoes_do_candidato(candidato)
+    lista_skills = skills.skills_do_candidato(candidato)
+    if not lista_secoes and not lista_skills:
+        return lista_secoes, None, []
+    return lista_secoes, secoes.hash_perfil(lista_secoes, lista_skills), lista_skills
+
 def get_texto_vaga(vaga: Vaga) -> str:
     """
     Junta todo o texto da vaga em uma única string.
@@ -51,37 +220,417 @@ def get_texto_vaga(vaga: Vaga) -> str:
     ]
     return ". ".join(textos)
 
-def calcular_similaridade_tags(vaga, candidato):
+def codificar_no_modelo(textos, batch_size=32, modelo=None) -> np.ndarray:
     """
-    A "Engine" de IA!
-    Calcula a "Similaridade de Cosseno" entre os vetores da Vaga e do Candidato.
-    
-    (Mantivemos o nome da função para não quebrar suas views!)
+    Chama o modelo diretamente, em uma única passada para todos os textos.
     """
-    if model is None:
-        print("Modelo de IA não carregado. Retornando 0.")
-        return 0
+    return _modelo_obrigatorio(modelo).encode(
+        list(textos), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+    ).astype(np.float32)
 
-    try:
-        # 1. Converte os perfis em texto puro
-        texto_vaga = get_texto_vaga(vaga)
-        texto_candidato = get_texto_candidato(candidato)
+_filas_locais = {}  # uma fila por modelo: um lote nunca mistura modelos
+_fila_local_lock = threading.Lock()
 
-        if not texto_vaga or not texto_candidato:
-            return 0 # Não dá para comparar textos vazios
+def _get_fila_local(modelo):
+    if modelo not in _filas_locais:
+        with _fila_local_lock:
+            if modelo not in _filas_locais:
+                _filas_locais[modelo] = FilaDeLotes(
+                    functools.partial(codificar_no_modelo, modelo=modelo),
+                    janela_ms=settings.MATCHING_AGRUPAR_JANELA_MS,
+                    lote_max=settings.MATCHING_AGRUPAR_LOTE_MAX,
+                )
+    return _filas_locais[modelo]
 
-        # 2. Codifica os textos em Vetores (Embeddings) - A "IA" ACONTECE AQUI!
-        embedding_vaga = model.encode(texto_vaga, convert_to_tensor=True)
-        embedding_candidato = model.encode(texto_candidato, convert_to_tensor=True)
+def codificar_textos_local(textos, batch_size=32, modelo=None) -> np.ndarray:
+    """
+    Roda o modelo NESTE processo.
+    Com MATCHING_AGRUPAR_JANELA_MS > 0, pedidos simultâneos de várias threads
+    (gunicorn com --threads) são juntados em uma única passada do modelo.
+    """
+    if settings.MATCHING_AGRUPAR_JANELA_MS > 0:
+        return _get_fila_local(modelo or modelo_ativo()).codificar(list(textos))
+    return codificar_no_modelo(textos, batch_size=batch_size, modelo=modelo)
 
-        # 3. Calcula a Similaridade de Cosseno
-        # Isso retorna um score, por exemplo, 0.85
-        cosine_scores = util.cos_sim(embedding_vaga, embedding_candidato)
-        score = cosine_scores.item() # Pega o valor numérico
+def _codificar_sem_cache(textos, batch_size=32, modelo=None) -> np.ndarray:
+    """
+    Se MATCHING_SERVIDOR_URL estiver configurado, pede ao servidor de embeddings
+    (manage.py servidor_embeddings); se ele estiver fora do ar, codifica aqui mesmo.
+    """
+    if settings.MATCHING_SERVIDOR_URL:
+        # O cliente descarta a resposta se o servidor estiver com outro modelo
+        vetores_remotos = cliente.codificar_remoto(textos, modelo)
+        if vetores_remotos is not None:
+            return vetores_remotos
+    return codificar_textos_local(textos, batch_size=batch_size, modelo=modelo)
 
-        # 4. Converte para porcentagem (de 0 a 100)
-        return round(max(score, 0) * 100)
+def codificar_textos(textos, batch_size=32, modelo=None) -> np.ndarray:
+    """
+    Codifica VÁRIOS textos de uma vez (inferência em lote).
+    Retorna uma matriz (len(textos) x D) de vetores normalizados.
 
-    except Exception as e:
-        print(f"Erro ao calcular similaridade para vaga {vaga.id} e candidato {candidato.pk}: {e}")
-        return 0
\ No newline at end of file
+    Antes de chamar o modelo, procura cada texto (pelo hash) no cache de embeddings:
+    textos repetidos ou já vistos não são codificados de novo.
+    """
+    textos = list(textos)
+    if not textos:
+        return np.empty((0, 0), dtype=np.float32)
+    modelo = modelo or modelo_ativo()
+    chaves = [(modelo, vetores.hash_texto(t)) for t in textos]
+    unicas = list(dict.fromkeys(chaves))  # Textos repetidos no mesmo lote: codifica uma vez só
+    encontrados = cache_embeddings.obter_varios(unicas)
+
+    faltando = [c for c in unicas if c not in encontrados]
+    if faltando:
+        texto_da_chave = dict(zip(chaves, textos))
+        novos = _codificar_sem_cache([texto_da_chave[c] for c in faltando], batch_size=batch_size, modelo=modelo)
+        novos = dict(zip(faltando, novos))
+        cache_embeddings.guardar_varios(novos)
+        encontrados.update(novos)
+
+    return np.vstack([encontrados[c] for c in chaves]).astype(np.float32, copy=False)
+
+def codificar_texto(texto: str, modelo=None) -> np.ndarray:
+    """
+    Transforma um texto em vetor (embedding) normalizado.
+    Com o vetor normalizado, o cosseno vira um simples produto escalar.
+    """
+    return codificar_textos([texto], modelo=modelo)[0]
+
+def _aceita_desatualizado(aceitar_desatualizado):
+    if aceitar_desatualizado is None:
+        return settings.MATCHING_ATUALIZACAO_ASSINCRONA
+    return aceitar_desatualizado
+
+def vetor_da_vaga(vaga: Vaga, aceitar_desatualizado=None, modelo=None):
+    """
+    Retorna o embedding da vaga lendo do banco.
+    Só roda o modelo se a vaga ainda não tem vetor ou se o texto mudou (hash diferente).
+    Com a atualização assíncrona, o texto alterado usa o vetor anterior e a
+    recodificação vai para o atualizador em segundo plano.
+    """
+    modelo = modelo or modelo_ativo()
+    # Guarda no próprio objeto (por modelo) para não repetir a consulta dentro de um loop
+    memoria = vaga.__dict__.setdefault('_vetores_embedding', {})
+    if memoria.get(modelo) is not None:
+        return memoria[modelo]
+
+    texto = get_texto_vaga(vaga)
+    if not texto:
+        return None
+
+    hash_atual = vetores.hash_texto(texto)
+    salvo = vetores.buscar_embedding_vaga(vaga.id, modelo)
+    if salvo and salvo[0] == hash_atual:
+        vetor = salvo[1]
+    elif salvo and _aceita_desatualizado(aceitar_desatualizado):
+        vetor = salvo[1]
+        atualizador_embeddings.agendar(vaga_ids=[vaga.id])
+    else:
+        vetor = codificar_texto(texto, modelo=modelo)
+        vetores.salvar_embedding_vaga(vaga.id, modelo, hash_atual, vetor)
+
+    memoria[modelo] = vetor
+    return vetor
+
+def vetores_das_vagas(vagas, aceitar_desatualizado=None, modelo=None):
+    """
+    Versão em lote do vetor_da_vaga (Radar em lote): uma consulta para os vetores
+    salvos e UMA chamada ao modelo para as vagas novas/alteradas.
+    Retorna a lista de vetores na mesma ordem (None para vagas sem texto).
+    """
+    aceitar_desatualizado = _aceita_desatualizado(aceitar_desatualizado)
+    modelo = modelo or modelo_ativo()
+    vagas = list(vagas)
+    textos = [get_texto_vaga(v) for v in vagas]
+    hashes = [vetores.hash_texto(t) if t else None for t in textos]
+    salvos = vetores.buscar_embeddings_vagas([v.id for v in vagas], modelo)
+
+    resultado = [None] * len(vagas)
+    faltando, desatualizadas = [], []
+    for i, (vaga, hash_atual) in enumerate(zip(vagas, hashes)):
+        memoria = vaga.__dict__.setdefault('_vetores_embedding', {})
+        salvo = salvos.get(vaga.id)
+        if memoria.get(modelo) is not None:
+            resultado[i] = memoria[modelo]
+        elif hash_atual is None:
+            continue
+        elif salvo and salvo[0] == hash_atual:
+            resultado[i] = salvo[1]
+        elif salvo and aceitar_desatualizado:
+            resultado[i] = salvo[1]
+            desatualizadas.append(vaga.id)
+        else:
+            faltando.append(i)
+
+    if desatualizadas:
+        atualizador_embeddings.agendar(vaga_ids=desatualizadas)
+
+    if faltando:
+        novos = codificar_textos([textos[i] for i in faltando], modelo=modelo)
+        for i, vetor in zip(faltando, novos):
+            resultado[i] = vetor
+        vetores.salvar_embeddings_vagas([(vagas[i].id, hashes[i], resultado[i]) for i in faltando], modelo)
+
+    for vaga, vetor in zip(vagas, resultado):
+        if vetor is not None:
+            vaga.__dict__['_vetores_embedding'][modelo] = vetor
+    return resultado
+
+def vetores_dos_candidatos(candidatos, batch_size=32, aceitar_desatualizado=None, modelo=None):
+    """
+    Igual ao vetor_da_vaga, mas em lote para perfis de candidatos: uma consulta para ler
+    os vetores salvos e UMA chamada ao modelo para todos os perfis novos/alterados.
+    Retorna a lista de vetores na mesma ordem (None para perfis vazios).
+    """
+    aceitar_desatualizado = _aceita_desatualizado(aceitar_desatualizado)
+    modelo = modelo or modelo_ativo()
+    candidatos = list(candidatos)
+    chaves = [chave_candidato(c) for c in candidatos]
+    salvos = vetores.buscar_embeddings_candidatos([c.pk for c in candidatos], modelo)
+
+    resultado = [None] * len(candidatos)
+    faltando, desatualizados = [], []
+    for i, (candidato, (_, hash_atual, _)) in enumerate(zip(candidatos, chaves)):
+        if hash_atual is None:
+            continue
+        salvo = salvos.get(candidato.pk)
+        if salvo and salvo[0] == hash_atual:
+            resultado[i] = salvo[1]
+        elif salvo and aceitar_desatualizado:
+            # Usa o vetor anterior agora; o atualizador recodifica depois
+            resultado[i] = salvo[1]
+            desatualizados.append(candidato.pk)
+        else:
+            faltando.append(i)
+
+    if desatualizados:
+        atualizador_embeddings.agendar(candidato_ids=desatualizados)
+
+    if faltando:
+        novos = _gerar_vetores_candidatos(
+            [candidatos[i] for i in faltando], [chaves[i] for i in faltando], modelo, batch_size
+        )
+        for i, vetor in zip(faltando, novos):
+            resultado[i] = vetor
+
+    return resultado
+
+def _gerar_vetores_candidatos(candidatos, chaves, modelo, batch_size=32):
+    """
+    Calcula e grava os vetores dos candidatos (chaves vindas do chave_candidato).
+    Por seção: o modelo só roda para as seções novas/alteradas (uma passada para
+    todas) e para skills nunca vistas na plataforma; o resto vem do banco.
+    """
+    if not settings.MATCHING_VETOR_POR_SECAO:
+        novos = codificar_textos([texto for texto, _, _ in chaves], batch_size=batch_size, modelo=modelo)
+        vetores.salvar_embeddings_candidatos(
+            [(c.pk, hash_atual, vetor) for c, (_, hash_atual, _), vetor in zip(candidatos, chaves, novos)], modelo
+        )
+        return list(novos)
+
+    ids = [c.pk for c in candidatos]
+    salvas = vetores.buscar_secoes(ids, modelo)
+    faltando = [
+        item for cid, (lista_secoes, _, _) in zip(ids, chaves)
+        for item in secoes.secoes_faltando(cid, lista_secoes, salvas.get(cid, {}))
+    ]
+    if faltando:
+        novos = codificar_textos([texto for *_, texto in faltando], batch_size=batch_size, modelo=modelo)
+        vetores.salvar_secoes(
+            [(cid, chave, hash_secao, vetor) for (cid, chave, hash_secao, _), vetor in zip(faltando, novos)], modelo
+        )
+
+    return secoes.montar_vetores(
+        ids, chaves, modelo,
+        codificar_skills=functools.partial(codificar_textos, batch_size=batch_size, modelo=modelo),
+    )
+
+def similaridade_percentual(vetor_a, vetor_b) -> int:
+    """
+    Cosseno entre dois vetores normalizados, convertido para 0 a 100.
+    """
+    score = float(np.dot(vetor_a, vetor_b))
+    return round(max(score, 0) * 100)
+
+# Com prazo, os pendentes são codificados em lotes pequenos: o relógio é conferido entre eles
+LOTE_COM_PRAZO = 4
+
+def codificar_pendentes_em_lotes(limite=20, prazo=None):
+    """
+    Gera o embedding de até `limite` candidatos que ainda não têm vetor salvo, em lotes.
+    Produz ({candidato_id: vetor} do lote, []) a cada lote. Se o `prazo` (time.monotonic())
+    acabar ou der erro, os que faltam vão para o atualizador em segundo plano e o último
+    item é ({}, [ids adiados]).
+    """
+    if limite <= 0:
+        return
+
+    modelo = modelo_ativo()
+    # Perfil vazio nunca ganha vetor: sem este filtro voltaria a cada Radar, ocupando o limite
+    com_texto = (
+        Q(resumo_profissional__texto__gt="") | Q(skills__isnull=False)
+        | Q(experiencias__isnull=False) | Q(formacoes__isnull=False)
+    )
+    pendentes = list(
+        Candidato.objects.exclude(embeddings__modelo=modelo)
+        .filter(pk__in=Candidato.objects.filter(com_texto).values("pk"))
+        .select_related("resumo_profissional")
+        .prefetch_related("skills", "experiencias", "formacoes")
+        .order_by("-usuario__date_joined")[:limite]
+    )
+    tamanho = LOTE_COM_PRAZO if prazo is not None else max(len(pendentes), 1)
+    for inicio in range(0, len(pendentes), tamanho):
+        adiados = [c.pk for c in pendentes[inicio:]]
+        if prazo is not None and time.monotonic() >= prazo:
+            atualizador_embeddings.agendar(candidato_ids=adiados)
+            yield {}, adiados
+            return
+        lote = pendentes[inicio:inicio + tamanho]
+        try:
+            vetores_lote = vetores_dos_candidatos(lote, modelo=modelo)
+        except Exception as e:
+            print(f"Erro ao codificar candidatos pendentes: {e}")
+            atualizador_embeddings.agendar(candidato_ids=adiados)
+            yield {}, adiados
+            return
+        yield {c.pk: vetor for c, vetor in zip(lote, vetores_lote) if vetor is not None}, []
+
+def codificar_candidatos_pendentes(limite=20, prazo=None):
+    """
+    Usado pelo Radar para ir completando o banco aos poucos, sem travar a requisição.
+    Retorna ({candidato_id: vetor} dos codificados agora, [ids adiados para o segundo plano]).
+    """
+    novos, adiados = {}, []
+    for novos_lote, adiados_lote in codificar_pendentes_em_lotes(limite, prazo=prazo):
+        novos.update(novos_lote)
+        adiados.extend(adiados_lote)
+    return novos, adiados
+
+def caminho_indice_ann(modelo=None):
+    return settings.MATCHING_DIR / f"ann_candidatos_{modelo or modelo_ativo()}.npz"
+
+def ranquear_candidatos_para_vaga(vaga, top_k=50, limiar=20):
+    """
+    Pontua a vaga contra TODOS os candidatos com vetor salvo, de uma vez só.
+    Retorna (lista de (candidato_id, score) ordenada, total acima do limiar).
+    """
+    # Vaga, matriz e índice: tudo do mesmo modelo
+    modelo = modelo_ativo()
+    embedding_vaga = vetor_da_vaga(vaga, modelo=modelo)
+    if embedding_vaga is None:
+        return [], 0
+
+    # Índice aproximado (opcional): pontua só os grupos mais próximos da vaga
+    if settings.MATCHING_ANN_ATIVO:
+        indice = indice_candidatos.obter(caminho_indice_ann(modelo), modelo)
+        if indice is not None and len(indice):
+            ids, scores, total = indice.buscar_com_total(
+                embedding_vaga, top_k=top_k, limiar=limiar, n_sondas=settings.MATCHING_ANN_SONDAS
+            )
+            ranking = [
+                (int(cid), round(max(float(s), 0) * 100))
+                for cid, s in zip(ids, scores)
+            ]
+            ranking = [(cid, score) for cid, score in ranking if score > limiar]
+            # Total estimado (o índice só pontua as listas mais próximas), nunca menor que o próprio ranking
+            return ranking, max(total, len(ranking))
+
+    # 1ª etapa (opcional): BM25 pré-seleciona algumas centenas de candidatos.
+    # None = pontuar todos (índice ainda não pronto ou banco pequeno)
+    segmentos = _segmentos_candidatos(modelo)
+    pre_selecionados = None
+    if settings.MATCHING_PREFILTRO_ATIVO:
+        # Quem tem vetor mas não está no índice léxico passa direto (nunca é descartado sem nota)
+        pre_selecionados = indice_lexico.pre_selecionar(
+            vaga, limite=max(settings.MATCHING_PREFILTRO_TOP, top_k), segmentos=segmentos
+        )
+
+    # 2ª etapa: produto com os vetores (só dos pré-selecionados, se houver)
+    ranking, total = pontuar_segmentos(
+        embedding_vaga, segmentos, top_k=top_k, limiar=limiar, restringir_a=pre_selecionados
+    )
+    if pre_selecionados is not None:
+        # O total dos pré-selecionados subestima o banco: estimado por uma amostra de todos,
+        # nunca menor que o que já foi contado de verdade
+        total = max(total, estimar_total(
+            embedding_vaga, segmentos, limiar=limiar, amostra=settings.MATCHING_PREFILTRO_AMOSTRA_TOTAL
+        ))
+    return ranking, total
+
+def _juntar_ao_ranking(ranking, total, novos, embedding_vaga, top_k, limiar):
+    """
+    Junta ao ranking os candidatos recém-codificados ({candidato_id: vetor}).
+    """
+    # O vetor recém-codificado vale mais que uma cópia antiga (ex.: matriz exportada em disco)
+    mantidos = [(cid, score) for cid, score in ranking if cid not in novos]
+    extras = [(cid, similaridade_percentual(embedding_vaga, vetor)) for cid, vetor in novos.items()]
+    extras = [(cid, score) for cid, score in extras if score > limiar]
+    total += len(extras) - (len(ranking) - len(mantidos))
+    # Mesmo critério do _ranquear: score decrescente, empate pela ordem de chegada
+    return sorted(mantidos + extras, key=lambda item: -item[1])[:top_k], total
+
+def ranquear_em_etapas(vaga, top_k=50, limiar=20, pendentes=20, prazo=None):
+    """
+    Radar em etapas (a tela mostra o ranking assim que a 1ª etapa fica pronta):
+    1º pontua quem já tem vetor salvo (só leitura, rápido); depois codifica até `pendentes`
+    perfis novos, em lotes, e junta cada lote ao ranking.
+    Produz (ranking, total acima do limiar, completo) a cada etapa; `completo` só é True
+    na última, e só se todos os perfis novos couberam no `prazo` (os outros vão para o
+    atualizador em segundo plano).
+    """
+    modelo = modelo_ativo()
+    ranking, total = ranquear_candidatos_para_vaga(vaga, top_k=top_k, limiar=limiar)
+    embedding_vaga = vetor_da_vaga(vaga, modelo=modelo)  # já memorizado na 1ª etapa
+    yield ranking, total, False
+
+    completo = True
+    for novos, adiados in codificar_pendentes_em_lotes(pendentes, prazo=prazo):
+        completo = not adiados
+        if novos and embedding_vaga is not None:
+            ranking, total = _juntar_ao_ranking(ranking, total, novos, embedding_vaga, top_k, limiar)
+            yield ranking, total, False
+    yield ranking, total, completo
+
+def ranquear_com_prazo(vaga, top_k=50, limiar=20, prazo_ms=None, pendentes=20):
+    """
+    Radar com prazo: a latência tem teto mesmo com muitos perfis novos sem vetor.
+    Roda as etapas do ranquear_em_etapas até o prazo; o que não coube vai para o
+    atualizador em segundo plano e o ranking volta marcado como incompleto.
+    Retorna (ranking, total acima do limiar, completo).
+    """
+    prazo = time.monotonic() + prazo_ms / 1000 if prazo_ms else None
+    for ranking, total, completo in ranquear_em_etapas(vaga, top_k, limiar, pendentes, prazo=prazo):
+        pass
+    return ranking, total, completo
+
+def _segmentos_candidatos(modelo):
+    """
+    Vetores dos candidatos como lista de segmentos: a matriz exportada em disco
+    (memmap, uma cópia só para todos os workers) ou a matriz em memória do processo.
+    """
+    if settings.MATCHING_MATRIZ_MMAP and matriz_compartilhada_candidatos.disponivel(modelo):
+        return matriz_compartilhada_candidatos.obter(modelo)
+    ids, matriz, escalas = matriz_candidatos.obter(modelo)
+    return [(ids, matriz, escalas, None)]
+
+def ranquear_candidatos_para_vagas(vagas, top_k=10, limiar=20):
+    """
+    Radar em lote: todas as vagas contra TODOS os candidatos em uma única passada
+    (matriz de candidatos x matriz de vagas). Sem índice aproximado nem pré-seleção
+    léxica: a matriz é lida uma vez só para todas as vagas, então a busca é exata.
+    Retorna {vaga_id: (lista de (candidato_id, score), total acima do limiar)}.
+    """
+    modelo = modelo_ativo()
+    vagas = list(vagas)
+    embeddings = vetores_das_vagas(vagas, modelo=modelo)
+    com_vetor = [(vaga, vetor) for vaga, vetor in zip(vagas, embeddings) if vetor is not None]
+    resultado = {vaga.id: ([], 0) for vaga in vagas}
+    if not com_vetor:
+        return resultado
+
+    matriz_vagas = np.vstack([vetor for _, vetor in com_vetor]).astype(np.float32, copy=False)
+    rankings = pontuar_segmentos_lote(matriz_vagas, _segmentos_candidatos(modelo), top_k=top_k, limiar=limiar)
+    for (vaga, _), ranking in zip(com_vetor, rankings):
+        resultado[vaga.id] = ranking
+    return resultado
@@ -0,0 +1,38 @@
+# Arquivo: apps/matching/executor.py
+#
+# Executor LIMITADO para a inferência (torch/onnx) nas views assíncronas (ASGI).
+# O event loop nunca roda o modelo: a chamada vai para uma destas threads e no máximo
+# MATCHING_EXECUTOR_THREADS inferências rodam ao mesmo tempo. As outras requisições
+# esperam na fila do executor sem prender um worker inteiro.
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+executor_inferencia = ThreadPoolExecutor(
+    max_workers=settings.MATCHING_EXECUTOR_THREADS, thread_name_prefix='matching-inferencia'
+)
+
+
+def _com_conexoes_em_dia(func):
+    # Threads do executor ficam fora do ciclo de requisição do Django:
+    # elas mesmas descartam conexões vencidas (CONN_MAX_AGE) antes e depois
+    @functools.wraps(func)
+    def envolvida(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return envolvida
+
+
+def no_executor(func):
+    """
+    Versão aguardável de `func` que roda no executor de inferência:
+        ranking = await no_executor(ranquear_com_prazo)(vaga, top_k=50)
+    """
+    return sync_to_async(_com_conexoes_em_dia(func), thread_sensitive=False, executor=executor_inferencia)
@@ -0,0 +1,218 @@
+# Arquivo: apps/matching/lexico.py
+#
+# 1ª etapa do Radar: pré-seleção LÉXICA (BM25) antes da comparação semântica.
+# Um analista Cobol nunca vai ser o match de uma vaga de UX: em vez de pontuar
+# o banco inteiro com embeddings, um índice invertido em memória (termo -> candidatos)
+# escolhe algumas centenas de candidatos que compartilham termos com a vaga,
+# e só eles passam pelo produto com os vetores.
+#
+# Texto indexado por candidato: o mesmo do get_texto_candidato (resumo, skills, experiências,
+# formações) + headline. Consulta: Vaga.titulo + Vaga.requisitos.
+# Candidato com vetor mas fora do índice (perfil sem termos, ou criado depois da última
+# construção) nunca é descartado: passa direto para a etapa semântica.
+
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from apps.usuarios.models import Candidato, Experiencia, Formacao_Academica, Resumo_Profissional, Skill
+
+PALAVRAS_VAZIAS = set("""
+a ao aos as com como da das de do dos e em na nas no nos o os ou para pela pelas pelo pelos por
+que se sem sob sobre um uma uns umas the and of in to for with on at
+""".split())
+
+
+def termos(texto):
+    """
+    minúsculas, sem acento, sem palavras vazias. Mantém 'c++', 'c#', 'node.js'.
+    """
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return [
+        t.strip('.') for t in re.findall(r'[a-z0-9][a-z0-9+#.]*', texto)
+        if len(t.strip('.')) > 1 and t.strip('.') not in PALAVRAS_VAZIAS
+    ]
+
+
+def texto_da_vaga(vaga):
+    return f"{vaga.titulo} {vaga.requisitos}"
+
+
+class IndiceBM25:
+    """
+    Índice invertido imutável em formato CSR: para cada termo, o trecho
+    [inicio[t]:inicio[t+1]] de `docs`/`pesos` lista os candidatos e o peso BM25
+    já calculado (a consulta vira só somas de arrays).
+    """
+
+    def __init__(self, candidato_ids, vocabulario, inicio, docs, pesos):
+        self.candidato_ids = candidato_ids
+        self.vocabulario = vocabulario
+        self.inicio = inicio
+        self.docs = docs
+        self.pesos = pesos
+
+    def __len__(self):
+        return len(self.candidato_ids)
+
+    @classmethod
+    def construir(cls, documentos, k1=1.2, b=0.75):
+        """
+        documentos = {candidato_id: Counter(termo -> frequência)}
+        """
+        candidato_ids = np.array(sorted(documentos), dtype=np.int64)
+        vocabulario = {}
+        termos_lista, docs_lista, tfs_lista = [], [], []
+        tamanhos = np.zeros(len(candidato_ids), dtype=np.float32)
+        for i, candidato_id in enumerate(candidato_ids):
+            contagem = documentos[int(candidato_id)]
+            tamanhos[i] = sum(contagem.values())
+            for termo, tf in contagem.items():
+                termos_lista.append(vocabulario.setdefault(termo, len(vocabulario)))
+                docs_lista.append(i)
+                tfs_lista.append(tf)
+
+        termo_de = np.array(termos_lista, dtype=np.int32)
+        docs = np.array(docs_lista, dtype=np.int32)
+        tfs = np.array(tfs_lista, dtype=np.float32)
+
+        # Agrupa as postagens por termo (CSR)
+        ordem = np.argsort(termo_de, kind='stable')
+        termo_de, docs, tfs = termo_de[ordem], docs[ordem], tfs[ordem]
+        df = np.bincount(termo_de, minlength=len(vocabulario))
+        inicio = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+
+        # Peso BM25 de cada postagem, calculado uma vez só
+        n = max(len(candidato_ids), 1)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        media = float(tamanhos.mean()) if len(tamanhos) else 1.0
+        normalizacao = k1 * (1 - b + b * tamanhos[docs] / max(media, 1e-6))
+        pesos = idf[termo_de] * tfs * (k1 + 1) / (tfs + normalizacao)
+
+        return cls(candidato_ids, vocabulario, inicio, docs, pesos.astype(np.float32))
+
+    def buscar(self, texto, limite=300):
+        """
+        Retorna os ids (ordenados) dos `limite` candidatos com maior BM25 para o texto.
+        Candidatos sem nenhum termo em comum ficam de fora.
+        """
+        indices = [self.vocabulario[t] for t in set(termos(texto)) if t in self.vocabulario]
+        if not indices:
+            return np.empty(0, dtype=np.int64)
+
+        scores = np.zeros(len(self.candidato_ids), dtype=np.float32)
+        for t in indices:
+            trecho = slice(self.inicio[t], self.inicio[t + 1])
+            scores[self.docs[trecho]] += self.pesos[trecho]  # um candidato aparece 1x por termo
+
+        candidatos = np.flatnonzero(scores)
+        if len(candidatos) > limite:
+            candidatos = candidatos[np.argpartition(-scores[candidatos], limite - 1)[:limite]]
+        return np.sort(self.candidato_ids[candidatos])
+
+
+class IndiceLexicoCandidatos:
+    """
+    Mantém, por processo, o IndiceBM25 dos candidatos.
+    A (re)construção roda em uma thread: enquanto isso o índice anterior continua
+    atendendo, e sem índice nenhum o Radar simplesmente pontua todo mundo.
+    """
+
+    def __init__(self):
+        self._indice = None
+        self._carimbo = None
+        self._verificado_em = 0.0
+        self._construido_em = 0.0
+        self._construindo = False
+        self._lock = threading.Lock()
+
+    def _carimbo_atual(self):
+        # Sem data de alteração nessas tabelas: contagem + maior id detectam inclusões/remoções,
+        # e o índice é refeito de qualquer forma a cada MATCHING_LEXICO_TTL_S (edições de texto)
+        carimbo = []
+        for classe in (Skill, Experiencia, Formacao_Academica, Resumo_Profissional):
+            resumo = classe.objects.aggregate(total=Count('id'), ultimo=Max('id'))
+            carimbo.extend((resumo['total'], resumo['ultimo']))
+        return tuple(carimbo)
+
+    def _documentos(self):
+        documentos = {}
+
+        def indexar(consulta, montar):
+            for candidato_id, *campos in consulta.iterator(chunk_size=5000):
+                documentos.setdefault(candidato_id, Counter()).update(termos(montar(*campos)))
+
+        indexar(Candidato.objects.values_list('pk', 'headline'), lambda headline: headline or '')
+        indexar(Resumo_Profissional.objects.values_list('candidato_id', 'texto'), lambda texto: texto or '')
+        indexar(Skill.objects.values_list('candidato_id', 'nome'), lambda nome: nome)
+        indexar(
+            Experiencia.objects.values_list('candidato_id', 'cargo', 'empresa', 'descricao'),
+            lambda cargo, empresa, descricao: f"{cargo} {empresa} {descricao or ''}",
+        )
+        indexar(
+            Formacao_Academica.objects.values_list('candidato_id', 'nome_formacao', 'nome_instituicao'),
+            lambda formacao, instituicao: f"{formacao} {instituicao}",
+        )
+        return {cid: contagem for cid, contagem in documentos.items() if contagem}
+
+    def _reconstruir(self, carimbo):
+        try:
+            inicio = time.perf_counter()
+            indice = IndiceBM25.construir(self._documentos())
+            with self._lock:
+                self._indice, self._carimbo = indice, carimbo
+            print(f"Índice léxico do Radar: {len(indice)} candidatos em {time.perf_counter() - inicio:.1f}s")
+        except Exception as e:
+            print(f"Erro ao construir o índice léxico: {e}")
+        finally:
+            self._construindo = False
+            connection.close()
+
+    def obter(self):
+        """
+        Retorna o índice atual (ou None se ainda não existe) e dispara a reconstrução se preciso.
+        """
+        agora = time.monotonic()
+        if agora - self._verificado_em >= settings.MATCHING_LEXICO_VERIFICAR_S and not self._construindo:
+            self._verificado_em = agora
+            carimbo = self._carimbo_atual()
+            vencido = agora - self._construido_em >= settings.MATCHING_LEXICO_TTL_S
+            if carimbo != self._carimbo or vencido:
+                self._construindo = True
+                self._construido_em = agora
+                threading.Thread(target=self._reconstruir, args=(carimbo,), daemon=True).start()
+        return self._indice
+
+    def pre_selecionar(self, vaga, limite, segmentos=None):
+        """
+        ids dos candidatos que passam para a etapa semântica, ou None = pontuar todos
+        (índice ainda não pronto, banco pequeno, ou nenhum termo da vaga conhecido).
+        segmentos: os vetores que vão ser pontuados (ver matriz.pontuar_segmentos);
+        os candidatos deles que não estão no índice entram sempre.
+        """
+        indice = self.obter()
+        if indice is None or len(indice) < settings.MATCHING_PREFILTRO_MINIMO:
+            return None
+        ids = indice.buscar(texto_da_vaga(vaga), limite=limite)
+        if not len(ids):
+            return None
+        if segmentos is not None and len(indice.candidato_ids):
+            com_vetor = np.concatenate([ids_segmento for ids_segmento, _, _, _ in segmentos])
+            # Busca binária (candidato_ids está ordenado): bem mais rápido que setdiff1d no banco todo
+            posicoes = np.minimum(np.searchsorted(indice.candidato_ids, com_vetor), len(indice.candidato_ids) - 1)
+            fora_do_indice = com_vetor[indice.candidato_ids[posicoes] != com_vetor]
+            if len(fora_do_indice):
+                ids = np.union1d(ids, fora_do_indice)
+        return ids
+
+
+# Instância única por processo
+indice_lexico = IndiceLexicoCandidatos()
@@ -0,0 +1,72 @@
+# Arquivo: apps/matching/lotes.py
+#
+# Micro-lotes: várias threads pedem embeddings ao mesmo tempo e, em vez de cada
+# uma rodar seu próprio `encode` (disputando a CPU), os pedidos são juntados em
+# uma única passada do modelo e os resultados devolvidos a quem pediu.
+# Usado pelo servidor de embeddings e, opcionalmente, dentro de cada worker.
+
+import queue
+import threading
+import time
+
+
+class _Pedido:
+    def __init__(self, textos):
+        self.textos = textos
+        self.vetores = None
+        self.erro = None
+        self.pronto = threading.Event()
+
+
+class FilaDeLotes:
+    """
+    Junta pedidos concorrentes: espera até `janela_ms` (ou até `lote_max` textos)
+    e roda uma única passada do modelo para todos eles.
+
+    `funcao_codificar(textos, batch_size)` é quem realmente chama o modelo.
+    """
+
+    def __init__(self, funcao_codificar, janela_ms=5, lote_max=64):
+        self.funcao_codificar = funcao_codificar
+        self.janela = janela_ms / 1000
+        self.lote_max = lote_max
+        self._fila = queue.Queue()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def codificar(self, textos):
+        pedido = _Pedido(textos)
+        self._fila.put(pedido)
+        pedido.pronto.wait()
+        if pedido.erro is not None:
+            raise pedido.erro
+        return pedido.vetores
+
+    def _loop(self):
+        while True:
+            pedidos = [self._fila.get()]
+            total = len(pedidos[0].textos)
+            limite = time.monotonic() + self.janela
+            while total < self.lote_max:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                pedidos.append(pedido)
+                total += len(pedido.textos)
+
+            try:
+                textos = [t for p in pedidos for t in p.textos]
+                vetores = self.funcao_codificar(textos, batch_size=self.lote_max)
+                inicio = 0
+                for p in pedidos:
+                    p.vetores = vetores[inicio:inicio + len(p.textos)]
+                    inicio += len(p.textos)
+            except Exception as e:
+                for p in pedidos:
+                    p.erro = e
+            finally:
+                for p in pedidos:
+                    p.pronto.set()
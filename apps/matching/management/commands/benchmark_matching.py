@@ -0,0 +1,217 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.matching import backend_onnx, engine, paralelo
+from apps.matching.ann import IndiceIVF
+from apps.matching.lotes import FilaDeLotes
+from apps.matching.matriz import matriz_candidatos
+from apps.matching.quantizacao import desquantizar_matriz, produto_matriz_vetor, quantizar_matriz
+from apps.usuarios.models import Candidato
+from apps.vagas.models import Vaga
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import numpy as np
+import time
+
+def gerar_vetores_sinteticos(total, dimensao=512, areas=20, semente=7):
+    """
+    Vetores normalizados em dois níveis, parecidos com perfis reais: áreas ("tecnologia")
+    e, dentro delas, MUITAS especialidades ("Dev Python", "Dev Java"...) com ~10 perfis cada.
+    Com menos especialidades que listas do IVF, cada uma cabe inteira em uma lista e o
+    recall fica perto de 1 até com 1 sonda (o benchmark não mostraria nada).
+    """
+    rng = np.random.default_rng(semente)
+    centros = rng.standard_normal((areas, dimensao)).astype(np.float32)
+    especialidades = max(total // 10, areas)
+    especialidades = (
+        centros[rng.integers(0, areas, especialidades)]
+        + 0.8 * rng.standard_normal((especialidades, dimensao)).astype(np.float32)
+    )
+    matriz = (
+        especialidades[rng.integers(0, len(especialidades), total)]
+        + rng.standard_normal((total, dimensao)).astype(np.float32)
+    )
+    matriz /= np.linalg.norm(matriz, axis=1, keepdims=True)
+    return np.arange(1, total + 1, dtype=np.int64), matriz
+
+def textos_de_exemplo(total):
+    """
+    Textos reais do banco (vagas e candidatos do seed), repetidos até `total`.
+    """
+    textos = [engine.get_texto_vaga(v) for v in Vaga.objects.all()[:200]]
+    candidatos = Candidato.objects.prefetch_related('skills', 'experiencias', 'formacoes')[:200]
+    textos += [engine.get_texto_candidato(c) for c in candidatos]
+    textos = [t for t in textos if t] or ['Desenvolvedor Python com experiência em Django e SQL']
+    return [textos[i % len(textos)] for i in range(total)]
+
+def percentis_ms(tempos):
+    tempos = np.array(tempos) * 1000
+    return np.percentile(tempos, 50), np.percentile(tempos, 95)
+
+class Command(BaseCommand):
+    help = 'Mede latência e qualidade das estratégias de matching (índice ANN, micro-lotes, quantização, backends)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modo', choices=['ann', 'concorrencia', 'quantizacao', 'backends'], default='ann')
+        parser.add_argument('--threads', type=int, default=8, help='(concorrencia) requisições simultâneas')
+        parser.add_argument('--textos', type=int, default=4, help='(concorrencia) textos por requisição')
+        parser.add_argument('--lote', type=int, default=32, help='(backends) textos por passada do modelo')
+        parser.add_argument('--sintetico', type=int, default=0, help='Usa N vetores sintéticos em vez do banco')
+        parser.add_argument('--consultas', type=int, default=100)
+        parser.add_argument('--top-k', type=int, default=50)
+        parser.add_argument('--sondas', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+
+    def handle(self, *args, **options):
+        if options['modo'] == 'concorrencia':
+            return self.benchmark_concorrencia(options)
+        if options['modo'] == 'quantizacao':
+            return self.benchmark_quantizacao(options)
+        if options['modo'] == 'backends':
+            return self.benchmark_backends(options)
+        self.benchmark_ann(options)
+
+    def carregar_vetores(self, options):
+        if options['sintetico']:
+            return gerar_vetores_sinteticos(options['sintetico'])
+        ids, matriz, escalas = matriz_candidatos.obter(engine.modelo_ativo())
+        if len(ids) == 0:
+            raise CommandError('Nenhum vetor disponível. Use --sintetico N para testar sem banco.')
+        return ids, desquantizar_matriz(matriz, escalas)
+
+    def consultas_de_teste(self, matriz, total):
+        rng = np.random.default_rng(0)
+        # Consultas: perfis existentes com ruído (simula vagas parecidas com o banco)
+        consultas = matriz[rng.integers(0, len(matriz), total)]
+        consultas = consultas + 0.5 * rng.standard_normal(consultas.shape).astype(np.float32) / np.sqrt(matriz.shape[1])
+        return consultas / np.linalg.norm(consultas, axis=1, keepdims=True)
+
+    def benchmark_quantizacao(self, options):
+        """
+        Memória, latência e concordância do ranking (float16/int8 x float32).
+        """
+        ids, matriz = self.carregar_vetores(options)
+        top_k = min(options['top_k'], len(ids))
+        consultas = self.consultas_de_teste(matriz, options['consultas'])
+        self.stdout.write(f'📊 {len(ids)} vetores, {len(consultas)} consultas, top-{top_k}')
+
+        referencia = [matriz @ q for q in consultas]
+        topo_ref = [set(np.argpartition(-s, top_k - 1)[:top_k].tolist()) for s in referencia]
+
+        for formato in ['f32', 'f16', 'i8']:
+            compacta, escalas = quantizar_matriz(matriz, formato)
+            tempos, concordancia, erro_max = [], [], 0.0
+            for q, ref, topo in zip(consultas, referencia, topo_ref):
+                t = time.perf_counter()
+                scores = produto_matriz_vetor(compacta, escalas, q)
+                tempos.append(time.perf_counter() - t)
+                concordancia.append(len(topo & set(np.argpartition(-scores, top_k - 1)[:top_k].tolist())) / top_k)
+                # Diferença em pontos percentuais no score exibido (0 a 100)
+                erro_max = max(erro_max, float(np.abs(scores - ref).max()) * 100)
+            p50, p95 = percentis_ms(tempos)
+            memoria = (compacta.nbytes + (escalas.nbytes if formato == 'i8' else 0)) / 1024 / 1024
+            self.stdout.write(
+                f'{formato:<4} {memoria:8.1f}MB  p50={p50:7.2f}ms  p95={p95:7.2f}ms  '
+                f'top-{top_k} igual ao f32={np.mean(concordancia):.3f}  erro máx={erro_max:.2f} p.p.'
+            )
+
+    def benchmark_concorrencia(self, options):
+        """
+        Várias threads codificando ao mesmo tempo: cada uma com seu encode x micro-lotes.
+        """
+        if engine.get_modelo() is None:
+            raise CommandError('Modelo de IA não carregado.')
+
+        n_threads, por_req = options['threads'], options['textos']
+        pedidos = [
+            textos_de_exemplo(por_req * options['consultas'])[i:i + por_req]
+            for i in range(0, por_req * options['consultas'], por_req)
+        ]
+        engine.codificar_no_modelo(pedidos[0])  # aquecimento
+
+        def medir(funcao):
+            latencias = []
+            def uma(textos):
+                t = time.perf_counter()
+                funcao(textos)
+                latencias.append(time.perf_counter() - t)
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(n_threads) as executor:
+                list(executor.map(uma, pedidos))
+            return time.perf_counter() - inicio, latencias
+
+        self.stdout.write(f'📊 {len(pedidos)} requisições de {por_req} textos, {n_threads} threads')
+        for nome, funcao in [
+            ('Encode por requisição', engine.codificar_no_modelo),
+            ('Micro-lotes (5ms)', FilaDeLotes(engine.codificar_no_modelo, janela_ms=5).codificar),
+        ]:
+            duracao, latencias = medir(funcao)
+            p50, p95 = percentis_ms(latencias)
+            vazao = len(pedidos) * por_req / duracao
+            self.stdout.write(f'{nome:<22} {vazao:8.1f} textos/s  p50={p50:7.1f}ms  p95={p95:7.1f}ms')
+
+    def benchmark_ann(self, options):
+        ids, matriz = self.carregar_vetores(options)
+        top_k = min(options['top_k'], len(ids))
+        consultas = self.consultas_de_teste(matriz, options['consultas'])
+
+        self.stdout.write(f'📊 {len(ids)} vetores, {len(consultas)} consultas, top-{top_k}')
+
+        # 1. Busca exata (referência)
+        exatos, tempos = [], []
+        for q in consultas:
+            t = time.perf_counter()
+            scores = matriz @ q
+            melhores = np.argpartition(-scores, top_k - 1)[:top_k]
+            tempos.append(time.perf_counter() - t)
+            exatos.append(set(ids[melhores].tolist()))
+        p50, p95 = percentis_ms(tempos)
+        self.stdout.write(f'Exato            p50={p50:7.2f}ms  p95={p95:7.2f}ms  recall=1.000')
+
+        # 2. Índice IVF com diferentes números de sondas
+        t = time.perf_counter()
+        indice = IndiceIVF()
+        indice.construir(ids, matriz)
+        self.stdout.write(f'IVF construído em {time.perf_counter() - t:.1f}s ({indice.n_listas} listas)')
+
+        for sondas in options['sondas']:
+            tempos, recalls = [], []
+            for q, esperado in zip(consultas, exatos):
+                t = time.perf_counter()
+                encontrados, _ = indice.buscar(q, top_k=top_k, n_sondas=sondas)
+                tempos.append(time.perf_counter() - t)
+                recalls.append(len(esperado & set(encontrados.tolist())) / top_k)
+            p50, p95 = percentis_ms(tempos)
+            self.stdout.write(
+                f'IVF sondas={sondas:<4} p50={p50:7.2f}ms  p95={p95:7.2f}ms  recall={np.mean(recalls):.3f}'
+            )
+
+    def benchmark_backends(self, options):
+        """
+        torch x onnxruntime (fp32 e int8) com os textos do banco. Cada backend roda
+        em um processo novo, para a memória e o tempo de import serem medidos do zero.
+        """
+        # Mesmo modelo nos três runtimes, qualquer que seja o runtime do id ativo
+        modelo, _, _ = engine.ler_id_do_modelo(engine.modelo_ativo())
+        pasta = engine.caminho_onnx(modelo)
+        textos = textos_de_exemplo(max(options['consultas'], options['lote']))
+
+        backends = [('torch', modelo)]
+        if backend_onnx.existe_onnx(pasta):
+            backends.append(('onnx', pasta))
+            if (pasta / backend_onnx.ARQUIVO_INT8).exists():
+                backends.append(('onnx-int8', pasta))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️ Sem exportação ONNX em {pasta}: rode `manage.py exportar_onnx --int8`.'))
+
+        self.stdout.write(f'📊 {modelo}: {len(textos)} textos, lotes de {options["lote"]}')
+        contexto = multiprocessing.get_context('spawn')
+        referencia = None
+        for backend, origem in backends:
+            with contexto.Pool(1) as pool:
+                r = pool.apply(paralelo.medir_backend, (backend, str(origem), textos, options['lote']))
+            if referencia is None:
+                referencia = r['vetores']
+            cosseno = float(np.sum(referencia * r['vetores'], axis=1).min())
+            p50, p95 = percentis_ms(r['latencias'])
+            self.stdout.write(
+                f'{backend:<10} import={r["import_s"]:5.2f}s  carga={r["carga_s"]:5.2f}s  RSS=+{r["rss_mb"]:6.0f}MB  '
+                f'1 texto p50={p50:6.1f}ms p95={p95:6.1f}ms  {r["vazao"]:7.1f} textos/s  cosseno mín.={cosseno:.4f}'
+            )
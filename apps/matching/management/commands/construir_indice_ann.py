@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from apps.matching import ann
+from apps.matching.engine import caminho_indice_ann, id_do_modelo, modelo_ativo
+import time
+
+class Command(BaseCommand):
+    help = 'Constrói (ou reconstrói) o índice aproximado IVF dos embeddings de candidatos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listas', type=int, default=None, help='Número de grupos (padrão: raiz de N)')
+        parser.add_argument('--sondas', type=int, default=settings.MATCHING_ANN_SONDAS, help='Grupos visitados por busca')
+        parser.add_argument('--iteracoes', type=int, default=10, help='Iterações do k-means')
+        parser.add_argument('--modelo', default=None, help='Padrão: o modelo ativo (informe o novo para preparar a troca)')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        modelo = id_do_modelo(options['modelo']) if options['modelo'] else modelo_ativo()
+
+        caminho = caminho_indice_ann(modelo)
+        self.stdout.write(f'🧠 Construindo índice IVF de {modelo}...')
+        indice = ann.reconstruir(
+            modelo, caminho, n_listas=options['listas'], n_sondas=options['sondas'], n_iter=options['iteracoes']
+        )
+        if indice is None:
+            raise CommandError('Nenhum embedding de candidato salvo. Abra o Radar ou gere os vetores antes.')
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Índice salvo em {caminho} ({len(indice)} candidatos, {indice.n_listas} listas, {duracao:.1f}s).'
+        ))
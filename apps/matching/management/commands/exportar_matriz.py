@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from apps.matching.compartilhada import TIPOS, exportar
+from apps.matching.engine import id_do_modelo, modelo_ativo
+import time
+
+class Command(BaseCommand):
+    help = 'Exporta os embeddings para arquivos .npy lidos via memmap pelos workers (mescla o delta na base)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', choices=[*TIPOS, 'todos'], default='todos', help='Quais embeddings exportar')
+        parser.add_argument('--formato', choices=['f32', 'f16', 'i8'], default=settings.MATCHING_FORMATO_MATRIZ)
+        parser.add_argument('--modelo', default=None, help='Padrão: o modelo ativo (informe o novo para preparar a troca)')
+
+    def handle(self, *args, **options):
+        modelo = id_do_modelo(options['modelo']) if options['modelo'] else modelo_ativo()
+        tipos = list(TIPOS) if options['tipo'] == 'todos' else [options['tipo']]
+        for tipo in tipos:
+            inicio = time.perf_counter()
+            total = exportar(tipo, modelo, formato=options['formato'])
+            duracao = time.perf_counter() - inicio
+            if total == 0:
+                self.stdout.write(self.style.WARNING(f'⚠️ Nenhum embedding de {tipo} salvo. Nada exportado.'))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {total} vetores de {tipo} exportados ({options["formato"]}, {duracao:.1f}s).'
+            ))
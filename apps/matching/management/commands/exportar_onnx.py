@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.matching import backend_onnx
+from apps.matching.engine import caminho_onnx, ler_id_do_modelo, modelo_ativo
+import numpy as np
+import time
+
+TEXTOS_VERIFICACAO = [
+    'Desenvolvedor Python com experiência em Django, APIs REST e PostgreSQL',
+    'Analista de dados júnior: SQL, Power BI e Excel avançado',
+    'Vaga para engenheiro de software sênior em Java e microsserviços na AWS',
+    'Formação em Administração na USP. Habilidades: liderança, negociação',
+]
+
+class Command(BaseCommand):
+    help = 'Exporta o modelo de embeddings para ONNX (backend onnxruntime), com versão int8 opcional'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modelo', default=None, help='Padrão: o modelo ativo')
+        parser.add_argument('--int8', action='store_true', help='Gera também a versão com quantização dinâmica int8')
+        parser.add_argument('--opset', type=int, default=14)
+
+    def handle(self, *args, **options):
+        # Exporta o modelo em si: o runtime do id ativo (se houver) não importa aqui
+        modelo, _, _ = ler_id_do_modelo(options['modelo'] or modelo_ativo())
+        pasta = caminho_onnx(modelo)
+
+        self.stdout.write(f'🧠 Exportando {modelo} para {pasta}...')
+        inicio = time.perf_counter()
+        try:
+            backend_onnx.exportar_onnx(modelo, pasta, opset=options['opset'])
+            if options['int8']:
+                backend_onnx.quantizar_onnx(pasta)
+        except ImportError as e:
+            raise CommandError(f'Dependência ausente ({e}). Instale: pip install onnx onnxruntime')
+        self.stdout.write(f'   exportado em {time.perf_counter() - inicio:.1f}s')
+
+        # Confere se o ONNX gera os mesmos vetores que o torch
+        from sentence_transformers import SentenceTransformer
+        referencia = SentenceTransformer(modelo, device='cpu').encode(
+            TEXTOS_VERIFICACAO, convert_to_numpy=True, normalize_embeddings=True
+        )
+        for quantizado in ([False, True] if options['int8'] else [False]):
+            onnx = backend_onnx.ModeloONNX(pasta, quantizado=quantizado)
+            vetores = onnx.encode(TEXTOS_VERIFICACAO, normalize_embeddings=True)
+            cossenos = np.sum(referencia * vetores, axis=1)
+            self.stdout.write(
+                f'   {onnx.arquivo.name:<18} cosseno com o torch: mín={cossenos.min():.4f} '
+                f'(diferença máx. no score: {(1 - cossenos.min()) * 100:.2f} p.p.)'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Pronto. O runtime faz parte do id do modelo: troque como qualquer modelo\n'
+            f'   python manage.py modelo_embeddings sombra {modelo}@onnx{"-int8" if options["int8"] else ""}\n'
+            f'   (depois reembed --modelo e ativar; MATCHING_BACKEND=onnx vale para ids sem @runtime)'
+        ))
@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from apps.matching import vetores
+from apps.matching.engine import id_do_modelo, ler_id_do_modelo, modelo_ativo
+from apps.matching.models import (
+    EmbeddingCandidato, EmbeddingSecao, EmbeddingSkill, EmbeddingVaga, RecomendacoesCandidato, VersaoModelo,
+)
+
+class Command(BaseCommand):
+    help = 'Troca o modelo de IA sem downtime: registra o modelo sombra, confere a cobertura e ativa'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['status', 'sombra', 'ativar', 'limpar'])
+        parser.add_argument('nome', nargs='?', help='Nome do modelo (sentence-transformers), com o runtime: '
+                                                    '<nome>@onnx ou <nome>@onnx-int8 (sem @, o MATCHING_BACKEND)')
+        parser.add_argument('--forcar', action='store_true', help='Ativa mesmo sem 100%% de cobertura')
+
+    def handle(self, *args, **options):
+        acao, nome = options['acao'], options['nome']
+        if acao in ('sombra', 'ativar') and not nome:
+            raise CommandError(f'Informe o nome do modelo: manage.py modelo_embeddings {acao} <nome>')
+        if nome:
+            nome = id_do_modelo(nome)
+            try:
+                ler_id_do_modelo(nome)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if acao == 'status':
+            self.status()
+        elif acao == 'sombra':
+            self.sombra(nome)
+        elif acao == 'ativar':
+            self.ativar(nome, options['forcar'])
+        else:
+            self.limpar()
+
+    def status(self):
+        atual = modelo_ativo()
+        self.stdout.write(f'Modelo ativo: {atual}')
+        for versao in VersaoModelo.objects.exclude(nome=atual).exclude(status='aposentado'):
+            self.stdout.write(f'  {versao}')
+            self.mostrar_cobertura(versao.nome, atual)
+
+        contagens = EmbeddingCandidato.objects.values('modelo').annotate(total=Count('id'))
+        for linha in contagens:
+            self.stdout.write(f"  vetores de candidatos em {linha['modelo']}: {linha['total']}")
+
+    def mostrar_cobertura(self, novo, atual):
+        cobertura = vetores.cobertura(novo, atual)
+        for tipo, (faltando, total) in cobertura.items():
+            percentual = 100 * (total - faltando) / total if total else 100
+            self.stdout.write(f'    {tipo}: {total - faltando}/{total} ({percentual:.1f}%)')
+        return sum(faltando for faltando, _ in cobertura.values())
+
+    def sombra(self, nome):
+        versao, criada = VersaoModelo.objects.get_or_create(nome=nome)
+        if versao.status == 'ativo':
+            raise CommandError(f'{nome} já é o modelo ativo.')
+        versao.status = 'sombra'
+        versao.save()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {nome} registrado como sombra. Gere os vetores sem afetar o site com:\n'
+            f'   python manage.py reembed --modelo {nome}\n'
+            f'   python manage.py exportar_matriz --modelo {nome}  (opcional, deixa a matriz pronta)'
+        ))
+
+    def ativar(self, nome, forcar):
+        atual = modelo_ativo()
+        if nome == atual:
+            raise CommandError(f'{nome} já é o modelo ativo.')
+
+        self.stdout.write(f'Cobertura de {nome} em relação a {atual}:')
+        faltando = self.mostrar_cobertura(nome, atual)
+        if faltando and not forcar:
+            raise CommandError(
+                f'Ainda faltam {faltando} vetores. Rode `manage.py reembed --modelo {nome}` '
+                f'(ou use --forcar para ativar assim mesmo).'
+            )
+
+        # Troca atômica: os workers passam a usar o novo modelo na próxima checagem
+        with transaction.atomic():
+            VersaoModelo.objects.filter(status='ativo').update(status='aposentado')
+            VersaoModelo.objects.get_or_create(nome=atual, defaults={'status': 'aposentado'})
+            VersaoModelo.objects.update_or_create(
+                nome=nome, defaults={'status': 'ativo', 'ativado_em': timezone.now()}
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {nome} ativo. Os vetores de {atual} foram mantidos (para voltar: ativar {atual}); '
+            f'apague-os com `manage.py modelo_embeddings limpar` quando tiver certeza.'
+        ))
+
+    def limpar(self):
+        aposentados = list(VersaoModelo.objects.filter(status='aposentado').values_list('nome', flat=True))
+        if not aposentados:
+            self.stdout.write('Nenhum modelo aposentado.')
+            return
+        candidatos, _ = EmbeddingCandidato.objects.filter(modelo__in=aposentados).delete()
+        vagas, _ = EmbeddingVaga.objects.filter(modelo__in=aposentados).delete()
+        secoes, _ = EmbeddingSecao.objects.filter(modelo__in=aposentados).delete()
+        skills, _ = EmbeddingSkill.objects.filter(modelo__in=aposentados).delete()
+        RecomendacoesCandidato.objects.filter(modelo__in=aposentados).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'🧹 Removidos {candidatos} vetores de candidatos ({secoes} de seções), {vagas} de vagas e {skills} de skills '
+            f'({", ".join(aposentados)}).'
+        ))
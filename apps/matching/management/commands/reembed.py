@@ -0,0 +1,231 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connections
+from apps.usuarios.models import Candidato
+from apps.vagas.models import Vaga
+from apps.matching import paralelo, secoes, skills, vetores
+from apps.matching.engine import (
+    chave_candidato, codificar_textos, get_texto_vaga, id_do_modelo, modelo_ativo, opcoes_do_modelo,
+)
+from apps.matching.models import EmbeddingCandidato, EmbeddingVaga
+from collections import deque
+import json
+import multiprocessing
+import os
+import time
+
+def chave_vaga(vaga):
+    texto = get_texto_vaga(vaga)
+    return texto, (vetores.hash_texto(texto) if texto else None), []
+
+# tipo -> (queryset de origem, função (texto ou seções, hash, skills), tabela de vetores, campo do dono)
+FONTES = {
+    'candidatos': (
+        lambda: Candidato.objects.select_related('resumo_profissional')
+                .prefetch_related('skills', 'experiencias', 'formacoes'),
+        chave_candidato, EmbeddingCandidato, 'candidato_id',
+    ),
+    'vagas': (
+        lambda: Vaga.objects.all(),
+        chave_vaga, EmbeddingVaga, 'vaga_id',
+    ),
+}
+
+class Command(BaseCommand):
+    help = 'Recalcula os embeddings de todos os candidatos e vagas em paralelo (retomável)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', choices=[*FONTES, 'todos'], default='todos')
+        parser.add_argument('--modelo', default=None,
+                            help='Modelo que vai gerar os vetores (padrão: o ativo; sem @runtime, usa o MATCHING_BACKEND). '
+                                 'Um modelo novo é gravado '
+                                 'ao lado do atual, que continua em uso até `modelo_embeddings ativar`')
+        parser.add_argument('--lote', type=int, default=256, help='Perfis por tarefa enviada ao pool')
+        parser.add_argument('--processos', type=int, default=None,
+                            help='Processos do pool (padrão: núcleos disponíveis)')
+        parser.add_argument('--forcar', action='store_true', help='Recodifica mesmo se o texto não mudou')
+        parser.add_argument('--reiniciar', action='store_true', help='Ignora o checkpoint e começa do zero')
+
+    def handle(self, *args, **options):
+        self.modelo = id_do_modelo(options['modelo']) if options['modelo'] else modelo_ativo()
+        self.caminho_checkpoint = settings.MATCHING_DIR / f"reembed_{self.modelo}.json"
+        self.checkpoint = {} if options['reiniciar'] else self.ler_checkpoint()
+
+        nucleos = paralelo.nucleos_disponiveis()
+        processos = max(1, options['processos'] or nucleos)
+        threads = max(1, nucleos // processos)
+
+        # O runtime vem do id do modelo, como na engine: vetores offline e online do mesmo
+        # modelo saem sempre do mesmo runtime
+        try:
+            opcoes = opcoes_do_modelo(self.modelo)
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+        if processos == 1:
+            pool = None
+            paralelo.inicializar_processo(opcoes, threads)
+        else:
+            # Fecha as conexões antes de criar os processos: os filhos não usam o banco
+            connections.close_all()
+            pool = multiprocessing.get_context('spawn').Pool(
+                processos, initializer=paralelo.inicializar_processo, initargs=(opcoes, threads)
+            )
+
+        runtime = 'onnxruntime' if opcoes['pasta_onnx'] else 'torch'
+        self.stdout.write(
+            f'🧠 Recodificando com {self.modelo} [{runtime}] ({processos} processo(s) x {threads} thread(s))...'
+        )
+        try:
+            tipos = list(FONTES) if options['tipo'] == 'todos' else [options['tipo']]
+            if 'candidatos' in tipos and self.por_secao('candidatos'):
+                self.codificar_skills(pool, options['lote'])
+            for tipo in tipos:
+                self.recodificar(tipo, pool, processos, options['lote'], options['forcar'])
+        except KeyboardInterrupt:
+            raise CommandError('Interrompido. Rode de novo para continuar do último checkpoint.')
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        # Terminou tudo: a próxima execução começa do zero
+        self.caminho_checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Concluído. Atualize os arquivos do Radar: `manage.py exportar_matriz` e `manage.py construir_indice_ann`.'
+        ))
+
+    def ler_checkpoint(self):
+        if self.caminho_checkpoint.exists():
+            return json.loads(self.caminho_checkpoint.read_text())
+        return {}
+
+    def salvar_checkpoint(self):
+        self.caminho_checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.caminho_checkpoint.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.checkpoint))
+        os.replace(tmp, self.caminho_checkpoint)
+
+    def codificar_skills(self, pool, tamanho):
+        """
+        Cache global de skills: cada nome ainda sem vetor é codificado uma vez, antes dos perfis.
+        """
+        nomes = skills.nomes_sem_vetor(self.modelo)
+        lotes = [nomes[i:i + tamanho] for i in range(0, len(nomes), tamanho)]
+        if pool is not None:
+            resultados = [r.get() for r in [pool.apply_async(paralelo.codificar_lote, (l, l)) for l in lotes]]
+        else:
+            resultados = [paralelo.codificar_lote(l, l) for l in lotes]
+        for lote, matriz in resultados:
+            skills.salvar_vetores(dict(zip(lote, matriz)), self.modelo)
+        self.stdout.write(f'   skills: {len(nomes)} nomes novos codificados')
+
+    def lotes(self, tipo, tamanho, forcar):
+        """
+        Lê os perfis em ordem de pk, a partir do checkpoint, e gera
+        (último pk do lote, perfis lidos, [(id, chave)], ids e textos que vão para o modelo)
+        só com o que precisa recodificar. Por seção, os "ids" são (candidato_id, chave da seção, hash).
+        """
+        consulta = FONTES[tipo][0]
+        inicio = self.checkpoint.get(tipo, 0)
+        registros = consulta().filter(pk__gt=inicio).order_by('pk').iterator(chunk_size=tamanho)
+
+        atual = []
+        for registro in registros:
+            atual.append(registro)
+            if len(atual) == tamanho:
+                yield self.preparar(tipo, atual, forcar)
+                atual = []
+        if atual:
+            yield self.preparar(tipo, atual, forcar)
+
+    def preparar(self, tipo, registros, forcar):
+        _, chave_de, tabela, campo_id = FONTES[tipo]
+        chaves = {r.pk: chave_de(r) for r in registros}
+        chaves = {pk: chave for pk, chave in chaves.items() if chave[1] is not None}
+        hashes = {pk: chave[1] for pk, chave in chaves.items()}
+
+        if not forcar:
+            # Texto igual ao do vetor salvo: não precisa rodar o modelo
+            salvos = dict(tabela.objects.filter(
+                **{f'{campo_id}__in': list(hashes)}, modelo=self.modelo
+            ).values_list(campo_id, 'hash_texto'))
+            em_dia = [pk for pk, h in hashes.items() if salvos.get(pk) == h]
+            hashes = {pk: h for pk, h in hashes.items() if salvos.get(pk) != h}
+            # Marcado pelos signals, mas o texto não mudou: o vetor salvo continua valendo
+            tabela.objects.filter(
+                **{f'{campo_id}__in': em_dia}, modelo=self.modelo, desatualizado=True
+            ).update(desatualizado=False)
+
+        itens = [(pk, chaves[pk]) for pk in hashes]
+        if not self.por_secao(tipo):
+            ids = list(hashes)
+            return registros[-1].pk, len(registros), itens, ids, [chaves[pk][0] for pk in ids]
+
+        # Só as seções novas/alteradas vão para o modelo (com --forcar, todas)
+        salvas = {} if forcar else vetores.buscar_secoes(list(hashes), self.modelo)
+        faltando = [
+            item for pk in hashes
+            for item in secoes.secoes_faltando(pk, chaves[pk][0], salvas.get(pk, {}))
+        ]
+        ids = [(pk, chave, hash_secao) for pk, chave, hash_secao, _ in faltando]
+        return registros[-1].pk, len(registros), itens, ids, [texto for *_, texto in faltando]
+
+    def por_secao(self, tipo):
+        return tipo == 'candidatos' and settings.MATCHING_VETOR_POR_SECAO
+
+    def gravar(self, tipo, itens, ids, matriz):
+        """
+        itens = [(id, chave)]; `matriz` tem os vetores dos textos de `ids`.
+        Candidatos por seção: grava as seções e monta o vetor final com as já salvas.
+        """
+        if self.por_secao(tipo):
+            vetores.salvar_secoes([(pk, chave, h, v) for (pk, chave, h), v in zip(ids, matriz)], self.modelo)
+            # Skill cadastrada depois do codificar_skills: codifica aqui mesmo (raro)
+            secoes.montar_vetores(
+                [pk for pk, _ in itens], [chave for _, chave in itens], self.modelo,
+                codificar_skills=lambda nomes: codificar_textos(nomes, modelo=self.modelo),
+            )
+            return
+
+        novos = dict(zip(ids, matriz))
+        salvar = vetores.salvar_embeddings_vagas if tipo == 'vagas' else vetores.salvar_embeddings_candidatos
+        salvar([(pk, chave[1], novos[pk]) for pk, chave in itens], self.modelo)
+
+    def recodificar(self, tipo, pool, processos, tamanho, forcar):
+        inicio = time.perf_counter()
+        lidos = codificados = 0
+        pendentes = deque()
+
+        def concluir():
+            nonlocal lidos, codificados
+            ultimo_pk, total_lote, itens, resultado = pendentes.popleft()
+            ids, matriz = resultado.get() if hasattr(resultado, 'get') else resultado
+            self.gravar(tipo, itens, ids, matriz)
+
+            # Lotes terminam em ordem: tudo até ultimo_pk já está gravado
+            self.checkpoint[tipo] = ultimo_pk
+            self.salvar_checkpoint()
+
+            lidos += total_lote
+            codificados += len(itens)
+            duracao = time.perf_counter() - inicio
+            self.stdout.write(
+                f'   {tipo}: {lidos} lidos, {codificados} recodificados '
+                f'({lidos / duracao:.0f} linhas/s, {codificados / duracao:.0f} vetores/s)'
+            )
+
+        for ultimo_pk, total_lote, itens, ids, textos in self.lotes(tipo, tamanho, forcar):
+            if pool is not None and textos:
+                resultado = pool.apply_async(paralelo.codificar_lote, (ids, textos))
+            elif textos:
+                resultado = paralelo.codificar_lote(ids, textos)
+            else:
+                resultado = (ids, [])
+            pendentes.append((ultimo_pk, total_lote, itens, resultado))
+            # Mantém o pool ocupado sem acumular o banco inteiro na memória
+            while len(pendentes) > processos * 2:
+                concluir()
+
+        while pendentes:
+            concluir()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {tipo}: {codificados} vetores gravados.'))
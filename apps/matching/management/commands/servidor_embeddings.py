@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.matching.servidor import criar_servidor
+
+class Command(BaseCommand):
+    help = 'Sobe o servidor local de embeddings (dono do modelo de IA) para os workers web'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--porta', type=int, default=8765)
+        parser.add_argument('--janela-ms', type=int, default=5, help='Espera máxima para juntar pedidos em um lote')
+        parser.add_argument('--lote-max', type=int, default=64, help='Máximo de textos por passada do modelo')
+
+    def handle(self, *args, **options):
+        self.stdout.write('🧠 Carregando o modelo de IA...')
+        try:
+            servidor = criar_servidor(
+                options['host'], options['porta'], options['janela_ms'], options['lote_max']
+            )
+        except Exception as e:
+            raise CommandError(f'Erro ao iniciar o servidor de embeddings: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Servidor de embeddings em http://{options['host']}:{options['porta']} "
+            f"(configure MATCHING_SERVIDOR_URL nos workers)"
+        ))
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrando...')
+        finally:
+            servidor.server_close()
@@ -0,0 +1,227 @@
+# Arquivo: apps/matching/matriz.py
+#
+# Pontuação vetorizada do banco inteiro de candidatos.
+# Em vez de um loop em Python (um cosseno por candidato), todos os vetores ficam
+# em UMA matriz NumPy contígua e a vaga é comparada com todos de uma vez (M @ v).
+
+import datetime
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .compartilhada import ler_linhas
+from .models import EmbeddingCandidato
+from .quantizacao import FORMATOS, produto_matriz_vetor
+
+
+# Releitura com folga: uma transação mais lenta pode confirmar DEPOIS da nossa leitura
+# uma linha com atualizado_em anterior ao que já vimos (regravar a linha é inofensivo)
+FOLGA_S = 2
+# Candidatos apagados não mudam nenhum atualizado_em: a contagem é conferida no máximo a cada
+VERIFICAR_CONTAGEM_S = 30
+# Mais linhas faltando que isso na conferência: recarrega tudo em vez de buscar por id
+MAX_FALTANDO = 500
+
+
+class MatrizCandidatos:
+    """
+    Cache, por processo, da matriz (N x D) com os embeddings dos candidatos, em ordem de id.
+    Carrega tudo do banco uma vez; depois, a cada consulta, lê só as linhas alteradas desde
+    a última leitura (índice em modelo + atualizado_em) e grava por cima, no lugar.
+    Candidatos apagados saem na conferência da contagem (a cada VERIFICAR_CONTAGEM_S).
+    A matriz fica no formato compacto configurado (MATCHING_FORMATO_MATRIZ).
+    """
+
+    def __init__(self, formato='f32'):
+        self.formato = formato
+        self._lock = threading.Lock()
+        self._dados = {}      # modelo -> (ids, matriz, escalas)
+        self._lido_ate = {}   # modelo -> maior atualizado_em já aplicado
+        self._contado_em = {} # modelo -> time.monotonic() da última conferência da contagem
+
+    def _carregar(self, modelo):
+        ids, matriz, escalas, ultima = ler_linhas('candidatos', modelo, self.formato)
+        if matriz is None:
+            matriz = np.empty((0, 0), dtype=FORMATOS[self.formato])
+        self._dados[modelo] = (ids, matriz, escalas)
+        self._lido_ate[modelo] = ultima
+        self._contado_em[modelo] = time.monotonic()
+
+    def _atualizar(self, modelo):
+        ids, matriz, escalas = self._dados[modelo]
+        lido_ate = self._lido_ate[modelo]
+        depois_de = lido_ate - datetime.timedelta(seconds=FOLGA_S) if lido_ate else None
+        novos_ids, novos, novas_escalas, ultima = ler_linhas('candidatos', modelo, self.formato, depois_de=depois_de)
+        if novos is not None:
+            ids, matriz, escalas = _aplicar_linhas(ids, matriz, escalas, novos_ids, novos, novas_escalas)
+        if ultima is not None and (lido_ate is None or ultima > lido_ate):
+            self._lido_ate[modelo] = ultima
+
+        if time.monotonic() - self._contado_em[modelo] >= VERIFICAR_CONTAGEM_S:
+            self._contado_em[modelo] = time.monotonic()
+            linhas = EmbeddingCandidato.objects.filter(modelo=modelo)
+            if linhas.count() != len(ids):
+                existentes = np.fromiter(linhas.values_list('candidato_id', flat=True).iterator(), dtype=np.int64)
+                faltando = np.setdiff1d(existentes, ids)
+                if len(faltando) > MAX_FALTANDO:
+                    self._carregar(modelo)
+                    return
+                manter = np.isin(ids, existentes)
+                if not manter.all():
+                    ids, matriz, escalas = ids[manter], matriz[manter], escalas[manter]
+                if len(faltando):
+                    novos_ids, novos, novas_escalas, _ = ler_linhas('candidatos', modelo, self.formato, ids=faltando)
+                    if novos is not None:
+                        ids, matriz, escalas = _aplicar_linhas(ids, matriz, escalas, novos_ids, novos, novas_escalas)
+        self._dados[modelo] = (ids, matriz, escalas)
+
+    def obter(self, modelo):
+        """
+        Retorna (ids, matriz, escalas) atualizados para o modelo informado.
+        """
+        with self._lock:
+            if modelo in self._dados:
+                self._atualizar(modelo)
+            else:
+                self._carregar(modelo)
+            return self._dados[modelo]
+
+
+def _aplicar_linhas(ids, matriz, escalas, novos_ids, novos, novas_escalas):
+    """
+    Junta linhas lidas do banco (ids em ordem) à matriz: as que já existem são gravadas
+    por cima, no lugar; as novas entram na posição do id (uma cópia só para o lote todo).
+    """
+    if matriz.shape[0] == 0:
+        return novos_ids, novos, novas_escalas
+    posicoes = np.searchsorted(ids, novos_ids)
+    existe = posicoes < len(ids)
+    existe[existe] = ids[posicoes[existe]] == novos_ids[existe]
+    matriz[posicoes[existe]] = novos[existe]
+    escalas[posicoes[existe]] = novas_escalas[existe]
+    inserir = ~existe
+    if inserir.any():
+        ids = np.insert(ids, posicoes[inserir], novos_ids[inserir])
+        matriz = np.insert(matriz, posicoes[inserir], novos[inserir], axis=0)
+        escalas = np.insert(escalas, posicoes[inserir], novas_escalas[inserir])
+    return ids, matriz, escalas
+
+
+def _ranquear(ids, scores, top_k, limiar):
+    """
+    Converte scores (cosseno) em percentuais e devolve os top_k acima do limiar.
+    """
+    percentuais = np.rint(np.maximum(scores, 0) * 100)
+
+    acima = np.flatnonzero(percentuais > limiar)
+    total = int(acima.size)
+    if total == 0:
+        return [], 0
+
+    # argpartition: pega os top_k sem ordenar o vetor inteiro
+    if total > top_k:
+        melhores = np.argpartition(-scores[acima], top_k - 1)[:top_k]
+        acima = acima[melhores]
+    ordem = acima[np.argsort(-scores[acima], kind='stable')]
+
+    return [(int(ids[i]), int(percentuais[i])) for i in ordem], total
+
+
+def pontuar_segmentos(vetor_vaga, segmentos, top_k=50, limiar=20, restringir_a=None):
+    """
+    Calcula o score (0 a 100) de todos os candidatos com UM produto matriz-vetor por
+    segmento (ex.: base em memmap + delta), direto sobre a matriz compacta (float16/int8).
+    Retorna (lista de (candidato_id, score) decrescente com no máximo top_k itens,
+    total de candidatos acima do limiar).
+    segmentos = [(ids, matriz, escalas, ativos)], onde `ativos` é uma máscara
+    booleana das linhas válidas ou None. Os ids de cada segmento estão em ordem.
+
+    restringir_a: ids (ordenados) pré-selecionados; só essas linhas são lidas e
+    pontuadas, então o custo não depende do tamanho do banco.
+    """
+    todos_ids, todos_scores = [], []
+    for ids, matriz, escalas, ativos in segmentos:
+        if matriz is None or matriz.shape[0] == 0:
+            continue
+        if restringir_a is not None:
+            # Busca binária: linha de cada id pré-selecionado neste segmento
+            posicoes = np.searchsorted(ids, restringir_a)
+            dentro = posicoes < len(ids)
+            posicoes = posicoes[dentro]
+            posicoes = posicoes[ids[posicoes] == restringir_a[dentro]]
+            if ativos is not None:
+                posicoes = posicoes[ativos[posicoes]]
+            ids, matriz, escalas, ativos = ids[posicoes], matriz[posicoes], escalas[posicoes], None
+            if len(ids) == 0:
+                continue
+        scores = produto_matriz_vetor(matriz, escalas, vetor_vaga)
+        if ativos is not None:
+            ids, scores = ids[ativos], scores[ativos]
+        todos_ids.append(ids)
+        todos_scores.append(scores)
+
+    if not todos_ids:
+        return [], 0
+    return _ranquear(np.concatenate(todos_ids), np.concatenate(todos_scores), top_k, limiar)
+
+
+def estimar_total(vetor_vaga, segmentos, limiar=20, amostra=4096):
+    """
+    Total de candidatos acima do limiar no banco INTEIRO, estimado por uma amostra
+    sistemática (uma linha a cada N, ~`amostra` linhas no total). Usado quando só os
+    pré-selecionados são pontuados: o total deles subestimaria o Radar.
+    Banco menor que a amostra: a conta é exata.
+    """
+    linhas_total = sum(len(ids) for ids, _, _, _ in segmentos)
+    passo = max(1, linhas_total // max(amostra, 1))
+    acima = amostradas = validas = 0
+    for ids, matriz, escalas, ativos in segmentos:
+        if matriz is None or matriz.shape[0] == 0:
+            continue
+        # Fatia com passo: uma view (no memmap, só as páginas dessas linhas são lidas)
+        parte = slice(None, None, passo)
+        scores = produto_matriz_vetor(matriz[parte], escalas[parte] if escalas is not None else None, vetor_vaga)
+        passou = np.rint(np.maximum(scores, 0) * 100) > limiar
+        if ativos is not None:
+            passou &= ativos[parte]
+            amostradas += int(ativos[parte].sum())
+            validas += int(ativos.sum())
+        else:
+            amostradas += len(scores)
+            validas += matriz.shape[0]
+        acima += int(passou.sum())
+
+    if passo == 1 or amostradas == 0:
+        return acima
+    return round(acima * validas / amostradas)
+
+
+def pontuar_segmentos_lote(vetores_vagas, segmentos, top_k=50, limiar=20):
+    """
+    Radar em lote: VÁRIAS vagas contra todos os candidatos em uma passada só.
+    vetores_vagas = matriz (V x D); cada segmento é lido uma vez e multiplicado
+    pelas V vagas juntas (matriz x matriz), em vez de V leituras do banco de vetores.
+    Retorna a lista, por vaga (na ordem das linhas), de (ranking, total acima do limiar)
+    igual à do pontuar_segmentos.
+    """
+    todos_ids, todos_scores = [], []
+    for ids, matriz, escalas, ativos in segmentos:
+        if matriz is None or matriz.shape[0] == 0:
+            continue
+        scores = produto_matriz_vetor(matriz, escalas, vetores_vagas.T)
+        if ativos is not None:
+            ids, scores = ids[ativos], scores[ativos]
+        todos_ids.append(ids)
+        todos_scores.append(scores)
+
+    if not todos_ids:
+        return [([], 0) for _ in range(len(vetores_vagas))]
+    ids, scores = np.concatenate(todos_ids), np.concatenate(todos_scores)
+    # Uma coluna por vaga (cópia contígua: o argpartition fica bem mais rápido)
+    return [_ranquear(ids, np.ascontiguousarray(scores[:, j]), top_k, limiar) for j in range(scores.shape[1])]
+
+
+# Instância única por processo (cada worker do gunicorn tem a sua)
+matriz_candidatos = MatrizCandidatos(formato=settings.MATCHING_FORMATO_MATRIZ)
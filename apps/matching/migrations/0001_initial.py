@@ -0,0 +1,45 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('usuarios', '0007_alter_usuario_email'),
+        ('vagas', '0003_vaga_area_atuacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCandidato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('hash_texto', models.CharField(max_length=64)),
+                ('vetor', models.BinaryField()),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='embeddings', to='usuarios.candidato')),
+            ],
+            options={
+                'unique_together': {('candidato', 'modelo')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EmbeddingVaga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('hash_texto', models.CharField(max_length=64)),
+                ('vetor', models.BinaryField()),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='embeddings', to='vagas.vaga')),
+            ],
+            options={
+                'unique_together': {('vaga', 'modelo')},
+            },
+        ),
+    ]
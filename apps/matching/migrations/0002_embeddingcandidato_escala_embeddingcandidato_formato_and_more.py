@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embeddingcandidato',
+            name='escala',
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AddField(
+            model_name='embeddingcandidato',
+            name='formato',
+            field=models.CharField(choices=[('f32', 'float32'), ('f16', 'float16'), ('i8', 'int8 + escala')], default='f32', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='embeddingvaga',
+            name='escala',
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AddField(
+            model_name='embeddingvaga',
+            name='formato',
+            field=models.CharField(choices=[('f32', 'float32'), ('f16', 'float16'), ('i8', 'int8 + escala')], default='f32', max_length=3),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0002_embeddingcandidato_escala_embeddingcandidato_formato_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embeddingcandidato',
+            name='desatualizado',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='embeddingvaga',
+            name='desatualizado',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
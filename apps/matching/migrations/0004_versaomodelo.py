@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0003_embeddingcandidato_desatualizado_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoModelo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('sombra', 'Sombra (vetores em construção)'), ('ativo', 'Ativo'), ('aposentado', 'Aposentado')], default='sombra', max_length=10)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('ativado_em', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
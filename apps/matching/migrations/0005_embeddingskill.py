@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0004_versaomodelo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embeddingcandidato',
+            name='hash_base',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='embeddingcandidato',
+            name='vetor_base',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='EmbeddingSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('modelo', models.CharField(max_length=100)),
+                ('vetor', models.BinaryField()),
+                ('formato', models.CharField(choices=[('f32', 'float32'), ('f16', 'float16'), ('i8', 'int8 + escala')], default='f32', max_length=3)),
+                ('escala', models.FloatField(default=1.0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('nome', 'modelo')},
+            },
+        ),
+    ]
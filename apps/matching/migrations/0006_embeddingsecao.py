@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0005_embeddingskill'),
+        ('usuarios', '0007_alter_usuario_email'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='embeddingcandidato',
+            name='hash_base',
+        ),
+        migrations.RemoveField(
+            model_name='embeddingcandidato',
+            name='vetor_base',
+        ),
+        migrations.CreateModel(
+            name='EmbeddingSecao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('chave', models.CharField(max_length=30)),
+                ('hash_texto', models.CharField(max_length=64)),
+                ('vetor', models.BinaryField()),
+                ('formato', models.CharField(choices=[('f32', 'float32'), ('f16', 'float16'), ('i8', 'int8 + escala')], default='f32', max_length=3)),
+                ('escala', models.FloatField(default=1.0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='embeddings_secoes', to='usuarios.candidato')),
+            ],
+            options={
+                'unique_together': {('candidato', 'modelo', 'chave')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0006_embeddingsecao'),
+        ('usuarios', '0007_alter_usuario_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecomendacoesCandidato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('vagas', models.JSONField(default=list)),
+                ('carimbo_vagas', models.CharField(max_length=64)),
+                ('calculado_em', models.DateTimeField(auto_now=True)),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recomendacoes', to='usuarios.candidato')),
+            ],
+            options={
+                'unique_together': {('candidato', 'modelo')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0007_recomendacoescandidato'),
+        ('usuarios', '0007_alter_usuario_email'),
+        ('vagas', '0005_busca_textual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='embeddingcandidato',
+            index=models.Index(fields=['modelo', 'atualizado_em'], name='matching_em_modelo_e965de_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='embeddingvaga',
+            index=models.Index(fields=['modelo', 'atualizado_em'], name='matching_em_modelo_9db784_idx'),
+        ),
+    ]
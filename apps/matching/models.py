@@ -0,0 +1,134 @@
+from django.db import models
+from apps.usuarios.models import Candidato
+from apps.vagas.models import Vaga
+
+
+# -------------------------------------------------------------------
+# EMBEDDINGS PERSISTIDOS (um vetor por perfil e por modelo de IA)
+# -------------------------------------------------------------------
+
+# Formato dos bytes em `vetor` (ver apps/matching/quantizacao.py)
+FORMATO_VETOR_CHOICES = (
+    ('f32', 'float32'),
+    ('f16', 'float16'),
+    ('i8', 'int8 + escala'),
+)
+
+class EmbeddingCandidato(models.Model):
+    candidato = models.ForeignKey(Candidato, related_name='embeddings', on_delete=models.CASCADE)
+    # Nome do modelo que gerou o vetor (nunca misturar vetores de modelos diferentes)
+    modelo = models.CharField(max_length=100)
+    # SHA-256 do texto usado para gerar o vetor (detecta perfil alterado)
+    hash_texto = models.CharField(max_length=64)
+    # Vetor normalizado (bytes crus do NumPy, no formato abaixo)
+    vetor = models.BinaryField()
+    formato = models.CharField(max_length=3, choices=FORMATO_VETOR_CHOICES, default='f32')
+    escala = models.FloatField(default=1.0) # Só usada no int8: vetor ≈ bytes * escala
+    # Marcado pelos signals quando o perfil muda; o atualizador em segundo plano recalcula
+    desatualizado = models.BooleanField(default=False, db_index=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('candidato', 'modelo')
+        # Leitura incremental da matriz (só as linhas alteradas depois da última leitura)
+        indexes = [models.Index(fields=['modelo', 'atualizado_em'])]
+
+    def __str__(self):
+        return f"{self.candidato} [{self.modelo}]"
+
+
+class EmbeddingVaga(models.Model):
+    vaga = models.ForeignKey(Vaga, related_name='embeddings', on_delete=models.CASCADE)
+    modelo = models.CharField(max_length=100)
+    hash_texto = models.CharField(max_length=64)
+    vetor = models.BinaryField()
+    formato = models.CharField(max_length=3, choices=FORMATO_VETOR_CHOICES, default='f32')
+    escala = models.FloatField(default=1.0)
+    desatualizado = models.BooleanField(default=False, db_index=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('vaga', 'modelo')
+        indexes = [models.Index(fields=['modelo', 'atualizado_em'])]
+
+    def __str__(self):
+        return f"{self.vaga} [{self.modelo}]"
+
+
+class EmbeddingSecao(models.Model):
+    # Um vetor por seção do perfil (MATCHING_VETOR_POR_SECAO, ver apps/matching/secoes.py).
+    # O EmbeddingCandidato do mesmo modelo é a média ponderada destas seções
+    candidato = models.ForeignKey(Candidato, related_name='embeddings_secoes', on_delete=models.CASCADE)
+    modelo = models.CharField(max_length=100)
+    # 'resumo', 'exp:<id da Experiencia>' ou 'formacoes' (as skills vêm do EmbeddingSkill)
+    chave = models.CharField(max_length=30)
+    hash_texto = models.CharField(max_length=64)
+    vetor = models.BinaryField()
+    formato = models.CharField(max_length=3, choices=FORMATO_VETOR_CHOICES, default='f32')
+    escala = models.FloatField(default=1.0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('candidato', 'modelo', 'chave')
+
+    def __str__(self):
+        return f"{self.candidato} {self.chave} [{self.modelo}]"
+
+
+class EmbeddingSkill(models.Model):
+    # Nome normalizado (ver skills.normalizar_skill): "Python", " python " e "PYTHON" são a mesma skill
+    nome = models.CharField(max_length=100)
+    modelo = models.CharField(max_length=100)
+    vetor = models.BinaryField()
+    formato = models.CharField(max_length=3, choices=FORMATO_VETOR_CHOICES, default='f32')
+    escala = models.FloatField(default=1.0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('nome', 'modelo')
+
+    def __str__(self):
+        return f"{self.nome} [{self.modelo}]"
+
+
+# -------------------------------------------------------------------
+# VAGAS RECOMENDADAS (top-N por candidato, calculado em segundo plano)
+# -------------------------------------------------------------------
+
+class RecomendacoesCandidato(models.Model):
+    # Ver apps/matching/recomendacoes.py
+    candidato = models.ForeignKey(Candidato, related_name='recomendacoes', on_delete=models.CASCADE)
+    modelo = models.CharField(max_length=100)
+    # [[vaga_id, score], ...] do mais para o menos compatível
+    vagas = models.JSONField(default=list)
+    # Retrato do conjunto de vagas abertas no cálculo: mudou = lista vencida
+    carimbo_vagas = models.CharField(max_length=64)
+    calculado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('candidato', 'modelo')
+
+    def __str__(self):
+        return f"{self.candidato} [{self.modelo}]"
+
+
+# -------------------------------------------------------------------
+# VERSÕES DO MODELO DE IA (troca de modelo sem downtime)
+# -------------------------------------------------------------------
+
+STATUS_MODELO_CHOICES = (
+    ('sombra', 'Sombra (vetores em construção)'),
+    ('ativo', 'Ativo'),
+    ('aposentado', 'Aposentado'),
+)
+
+class VersaoModelo(models.Model):
+    # Mesmo nome gravado em EmbeddingCandidato.modelo / EmbeddingVaga.modelo
+    nome = models.CharField(max_length=100, unique=True)
+    # Só UM modelo fica 'ativo' (é o único usado para comparar vetores)
+    status = models.CharField(max_length=10, choices=STATUS_MODELO_CHOICES, default='sombra')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    ativado_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.nome} ({self.get_status_display()})"
@@ -0,0 +1,110 @@
+# Arquivo: apps/matching/paralelo.py
+#
+# Funções executadas DENTRO de processos filhos (`manage.py reembed` e o benchmark de backends).
+# Este módulo não importa nada do Django: os processos filhos (spawn) só carregam
+# o modelo de IA e devolvem vetores; quem lê e grava no banco é o processo principal.
+# A fábrica do modelo (criar_modelo) também é usada pela engine: online e offline
+# os vetores do mesmo `modelo` saem sempre do mesmo runtime (torch ou onnxruntime).
+
+import os
+
+import numpy as np
+
+_modelo = None
+
+
+def nucleos_disponiveis():
+    """
+    Núcleos que ESTE processo pode usar (respeita taskset/cgroups no Linux;
+    sched_getaffinity não existe no Windows nem no macOS).
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def criar_modelo(nome, pasta_onnx=None, quantizado=True, threads=0):
+    """
+    Com `pasta_onnx` (exportação do manage.py exportar_onnx), o modelo roda no onnxruntime;
+    senão, no sentence-transformers (torch). As opções vêm de engine.opcoes_do_modelo.
+    """
+    if pasta_onnx:
+        from .backend_onnx import ModeloONNX
+        return ModeloONNX(pasta_onnx, quantizado=quantizado, threads=threads)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(nome)
+
+
+def inicializar_processo(opcoes, threads):
+    """
+    Roda uma vez em cada processo do pool: limita as threads da inferência (senão N
+    processos x N threads disputam os mesmos núcleos) e carrega o modelo.
+    opcoes = engine.opcoes_do_modelo(nome), calculado no processo principal.
+    """
+    global _modelo
+    threads = max(1, threads)
+    if opcoes['pasta_onnx']:
+        opcoes = {**opcoes, 'threads': threads}
+    else:
+        import torch
+        torch.set_num_threads(threads)
+    _modelo = criar_modelo(**opcoes)
+
+
+def codificar_lote(ids, textos, batch_size=32):
+    """
+    Retorna (ids, matriz float32 normalizada) para um lote de textos.
+    """
+    vetores = _modelo.encode(
+        list(textos), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+    )
+    return ids, np.asarray(vetores, dtype=np.float32)
+
+
+def medir_backend(backend, origem, textos, batch_size=32, repeticoes=30):
+    """
+    Mede UM backend em um processo limpo (chamado via spawn pelo benchmark):
+    tempo de import, de carga, memória (RSS), latência de 1 texto e vazão em lote.
+    """
+    import resource
+    import time
+
+    def rss_mb():
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    memoria_inicial = rss_mb()
+    inicio = time.perf_counter()
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        tempo_import = time.perf_counter() - inicio
+        modelo = SentenceTransformer(origem, device='cpu')
+    else:
+        from .backend_onnx import ModeloONNX
+        tempo_import = time.perf_counter() - inicio
+        modelo = ModeloONNX(origem, quantizado=(backend == 'onnx-int8'))
+    tempo_carga = time.perf_counter() - inicio - tempo_import
+
+    modelo.encode(textos[:batch_size], batch_size=batch_size, normalize_embeddings=True)  # aquecimento
+    latencias = []
+    for i in range(repeticoes):
+        t = time.perf_counter()
+        modelo.encode([textos[i % len(textos)]], normalize_embeddings=True)
+        latencias.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    vetores = modelo.encode(textos, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    duracao = time.perf_counter() - t
+
+    return {
+        'import_s': tempo_import,
+        'carga_s': tempo_carga,
+        'rss_mb': rss_mb() - memoria_inicial,
+        'latencias': latencias,
+        'vazao': len(textos) / duracao,
+        'vetores': np.asarray(vetores, dtype=np.float32),
+    }
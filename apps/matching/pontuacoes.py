@@ -0,0 +1,77 @@
+# Arquivo: apps/matching/pontuacoes.py
+#
+# Score de matching MATERIALIZADO em Candidatura (score, score_modelo, score_calculado_em).
+# Calculado em segundo plano (atualizador de embeddings) quando a candidatura é criada
+# e sempre que o vetor do candidato ou da vaga muda. Assim a lista de candidatos da
+# vaga (ver_candidatos_vaga) ordena e pagina direto no banco, sem rodar o modelo.
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.vagas.models import Candidatura
+
+
+def candidaturas_de(candidato_ids=(), vaga_ids=()):
+    """
+    ids das candidaturas afetadas por uma mudança no perfil dos candidatos ou nas vagas.
+    """
+    if not candidato_ids and not vaga_ids:
+        return set()
+    return set(
+        Candidatura.objects.filter(Q(candidato_id__in=list(candidato_ids)) | Q(vaga_id__in=list(vaga_ids)))
+        .values_list('pk', flat=True)
+    )
+
+
+def candidaturas_vencidas(modelo, limite):
+    """
+    Candidaturas sem score, com score de outro modelo ou calculado antes do vetor atual
+    (ex.: depois de um `reembed`). Usado na varredura periódica do atualizador.
+    """
+    ids = Candidatura.objects.values_list('pk', flat=True)
+    vencidas = set(ids.filter(Q(score__isnull=True) | ~Q(score_modelo=modelo))[:limite])
+    vencidas.update(ids.filter(
+        candidato__embeddings__modelo=modelo,
+        candidato__embeddings__atualizado_em__gt=F('score_calculado_em'),
+    )[:limite])
+    vencidas.update(ids.filter(
+        vaga__embeddings__modelo=modelo,
+        vaga__embeddings__atualizado_em__gt=F('score_calculado_em'),
+    )[:limite])
+    return vencidas
+
+
+def pontuar_candidaturas(candidatura_ids, modelo):
+    """
+    Calcula e grava o score das candidaturas: por vaga, o vetor da vaga uma vez
+    e os vetores dos candidatos em lote (só vetores em dia: roda fora da requisição).
+    """
+    from . import engine
+
+    candidaturas = list(
+        Candidatura.objects.filter(pk__in=list(candidatura_ids))
+        .select_related('vaga', 'candidato', 'candidato__resumo_profissional')
+        .prefetch_related('candidato__skills', 'candidato__experiencias', 'candidato__formacoes')
+    )
+    por_vaga = {}
+    for candidatura in candidaturas:
+        por_vaga.setdefault(candidatura.vaga_id, []).append(candidatura)
+
+    for lista in por_vaga.values():
+        vetor_vaga = engine.vetor_da_vaga(lista[0].vaga, aceitar_desatualizado=False, modelo=modelo)
+        vetores_candidatos = engine.vetores_dos_candidatos(
+            [c.candidato for c in lista], aceitar_desatualizado=False, modelo=modelo
+        )
+        # Depois de ler/gravar os vetores: a varredura compara com o atualizado_em deles
+        agora = timezone.now()
+        for candidatura, vetor in zip(lista, vetores_candidatos):
+            # Perfil ou vaga sem texto: 0 (não dá para comparar textos vazios)
+            candidatura.score = (
+                engine.similaridade_percentual(vetor_vaga, vetor)
+                if vetor_vaga is not None and vetor is not None else 0
+            )
+            candidatura.score_modelo = modelo
+            candidatura.score_calculado_em = agora
+
+    Candidatura.objects.bulk_update(candidaturas, ['score', 'score_modelo', 'score_calculado_em'])
+    return len(candidaturas)
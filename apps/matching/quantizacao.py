@@ -0,0 +1,75 @@
+# Arquivo: apps/matching/quantizacao.py
+#
+# Formatos compactos para os embeddings salvos (o modelo gera 512 floats = 2KB por perfil):
+#   'f32' -> float32 original            (4 bytes por dimensão)
+#   'f16' -> float16                     (2 bytes, perda desprezível)
+#   'i8'  -> int8 + 1 escala por vetor   (1 byte; v ≈ q * escala)
+# A pontuação roda direto sobre a matriz compacta, em blocos, sem descompactar tudo.
+
+import numpy as np
+
+FORMATOS = {
+    'f32': np.float32,
+    'f16': np.float16,
+    'i8': np.int8,
+}
+
+
+def quantizar(vetor, formato):
+    """
+    Retorna (array no formato pedido, escala).
+    """
+    vetor = np.asarray(vetor, dtype=np.float32)
+    if formato == 'i8':
+        maximo = float(np.abs(vetor).max())
+        escala = maximo / 127 if maximo > 0 else 1.0
+        return np.clip(np.rint(vetor / escala), -127, 127).astype(np.int8), escala
+    return vetor.astype(FORMATOS[formato]), 1.0
+
+
+def desquantizar(array, escala=1.0):
+    return np.asarray(array, dtype=np.float32) * np.float32(escala)
+
+
+def quantizar_matriz(matriz, formato):
+    """
+    Versão para matriz (N x D): retorna (matriz compacta, escalas por linha).
+    """
+    matriz = np.asarray(matriz, dtype=np.float32)
+    if formato == 'i8':
+        maximos = np.abs(matriz).max(axis=1)
+        escalas = np.where(maximos > 0, maximos / 127, 1.0).astype(np.float32)
+        compacta = np.clip(np.rint(matriz / escalas[:, None]), -127, 127).astype(np.int8)
+        return compacta, escalas
+    return matriz.astype(FORMATOS[formato]), np.ones(matriz.shape[0], dtype=np.float32)
+
+
+def produto_matriz_vetor(matriz, escalas, vetor, bloco=256):
+    """
+    Calcula (matriz desquantizada) @ vetor bloco a bloco.
+    Só um bloco por vez vira float32, sempre no mesmo buffer (pequeno o bastante
+    para caber no cache da CPU): a memória extra fica em ~bloco x D x 4 bytes.
+    `vetor` também pode ser uma matriz (D x V), várias vagas de uma vez: o resultado
+    é (N x V) e a matriz de candidatos é lida/convertida uma vez só para todas.
+    """
+    vetor = np.asarray(vetor, dtype=np.float32)
+    if matriz.dtype == np.float32:
+        scores = matriz @ vetor
+    else:
+        scores = np.empty((matriz.shape[0],) + vetor.shape[1:], dtype=np.float32)
+        buffer = np.empty((bloco, matriz.shape[1]), dtype=np.float32)
+        for inicio in range(0, matriz.shape[0], bloco):
+            parte = matriz[inicio:inicio + bloco]
+            convertido = buffer[:parte.shape[0]]
+            convertido[...] = parte
+            scores[inicio:inicio + bloco] = convertido @ vetor
+    if escalas is not None and matriz.dtype == np.int8:
+        scores *= escalas if scores.ndim == 1 else escalas[:, None]
+    return scores
+
+
+def desquantizar_matriz(matriz, escalas):
+    matriz = np.asarray(matriz, dtype=np.float32)
+    if escalas is not None:
+        matriz = matriz * escalas[:, None]
+    return matriz
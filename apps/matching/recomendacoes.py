@@ -0,0 +1,132 @@
+# Arquivo: apps/matching/recomendacoes.py
+#
+# Vagas recomendadas para o candidato (painel home_candidato): as vagas abertas
+# ordenadas pela similaridade com o vetor do candidato.
+# O top-N de cada candidato é calculado em segundo plano (atualizador de embeddings)
+# e guardado na tabela RecomendacoesCandidato: a requisição só lê e pagina a lista.
+#
+# A lista vence quando:
+#   - o vetor do candidato muda (EmbeddingCandidato.atualizado_em > calculado_em);
+#   - o conjunto de vagas abertas muda (carimbo_vagas: vaga aberta/fechada/apagada/recodificada).
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from apps.vagas.models import Vaga
+
+from . import vetores
+from .compartilhada import matriz_compartilhada_vagas
+from .models import EmbeddingCandidato, EmbeddingVaga, RecomendacoesCandidato
+from .quantizacao import desquantizar_matriz
+
+
+def carimbo_vagas(modelo):
+    """
+    Retrato barato (uma consulta) das vagas abertas com vetor no modelo: quantas são,
+    a soma dos ids e o vetor mais recente. Qualquer vaga aberta, fechada, apagada
+    ou recodificada muda o carimbo.
+    """
+    dados = EmbeddingVaga.objects.filter(modelo=modelo, vaga__status=True).aggregate(
+        total=Count('id'), soma=Sum('vaga_id'), ultimo=Max('atualizado_em')
+    )
+    ultimo = dados['ultimo'].isoformat() if dados['ultimo'] else '-'
+    return f"{dados['total']}:{dados['soma'] or 0}:{ultimo}"
+
+
+def _vetores_vagas_abertas(modelo):
+    """
+    (ids, matriz V x D) das vagas abertas que já têm vetor. Lê da matriz de vagas exportada
+    (memmap + delta, ver compartilhada.py) quando existe; senão, do banco.
+    """
+    ids = list(Vaga.objects.filter(status=True).values_list('id', flat=True))
+    if settings.MATCHING_MATRIZ_MMAP and matriz_compartilhada_vagas.disponivel(modelo):
+        # A exportação tem também as vagas fechadas: fica só com as abertas
+        abertas = np.array(ids, dtype=np.int64)
+        partes_ids, partes_vetores = [], []
+        for ids_seg, matriz, escalas, ativos in matriz_compartilhada_vagas.obter(modelo):
+            if matriz is None or len(ids_seg) == 0:
+                continue
+            linhas = np.isin(ids_seg, abertas)
+            if ativos is not None:
+                linhas &= ativos
+            partes_ids.append(ids_seg[linhas])
+            partes_vetores.append(desquantizar_matriz(matriz[linhas], escalas[linhas]))
+        if not partes_ids or not sum(len(p) for p in partes_ids):
+            return np.empty(0, dtype=np.int64), None
+        return np.concatenate(partes_ids), np.vstack(partes_vetores)
+
+    salvos = vetores.buscar_embeddings_vagas(ids, modelo)
+    ids = [vid for vid in ids if vid in salvos]
+    if not ids:
+        return np.empty(0, dtype=np.int64), None
+    return np.array(ids, dtype=np.int64), np.vstack([salvos[vid][1] for vid in ids]).astype(np.float32)
+
+
+def recalcular(candidato_ids, modelo):
+    """
+    Recalcula e grava o top-N dos candidatos (matriz candidatos x vagas em uma passada).
+    Candidato sem vetor (perfil vazio) fica sem lista: o painel mostra as vagas mais recentes.
+    """
+    if not candidato_ids:
+        return 0
+    carimbo = carimbo_vagas(modelo)
+    vaga_ids, matriz_vagas = _vetores_vagas_abertas(modelo)
+    salvos = vetores.buscar_embeddings_candidatos(candidato_ids, modelo)
+    com_vetor = [cid for cid in candidato_ids if cid in salvos]
+    if not com_vetor:
+        return 0
+
+    listas = {cid: [] for cid in com_vetor}
+    if matriz_vagas is not None:
+        matriz = np.vstack([salvos[cid][1] for cid in com_vetor]).astype(np.float32)
+        scores = matriz @ matriz_vagas.T
+        top_n = min(settings.MATCHING_RECOMENDACOES_TOP_N, len(vaga_ids))
+        for linha, cid in zip(scores, com_vetor):
+            melhores = np.argpartition(-linha, top_n - 1)[:top_n]
+            melhores = melhores[np.argsort(-linha[melhores], kind='stable')]
+            listas[cid] = [[int(vaga_ids[i]), round(max(float(linha[i]), 0) * 100)] for i in melhores]
+
+    agora = timezone.now()
+    existentes = {
+        r.candidato_id: r for r in RecomendacoesCandidato.objects.filter(candidato_id__in=com_vetor, modelo=modelo)
+    }
+    atualizar, criar = [], []
+    for cid, lista in listas.items():
+        registro = existentes.get(cid)
+        if registro is None:
+            criar.append(RecomendacoesCandidato(candidato_id=cid, modelo=modelo, vagas=lista, carimbo_vagas=carimbo))
+        else:
+            registro.vagas, registro.carimbo_vagas = lista, carimbo
+            # bulk_update não dispara o auto_now
+            registro.calculado_em = agora
+            atualizar.append(registro)
+
+    with transaction.atomic():
+        RecomendacoesCandidato.objects.bulk_create(criar, ignore_conflicts=True)
+        RecomendacoesCandidato.objects.bulk_update(atualizar, ['vagas', 'carimbo_vagas', 'calculado_em'])
+    return len(listas)
+
+
+def obter(candidato_id, modelo):
+    """
+    Retorna (lista [(vaga_id, score)], em_dia) ou (None, False) se o candidato ainda não tem lista.
+    Lista vencida ainda é devolvida (melhor que nada): quem chama agenda o recálculo.
+    """
+    registro = (
+        RecomendacoesCandidato.objects.filter(candidato_id=candidato_id, modelo=modelo)
+        .values_list('vagas', 'carimbo_vagas', 'calculado_em')
+        .first()
+    )
+    vetor_em = (
+        EmbeddingCandidato.objects.filter(candidato_id=candidato_id, modelo=modelo)
+        .values_list('atualizado_em', flat=True)
+        .first()
+    )
+    if registro is None:
+        return None, False
+    lista, carimbo, calculado_em = registro
+    em_dia = carimbo == carimbo_vagas(modelo) and (vetor_em is None or vetor_em <= calculado_em)
+    return [tuple(item) for item in lista], em_dia
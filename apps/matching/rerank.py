@@ -0,0 +1,148 @@
+# Arquivo: apps/matching/rerank.py
+#
+# 2ª etapa OPCIONAL de ordenação (MATCHING_RERANK_ATIVO): um cross-encoder pequeno
+# lê vaga e candidato JUNTOS e ordena melhor que o cosseno entre os embeddings.
+# É caro (uma inferência por par vaga x candidato), então só reordena o topo
+# (MATCHING_RERANK_TOP) que a etapa de embeddings já escolheu, dentro de um orçamento
+# de tempo (MATCHING_RERANK_ORCAMENTO_MS).
+# Orçamento estourado, modelo ainda carregando ou erro: fica a ordem dos embeddings.
+# O score exibido continua sendo o percentual dos embeddings; só a ordem muda.
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import vetores
+
+INTERVALO_NOVA_TENTATIVA = 60  # segundos entre tentativas se o carregamento falhar
+LIMITE_CACHE_PARES = 20000  # scores de pares (vaga, candidato) guardados em memória
+
+
+class ReordenadorCrossEncoder:
+    """
+    Cross-encoder por processo. O modelo é carregado em uma thread na primeira
+    chamada: a requisição nunca espera o carregamento (usa a ordem dos embeddings).
+    """
+
+    def __init__(self, nome, lote=8):
+        self.nome = nome
+        self.lote = lote
+        self._modelo = None
+        self._carregando = False
+        self._ultima_falha = 0.0
+        self._lock = threading.Lock()
+        # (hash do texto da vaga, hash do texto do candidato) -> score
+        self._cache = OrderedDict()
+        self.reordenados = 0
+        self.desistencias = 0
+
+    def carregar(self):
+        try:
+            from sentence_transformers import CrossEncoder
+            inicio = time.perf_counter()
+            self._modelo = CrossEncoder(self.nome, device='cpu')
+            print(f"Cross-encoder {self.nome} carregado em {time.perf_counter() - inicio:.1f}s")
+        except Exception as e:
+            print(f"Erro ao carregar o cross-encoder {self.nome}: {e}")
+            self._ultima_falha = time.monotonic()
+        finally:
+            self._carregando = False
+        return self._modelo
+
+    def obter(self):
+        """
+        Retorna o modelo se já estiver carregado; senão dispara o carregamento e retorna None.
+        """
+        if self._modelo is not None:
+            return self._modelo
+        with self._lock:
+            if not self._carregando and time.monotonic() - self._ultima_falha > INTERVALO_NOVA_TENTATIVA:
+                self._carregando = True
+                threading.Thread(target=self.carregar, name='carregar-cross-encoder', daemon=True).start()
+        return None
+
+    def _pontuar(self, modelo, vaga_texto, textos, orcamento_s, inicio):
+        """
+        Score de cada texto de candidato contra a vaga, em lotes pequenos, conferindo o
+        relógio a cada lote. Retorna None se o orçamento acabar antes do último.
+        """
+        hash_vaga = vetores.hash_texto(vaga_texto)
+        chaves = [(hash_vaga, vetores.hash_texto(t)) for t in textos]
+        with self._lock:
+            scores = {c: self._cache[c] for c in chaves if c in self._cache}
+
+        faltando = [(c, t) for c, t in dict(zip(chaves, textos)).items() if c not in scores]
+        for i in range(0, len(faltando), self.lote):
+            if time.perf_counter() - inicio > orcamento_s:
+                return None
+            parte = faltando[i:i + self.lote]
+            novos = modelo.predict([(vaga_texto, t) for _, t in parte], batch_size=self.lote, show_progress_bar=False)
+            for (chave, _), score in zip(parte, novos):
+                scores[chave] = float(score)
+
+        if time.perf_counter() - inicio > orcamento_s:
+            return None
+        with self._lock:
+            for chave in chaves:
+                self._cache[chave] = scores[chave]
+                self._cache.move_to_end(chave)
+            while len(self._cache) > LIMITE_CACHE_PARES:
+                self._cache.popitem(last=False)
+        return [scores[c] for c in chaves]
+
+    def reordenar(self, vaga, itens, candidato_id=lambda item: item[0], top=None, orcamento_ms=None):
+        """
+        Reordena os `top` primeiros itens (já na ordem dos embeddings) pelo cross-encoder;
+        o resto da lista fica como está. `candidato_id(item)` diz de qual candidato é o item.
+        Sem modelo, sem tempo ou com erro, devolve a lista original.
+        """
+        from apps.usuarios.models import Candidato
+        from .engine import get_texto_candidato, get_texto_vaga
+
+        inicio = time.perf_counter()
+        top = top or settings.MATCHING_RERANK_TOP
+        orcamento_s = (orcamento_ms or settings.MATCHING_RERANK_ORCAMENTO_MS) / 1000
+        itens = list(itens)
+        topo, resto = itens[:top], itens[top:]
+        modelo = self.obter()
+        if modelo is None or len(topo) < 2:
+            return itens
+
+        try:
+            vaga_texto = get_texto_vaga(vaga)
+            candidatos = (
+                Candidato.objects.select_related("resumo_profissional")
+                .prefetch_related("skills", "experiencias", "formacoes")
+                .in_bulk([candidato_id(item) for item in topo])
+            )
+            textos = [
+                get_texto_candidato(candidatos[candidato_id(item)]) if candidato_id(item) in candidatos else ''
+                for item in topo
+            ]
+            scores = self._pontuar(modelo, vaga_texto, textos, orcamento_s, inicio)
+        except Exception as e:
+            print(f"Erro no cross-encoder: {e}")
+            scores = None
+
+        if scores is None:
+            self.desistencias += 1
+            return itens
+        self.reordenados += 1
+        # sorted é estável: empate no cross-encoder mantém a ordem dos embeddings
+        ordem = sorted(range(len(topo)), key=lambda i: -scores[i])
+        return [topo[i] for i in ordem] + resto
+
+
+def reordenar(vaga, itens, candidato_id=lambda item: item[0]):
+    """
+    Atalho para as views: só reordena com MATCHING_RERANK_ATIVO=True.
+    """
+    if not settings.MATCHING_RERANK_ATIVO:
+        return list(itens)
+    return reordenador.reordenar(vaga, itens, candidato_id=candidato_id)
+
+
+# Instância única por processo
+reordenador = ReordenadorCrossEncoder(settings.MATCHING_RERANK_MODELO)
@@ -0,0 +1,124 @@
+# Arquivo: apps/matching/secoes.py
+#
+# Vetor do candidato POR SEÇÃO: um embedding para o resumo, um para CADA experiência,
+# um para o bloco de formações e um para o bloco de skills (montado a partir do cache
+# global de skills, ver skills.py). Cada seção fica salva na tabela EmbeddingSecao.
+#
+# Vantagens sobre o texto único:
+#   - editar uma experiência recodifica só aquela experiência;
+#   - perfis longos não são cortados pelo limite de tokens do modelo.
+#
+# O vetor final (o que vai para EmbeddingCandidato e para o Radar) é a média ponderada
+# das seções, com os pesos MATCHING_PESO_* por tipo de seção.
+
+import numpy as np
+from django.conf import settings
+
+from . import skills, vetores
+
+
+def pesos_por_tipo():
+    return {
+        'resumo': settings.MATCHING_PESO_RESUMO,
+        'experiencia': settings.MATCHING_PESO_EXPERIENCIAS,
+        'formacao': settings.MATCHING_PESO_FORMACOES,
+        'skills': settings.MATCHING_PESO_SKILLS,
+    }
+
+
+def _normalizar(vetor):
+    return (vetor / max(float(np.linalg.norm(vetor)), 1e-12)).astype(np.float32)
+
+
+def secoes_do_candidato(candidato):
+    """
+    [(chave, tipo, texto, hash do texto)] das seções de texto livre (as skills vêm à parte).
+    A chave identifica a seção na tabela: 'resumo', 'exp:<id>', 'formacoes'.
+    """
+    secoes = []
+    if hasattr(candidato, 'resumo_profissional') and candidato.resumo_profissional.texto:
+        secoes.append(('resumo', 'resumo', candidato.resumo_profissional.texto))
+
+    for exp in candidato.experiencias.all():
+        secoes.append((f'exp:{exp.pk}', 'experiencia', f"Experiência como {exp.cargo} em {exp.empresa}: {exp.descricao}"))
+
+    formacoes = [f"Formação em {f.nome_formacao} na {f.nome_instituicao}" for f in candidato.formacoes.all()]
+    if formacoes:
+        secoes.append(('formacoes', 'formacao', ". ".join(formacoes)))
+
+    return [(chave, tipo, texto, vetores.hash_texto(texto)) for chave, tipo, texto in secoes]
+
+
+def hash_perfil(secoes, lista_skills):
+    """
+    Identifica o vetor final: muda se qualquer seção, as skills ou os pesos mudarem.
+    """
+    partes = [f"{chave}:{hash_secao}" for chave, _, _, hash_secao in secoes]
+    partes.append("skills=" + ";".join(f"{nome}:{peso:g}" for nome, peso in lista_skills))
+    partes.append("pesos=" + ";".join(f"{tipo}:{peso:g}" for tipo, peso in sorted(pesos_por_tipo().items())))
+    return vetores.hash_texto("\n".join(partes))
+
+
+def secoes_faltando(candidato_id, secoes, salvas):
+    """
+    Seções sem vetor salvo (ou com texto alterado): [(candidato_id, chave, hash, texto)].
+    salvas = {chave: (hash, vetor)} do candidato.
+    """
+    return [
+        (candidato_id, chave, hash_secao, texto)
+        for chave, _, texto, hash_secao in secoes
+        if salvas.get(chave, (None,))[0] != hash_secao
+    ]
+
+
+def agregar(secoes, salvas, lista_skills, vetores_skills):
+    """
+    Média ponderada das seções (por tipo): vários itens do mesmo tipo (ex.: experiências)
+    viram primeiro a média deles, para um perfil com 10 experiências não abafar o resumo.
+    Retorna None se faltar o vetor de alguma seção ou skill.
+    """
+    grupos = {}
+    for chave, tipo, _, hash_secao in secoes:
+        salva = salvas.get(chave)
+        if salva is None or salva[0] != hash_secao:
+            return None
+        grupos.setdefault(tipo, []).append(salva[1])
+
+    if lista_skills:
+        if any(nome not in vetores_skills for nome, _ in lista_skills):
+            return None
+        grupos['skills'] = [np.average(
+            np.asarray([vetores_skills[nome] for nome, _ in lista_skills], dtype=np.float32),
+            axis=0, weights=[peso for _, peso in lista_skills],
+        )]
+
+    if not grupos:
+        return None
+    pesos = pesos_por_tipo()
+    total = sum(pesos[tipo] * _normalizar(np.mean(lista, axis=0)) for tipo, lista in grupos.items())
+    return _normalizar(total)
+
+
+def montar_vetores(candidato_ids, chaves, modelo, codificar_skills=None):
+    """
+    Junta as seções JÁ SALVAS com o cache de skills e grava o vetor final de cada candidato.
+    chaves = [(secoes, hash do perfil, skills)] na ordem de candidato_ids.
+    Retorna a lista de vetores (None onde faltou alguma seção ou skill sem vetor).
+    """
+    salvas = vetores.buscar_secoes(candidato_ids, modelo)
+    vetores_skills = skills.vetores_das_skills(
+        [nome for _, _, lista in chaves for nome, _ in lista], modelo, codificar=codificar_skills
+    )
+    resultado = [
+        agregar(secoes, salvas.get(cid, {}), lista, vetores_skills)
+        for cid, (secoes, _, lista) in zip(candidato_ids, chaves)
+    ]
+
+    prontos = [(cid, chave[1], v) for cid, chave, v in zip(candidato_ids, chaves, resultado) if v is not None]
+    vetores.salvar_embeddings_candidatos(prontos, modelo)
+    # Experiência apagada: a seção dela sai da tabela
+    vetores.remover_secoes_antigas(
+        {cid: [s[0] for s in chave[0]] for cid, chave, v in zip(candidato_ids, chaves, resultado) if v is not None},
+        salvas, modelo,
+    )
+    return resultado
@@ -0,0 +1,73 @@
+# Arquivo: apps/matching/servidor.py
+#
+# Servidor local de embeddings: UM processo dono do modelo de IA, que atende
+# todos os workers web por HTTP em localhost (ver cliente.py).
+# Pedidos que chegam ao mesmo tempo são juntados em um único `encode` (micro-lote).
+
+import base64
+import functools
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import engine
+from .lotes import FilaDeLotes
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fila = None    # preenchidos em criar_servidor
+    modelo = None
+
+    def _responder(self, status, dados):
+        corpo = json.dumps(dados).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._responder(200, {'status': 'ok', 'modelo': self.modelo})
+        else:
+            self._responder(404, {'erro': 'Rota não encontrada'})
+
+    def do_POST(self):
+        if self.path != '/codificar':
+            self._responder(404, {'erro': 'Rota não encontrada'})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+            textos = json.loads(self.rfile.read(tamanho))['textos']
+            vetores = self.fila.codificar(textos)
+        except Exception as e:
+            self._responder(500, {'erro': str(e)})
+            return
+
+        self._responder(200, {
+            'modelo': self.modelo,
+            'dimensao': int(vetores.shape[1]),
+            'vetores': base64.b64encode(vetores.tobytes()).decode('ascii'),
+        })
+
+    def log_message(self, format, *args):
+        pass  # Sem log por requisição (os workers chamam isso o tempo todo)
+
+
+def criar_servidor(host='127.0.0.1', porta=8765, janela_ms=5, lote_max=64, modelo=None):
+    """
+    Carrega o modelo (o ativo, se não for informado), configura o torch para usar
+    todos os núcleos e cria o servidor. Depois de uma troca de modelo, reinicie o
+    servidor: até lá os workers recusam as respostas e codificam sozinhos.
+    """
+    modelo = modelo or engine.modelo_ativo()
+    if engine.ler_id_do_modelo(modelo)[1] == 'torch':
+        import torch
+        torch.set_num_threads(os.cpu_count() or 1)
+
+    if engine.get_modelo(modelo) is None:
+        raise RuntimeError("Não foi possível carregar o modelo de IA.")
+
+    fila = FilaDeLotes(functools.partial(engine.codificar_no_modelo, modelo=modelo), janela_ms, lote_max)
+    handler = type('Handler', (_Handler,), {'fila': fila, 'modelo': modelo})
+    return ThreadingHTTPServer((host, porta), handler)
@@ -0,0 +1,52 @@
+# Arquivo: apps/matching/signals.py
+#
+# Toda edição de perfil (views AJAX, APIs do DRF, admin, inlines...) passa por um
+# save()/delete() de um destes modelos. Os signals marcam o vetor do dono como
+# desatualizado e agendam a recodificação em segundo plano (e o score das candidaturas afetadas
+# e as vagas recomendadas).
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from apps.usuarios.models import Experiencia, Formacao_Academica, Resumo_Profissional, Skill
+from apps.vagas.models import Candidatura, Vaga
+
+from . import pontuacoes, vetores
+from .tarefas import atualizador_embeddings
+
+
+def _agendar(candidato_ids=(), vaga_ids=()):
+    def depois_do_commit():
+        # Só depois do commit: o atualizador precisa enxergar o texto novo.
+        # Aqui só marca e agenda: nenhum vetor é calculado na thread da requisição
+        vetores.marcar_desatualizados(candidato_ids=candidato_ids, vaga_ids=vaga_ids)
+        if settings.MATCHING_ATUALIZACAO_ASSINCRONA:
+            atualizador_embeddings.agendar(candidato_ids=candidato_ids, vaga_ids=vaga_ids)
+        else:
+            atualizador_embeddings.agendar(candidatura_ids=pontuacoes.candidaturas_de(candidato_ids, vaga_ids))
+
+    transaction.on_commit(depois_do_commit)
+
+
+def perfil_alterado(sender, instance, **kwargs):
+    _agendar(candidato_ids=[instance.candidato_id])
+
+
+def vaga_alterada(sender, instance, **kwargs):
+    _agendar(vaga_ids=[instance.pk])
+
+
+def candidatura_criada(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: atualizador_embeddings.agendar(candidatura_ids=[instance.pk]))
+
+
+def conectar():
+    for modelo in (Skill, Experiencia, Formacao_Academica, Resumo_Profissional):
+        post_save.connect(perfil_alterado, sender=modelo, dispatch_uid=f'matching_save_{modelo.__name__}')
+        post_delete.connect(perfil_alterado, sender=modelo, dispatch_uid=f'matching_delete_{modelo.__name__}')
+    # Vaga apagada leva o vetor junto (CASCADE): só o save interessa
+    post_save.connect(vaga_alterada, sender=Vaga, dispatch_uid='matching_save_Vaga')
+    # Score materializado da candidatura (calculado em segundo plano)
+    post_save.connect(candidatura_criada, sender=Candidatura, dispatch_uid='matching_save_Candidatura')
@@ -0,0 +1,101 @@
+# Arquivo: apps/matching/skills.py
+#
+# Cache GLOBAL de vetores de skills: cada nome de skill (normalizado) é codificado
+# uma única vez para a plataforma inteira e fica salvo na tabela EmbeddingSkill.
+# A seção "skills" do candidato (ver secoes.py) é a média ponderada desses vetores:
+# incluir ou remover uma skill só refaz essa conta, o modelo de IA não roda.
+
+import re
+
+from django.conf import settings
+from django.db import IntegrityError
+
+from . import vetores
+from .cache import cache_embeddings
+from .models import EmbeddingSkill
+
+
+def normalizar_skill(nome):
+    """
+    ' Python  3 ' -> 'python 3'. Mantém acentos (o modelo entende 'comunicação' melhor que 'comunicacao').
+    """
+    return re.sub(r'\s+', ' ', (nome or '').strip()).casefold()
+
+
+def skills_do_candidato(candidato):
+    """
+    [(nome normalizado, peso)] em ordem alfabética, sem repetição.
+    Soft skills pesam MATCHING_PESO_SOFT_SKILL na média (hard skills pesam 1).
+    """
+    pesos = {}
+    for skill in candidato.skills.all():
+        nome = normalizar_skill(skill.nome)
+        if nome:
+            peso = settings.MATCHING_PESO_SOFT_SKILL if skill.tipo == 'soft' else 1.0
+            pesos[nome] = max(peso, pesos.get(nome, 0.0))
+    return sorted(pesos.items())
+
+
+def _chave(nome, modelo):
+    # Mesmo LRU dos textos: a chave 'skill:' não colide com hashes SHA-256
+    return (modelo, f"skill:{nome}")
+
+
+def vetores_das_skills(nomes, modelo, codificar=None):
+    """
+    Retorna {nome: vetor} procurando na memória, depois na tabela EmbeddingSkill.
+    Os nomes que faltarem são codificados com `codificar(textos) -> matriz`, em UMA chamada,
+    e gravados para todo o resto da plataforma. Com codificar=None, só devolve o que já existe.
+    """
+    nomes = list(dict.fromkeys(nomes))
+    encontrados = {
+        chave[1][len('skill:'):]: vetor
+        for chave, vetor in cache_embeddings.obter_varios([_chave(n, modelo) for n in nomes]).items()
+    }
+
+    faltando = [n for n in nomes if n not in encontrados]
+    if faltando:
+        do_banco = {
+            nome: vetores.de_bytes(vetor, formato, escala)
+            for nome, vetor, formato, escala in EmbeddingSkill.objects.filter(
+                nome__in=faltando, modelo=modelo
+            ).values_list('nome', 'vetor', 'formato', 'escala')
+        }
+        cache_embeddings.guardar_varios({_chave(n, modelo): v for n, v in do_banco.items()})
+        encontrados.update(do_banco)
+
+    faltando = [n for n in nomes if n not in encontrados]
+    if faltando and codificar is not None:
+        novos = dict(zip(faltando, codificar(faltando)))
+        salvar_vetores(novos, modelo)
+        encontrados.update(novos)
+    return encontrados
+
+
+def salvar_vetores(novos, modelo):
+    """
+    novos = {nome: vetor}. Outro processo pode ter gravado a mesma skill ao mesmo tempo:
+    ignore_conflicts mantém o primeiro vetor (são iguais).
+    """
+    if not novos:
+        return
+    registros = []
+    for nome, vetor in novos.items():
+        dados, formato, escala = vetores.para_bytes(vetor)
+        registros.append(EmbeddingSkill(nome=nome, modelo=modelo, vetor=dados, formato=formato, escala=escala))
+    try:
+        EmbeddingSkill.objects.bulk_create(registros, ignore_conflicts=True)
+    except IntegrityError as e:
+        print(f"Erro ao gravar vetores de skills: {e}")
+    cache_embeddings.guardar_varios({_chave(n, modelo): v for n, v in novos.items()})
+
+
+def nomes_sem_vetor(modelo):
+    """
+    Nomes de skill cadastrados que ainda não têm vetor no modelo (usado pelo `reembed`).
+    """
+    from apps.usuarios.models import Skill
+
+    existentes = set(EmbeddingSkill.objects.filter(modelo=modelo).values_list('nome', flat=True))
+    todos = {normalizar_skill(n) for n in Skill.objects.values_list('nome', flat=True).distinct()}
+    return sorted(n for n in todos if n and n not in existentes)
@@ -0,0 +1,181 @@
+# Arquivo: apps/matching/tarefas.py
+#
+# Atualizador de embeddings em segundo plano.
+# Os signals (signals.py) avisam quais perfis/vagas mudaram; uma thread por processo
+# junta os avisos por alguns segundos (várias edições seguidas do mesmo perfil viram
+# UMA recodificação) e recalcula tudo em lote, fora do caminho da requisição.
+# Depois dos vetores, recalcula o score materializado das candidaturas afetadas (pontuacoes.py)
+# e as vagas recomendadas dos candidatos (recomendacoes.py).
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+
+class AtualizadorEmbeddings:
+    """
+    Fila (conjunto, sem repetição) de candidatos e vagas com vetor desatualizado,
+    de candidaturas com score a calcular e de candidatos com recomendações a recalcular.
+    """
+
+    def __init__(self, janela_s=2.0, lote_max=64, varredura_s=300):
+        self.janela_s = janela_s
+        self.lote_max = lote_max
+        self.varredura_s = varredura_s
+        self._lock = threading.Lock()
+        self._evento = threading.Event()
+        self._candidatos = set()
+        self._vagas = set()
+        self._candidaturas = set()
+        self._recomendacoes = set()
+        self._thread = None
+        self._ultima_varredura = 0.0
+
+    def agendar(self, candidato_ids=(), vaga_ids=(), candidatura_ids=(), recomendacao_ids=()):
+        if not (candidato_ids or vaga_ids or candidatura_ids or recomendacao_ids):
+            return
+        with self._lock:
+            self._candidatos.update(candidato_ids)
+            self._vagas.update(vaga_ids)
+            self._candidaturas.update(candidatura_ids)
+            self._recomendacoes.update(recomendacao_ids)
+            # A thread nasce no próprio worker (nunca no master do gunicorn, que faz fork)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='atualizador-embeddings', daemon=True)
+                self._thread.start()
+        self._evento.set()
+
+    def pendentes(self):
+        with self._lock:
+            return len(self._candidatos), len(self._vagas), len(self._candidaturas), len(self._recomendacoes)
+
+    def _loop(self):
+        while True:
+            self._evento.wait(timeout=self.varredura_s)
+            # Janela de agrupamento: espera chegarem as outras edições do mesmo formulário
+            time.sleep(self.janela_s)
+            self._evento.clear()
+
+            with self._lock:
+                candidatos, self._candidatos = self._candidatos, set()
+                vagas, self._vagas = self._vagas, set()
+                candidaturas, self._candidaturas = self._candidaturas, set()
+                recomendacoes, self._recomendacoes = self._recomendacoes, set()
+
+            try:
+                if time.monotonic() - self._ultima_varredura >= self.varredura_s:
+                    self._ultima_varredura = time.monotonic()
+                    mais_candidatos, mais_vagas, mais_candidaturas = self._varrer_banco()
+                    candidatos.update(mais_candidatos)
+                    vagas.update(mais_vagas)
+                    candidaturas.update(mais_candidaturas)
+                    self._manter_indice_ann()
+                self.processar(candidatos, vagas, candidaturas, recomendacoes)
+            except Exception as e:
+                print(f"Erro no atualizador de embeddings: {e}")
+            finally:
+                # Thread fora do ciclo de requisição: fecha a conexão ela mesma
+                connection.close()
+
+    def _varrer_banco(self):
+        """
+        Recupera marcações feitas por processos que morreram antes de processar a fila,
+        e scores de candidatura vencidos (troca de modelo, `reembed`...).
+        """
+        from . import engine, pontuacoes
+        from .models import EmbeddingCandidato, EmbeddingVaga
+
+        limite = self.lote_max * 10
+        modelo = engine.modelo_ativo()
+        candidatos = EmbeddingCandidato.objects.filter(
+            modelo=modelo, desatualizado=True
+        ).values_list('candidato_id', flat=True)[:limite]
+        vagas = EmbeddingVaga.objects.filter(
+            modelo=modelo, desatualizado=True
+        ).values_list('vaga_id', flat=True)[:limite]
+        return set(candidatos), set(vagas), pontuacoes.candidaturas_vencidas(modelo, limite)
+
+    def _manter_indice_ann(self):
+        """
+        Índice aproximado (MATCHING_ANN_ATIVO): tira os candidatos apagados e, depois de
+        inserções/remoções demais desde a construção (MATCHING_ANN_RECONSTRUIR_FRACAO),
+        reconstrói o índice. Os outros workers recarregam ao ver o arquivo novo.
+        """
+        if not settings.MATCHING_ANN_ATIVO:
+            return
+        from . import ann, engine
+        from .models import EmbeddingCandidato
+
+        modelo = engine.modelo_ativo()
+        caminho = engine.caminho_indice_ann(modelo)
+        indice = ann.indice_candidatos.obter(caminho, modelo)
+        if indice is None:
+            return  # Nunca construído: fica a cargo do `construir_indice_ann`
+
+        existentes = set(EmbeddingCandidato.objects.filter(modelo=modelo).values_list('candidato_id', flat=True))
+        indice.remover_varios(set(indice.ids()) - existentes)
+
+        if indice.precisa_reconstruir(settings.MATCHING_ANN_RECONSTRUIR_FRACAO):
+            novo = ann.reconstruir(modelo, caminho, n_sondas=indice.n_sondas)
+            if novo is not None:
+                print(f"Índice ANN reconstruído: {len(novo)} candidatos, {novo.n_listas} listas")
+
+    def processar(self, candidato_ids, vaga_ids, candidatura_ids=(), recomendacao_ids=()):
+        """
+        Recalcula os vetores em lotes de até `lote_max` perfis (uma chamada ao modelo por lote),
+        depois o score das candidaturas desses perfis/vagas (mais as de `candidatura_ids`)
+        e as recomendações de `recomendacao_ids` e dos perfis alterados que já tinham lista.
+        """
+        from apps.usuarios.models import Candidato
+        from apps.vagas.models import Vaga
+        from . import engine, pontuacoes, recomendacoes
+        from .models import EmbeddingCandidato, EmbeddingVaga, RecomendacoesCandidato
+
+        # Só o modelo ativo: vetores de um modelo em construção ficam para o `reembed`
+        modelo = engine.modelo_ativo()
+        candidato_ids = sorted(candidato_ids)
+        for inicio in range(0, len(candidato_ids), self.lote_max):
+            lote = candidato_ids[inicio:inicio + self.lote_max]
+            candidatos = list(
+                Candidato.objects.filter(pk__in=lote)
+                .select_related("resumo_profissional")
+                .prefetch_related("skills", "experiencias", "formacoes")
+            )
+            novos = engine.vetores_dos_candidatos(candidatos, aceitar_desatualizado=False, modelo=modelo)
+            # Perfil esvaziado: o vetor antigo não representa mais nada
+            vazios = [c.pk for c, vetor in zip(candidatos, novos) if vetor is None]
+            EmbeddingCandidato.objects.filter(candidato_id__in=vazios, modelo=modelo).delete()
+            # Texto não mudou (ex.: salvou sem alterar): o vetor salvo continua válido
+            EmbeddingCandidato.objects.filter(
+                candidato_id__in=lote, modelo=modelo, desatualizado=True
+            ).update(desatualizado=False)
+
+        for vaga in Vaga.objects.filter(pk__in=vaga_ids):
+            engine.vetor_da_vaga(vaga, aceitar_desatualizado=False, modelo=modelo)
+        EmbeddingVaga.objects.filter(
+            vaga_id__in=list(vaga_ids), modelo=modelo, desatualizado=True
+        ).update(desatualizado=False)
+
+        candidaturas = sorted(set(candidatura_ids) | pontuacoes.candidaturas_de(candidato_ids, vaga_ids))
+        for inicio in range(0, len(candidaturas), self.lote_max):
+            pontuacoes.pontuar_candidaturas(candidaturas[inicio:inicio + self.lote_max], modelo)
+
+        # Vagas alteradas: as listas dos outros candidatos vencem pelo carimbo e são
+        # recalculadas quando eles abrirem o painel (não refaz a plataforma inteira)
+        recomendacao_ids = set(recomendacao_ids) | set(
+            RecomendacoesCandidato.objects.filter(candidato_id__in=candidato_ids, modelo=modelo)
+            .values_list('candidato_id', flat=True)
+        )
+        recomendacao_ids = sorted(recomendacao_ids)
+        for inicio in range(0, len(recomendacao_ids), self.lote_max):
+            recomendacoes.recalcular(recomendacao_ids[inicio:inicio + self.lote_max], modelo)
+
+
+# Instância única por processo
+atualizador_embeddings = AtualizadorEmbeddings(
+    janela_s=settings.MATCHING_ATUALIZADOR_JANELA_S,
+    lote_max=settings.MATCHING_ATUALIZADOR_LOTE_MAX,
+    varredura_s=settings.MATCHING_ATUALIZADOR_VARREDURA_S,
+)
@@ -0,0 +1,115 @@
+# Utilitários dos testes do matching: vetores sintéticos, um "modelo" falso
+# (sem sentence-transformers nem rede), a criação de candidatos com perfil
+# e o cenário do Radar (empresa, recrutador, vaga e candidatos).
+
+import tempfile
+import zlib
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import override_settings
+
+from apps.matching import engine
+from apps.usuarios.models import Candidato, Empresa, Recrutador, Resumo_Profissional, Usuario
+from apps.vagas.models import Vaga
+
+DIMENSOES = 64
+
+
+def normalizar(matriz):
+    return (matriz / np.linalg.norm(matriz, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def agrupados(n, grupos=32, ruido=0.35, semente=0):
+    """
+    Vetores normalizados em torno de alguns centros (como perfis de áreas parecidas).
+    """
+    rng = np.random.default_rng(semente)
+    centros = normalizar(rng.standard_normal((grupos, DIMENSOES)))
+    pontos = centros[rng.integers(grupos, size=n)] + ruido * rng.standard_normal((n, DIMENSOES)) / np.sqrt(DIMENSOES)
+    return normalizar(pontos)
+
+
+def codificar_falso(textos, batch_size=32, modelo=None):
+    """
+    Substitui o modelo de IA nos testes: saco de palavras com hash, normalizado.
+    Textos com palavras em comum têm cosseno alto; sempre o mesmo vetor para o mesmo texto.
+    """
+    matriz = np.zeros((len(textos), DIMENSOES), dtype=np.float32)
+    for i, texto in enumerate(textos):
+        for palavra in texto.lower().split():
+            matriz[i, zlib.crc32(palavra.encode()) % DIMENSOES] += 1
+    matriz[:, 0] += 0.1  # texto vazio não vira vetor nulo
+    return normalizar(matriz)
+
+
+class ModeloFalso:
+    """
+    Mesma interface do SentenceTransformer.encode, para o pool do reembed.
+    """
+
+    def encode(self, textos, batch_size=32, convert_to_numpy=True, normalize_embeddings=True):
+        return codificar_falso(textos)
+
+
+def criar_candidato(i, resumo=None):
+    usuario = Usuario.objects.create_user(
+        username=f'candidato{i}', email=f'candidato{i}@exemplo.com', password='x', first_name=f'Candidato {i}'
+    )
+    candidato = Candidato.objects.create(usuario=usuario, cpf=f'{i:011d}')
+    if resumo:
+        Resumo_Profissional.objects.create(candidato=candidato, texto=resumo)
+    return candidato
+
+
+class CenarioRadarMixin:
+    """
+    Empresa Premium com um recrutador, uma vaga e candidatos com resumo (sem vetor salvo).
+    O modelo de IA é o codificar_falso e o atualizador em segundo plano não roda.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(nome='Acme', cnpj='00000000000100', setor='TI', plano_assinado='premium')
+        cls.usuario_recrutador = Usuario.objects.create_user(
+            username='recrutador', email='recrutador@acme.com', password='x', tipo_usuario='recrutador'
+        )
+        cls.recrutador = Recrutador.objects.create(usuario=cls.usuario_recrutador, empresa=cls.empresa)
+        cls.vaga = cls.criar_vaga('Desenvolvedor Python', 'Backend com Django e APIs REST', 'Python Django SQL')
+        cls.candidatos = [
+            criar_candidato(i, texto) for i, texto in enumerate([
+                'Desenvolvedor Python com Django e APIs REST',
+                'Backend Python Django SQL',
+                'Engenheiro de dados Python SQL',
+                'Desenvolvedor Django APIs',
+                'Analista Python',
+                'Desenvolvedor backend REST',
+            ])
+        ]
+
+    @classmethod
+    def criar_vaga(cls, titulo, descricao='', requisitos=''):
+        return Vaga.objects.create(
+            empresa=cls.empresa, recrutador=cls.recrutador, titulo=titulo,
+            descricao=descricao, requisitos=requisitos, tipo_contrato='CLT', localidade='São Paulo',
+        )
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        # Sem pré-seleção léxica: com poucos candidatos o Radar pontua todos de qualquer jeito
+        configuracoes = override_settings(
+            MATCHING_DIR=Path(pasta.name), MATCHING_RERANK_ATIVO=False, MATCHING_PREFILTRO_ATIVO=False,
+        )
+        configuracoes.enable()
+        self.addCleanup(configuracoes.disable)
+        # Modelo ativo e vetores memorizados por outro teste (ou por outro banco)
+        engine._modelo_ativo = (None, 0.0)
+        engine.cache_embeddings.limpar()
+        for alvo, substituto in (
+            (mock.patch.object(engine, '_codificar_sem_cache', side_effect=codificar_falso), 'codificar'),
+            (mock.patch.object(engine.atualizador_embeddings, 'agendar'), 'agendar'),
+        ):
+            setattr(self, substituto, alvo.start())
+            self.addCleanup(alvo.stop)
@@ -0,0 +1,94 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.matching.ann import IndiceIVF
+from apps.matching.matriz import pontuar_segmentos
+from apps.matching.quantizacao import quantizar_matriz
+
+from .base import DIMENSOES, agrupados, normalizar
+
+
+class IndiceIVFTests(SimpleTestCase):
+    """
+    Índice aproximado: recall do top-k contra a busca exata, total estimado,
+    atualização incremental e persistência.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.matriz = agrupados(8000)
+        cls.ids = np.arange(1, 8001, dtype=np.int64)
+        cls.indice = IndiceIVF(n_sondas=8)
+        cls.indice.construir(cls.ids, cls.matriz)
+        rng = np.random.default_rng(1)
+        cls.vagas = normalizar(
+            cls.matriz[rng.choice(8000, 40, replace=False)] + 0.2 * rng.standard_normal((40, DIMENSOES)) / np.sqrt(DIMENSOES)
+        )
+
+    def recall(self, indice, top_k=20, n_sondas=None):
+        recalls = []
+        for vaga in self.vagas:
+            exatos = self.ids[np.argsort(-(self.matriz @ vaga))[:top_k]]
+            aproximados, _ = indice.buscar(vaga, top_k=top_k, n_sondas=n_sondas)
+            recalls.append(len(set(exatos) & set(aproximados)) / top_k)
+        return np.mean(recalls)
+
+    def test_recall_top_k(self):
+        self.assertGreaterEqual(self.recall(self.indice), 0.9)
+        # Mais sondas, mais listas visitadas: o recall não pode cair
+        self.assertGreaterEqual(self.recall(self.indice, n_sondas=32), self.recall(self.indice, n_sondas=1))
+
+    def test_construir_da_matriz_compacta(self):
+        codigos, escalas = quantizar_matriz(self.matriz, 'i8')
+        indice = IndiceIVF(n_sondas=8)
+        indice.construir(self.ids, codigos, escalas)
+        self.assertEqual(len(indice), len(self.ids))
+        self.assertGreaterEqual(self.recall(indice), 0.9)
+
+    def test_total_estimado(self):
+        erros = []
+        for vaga in self.vagas:
+            _, total_exato = pontuar_segmentos(vaga, [(self.ids, self.matriz, None, None)], top_k=1, limiar=20)
+            _, _, total = self.indice.buscar_com_total(vaga, top_k=20, limiar=20)
+            erros.append(abs(total - total_exato) / max(total_exato, 1))
+        self.assertLess(np.median(erros), 0.25)
+
+    def test_inserir_e_remover(self):
+        indice = IndiceIVF(n_sondas=8)
+        indice.construir(self.ids[:1000], self.matriz[:1000])
+        indice.inserir(5000, self.matriz[4999])
+        self.assertEqual(indice.buscar(self.matriz[4999], top_k=1)[0][0], 5000)
+        indice.remover(5000)
+        indice.remover(1)
+        self.assertNotIn(5000, indice.ids())
+        self.assertEqual(len(indice), 999)
+        self.assertFalse(indice.precisa_reconstruir(0.2))
+        indice.remover_varios(range(2, 202))
+        self.assertTrue(indice.precisa_reconstruir(0.2))
+
+    def test_inserir_varios_substitui(self):
+        indice = IndiceIVF(n_sondas=8)
+        indice.construir(self.ids[:1000], self.matriz[:1000])
+        # Os 10 primeiros ganham vetores novos, mais 500 candidatos novos, em um lote só (int8)
+        ids = np.concatenate([self.ids[:10], self.ids[2000:2500]])
+        codigos, escalas = quantizar_matriz(self.matriz[ids + 2000 - 1], 'i8')
+        indice.inserir_varios(ids, codigos, escalas)
+
+        self.assertEqual(len(indice), 1500)
+        self.assertEqual(sum(len(lista[0]) for lista in indice._listas), 1500)
+        encontrados, _ = indice.buscar(self.matriz[2000 + 3 - 1], top_k=1, n_sondas=indice.n_listas)
+        self.assertEqual(encontrados[0], 3)
+
+    def test_salvar_e_carregar(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'indice.npz'
+            self.indice.salvar(caminho)
+            carregado = IndiceIVF.carregar(caminho)
+        self.assertEqual(len(carregado), len(self.indice))
+        self.assertEqual(carregado._listas[0][1].dtype, np.int8)
+        for vaga in self.vagas[:5]:
+            np.testing.assert_array_equal(carregado.buscar(vaga, top_k=10)[0], self.indice.buscar(vaga, top_k=10)[0])
@@ -0,0 +1,54 @@
+import json
+
+from django.test import TransactionTestCase, override_settings
+from django.urls import include, path, reverse
+
+from apps.vagas import views
+
+from .base import CenarioRadarMixin
+
+# urls.py escolhe as views na importação (VIEWS_ASSINCRONAS): aqui as rotas do Radar
+# apontam para as versões assíncronas e o resto do site continua igual
+urlpatterns = [
+    path('radar-de-talentos/', views.radar_de_talentos_async),
+    path('radar-de-talentos/lote/', views.radar_em_lote_async),
+    path('radar-de-talentos/stream/', views.radar_de_talentos_stream_async),
+    path('', include('vagalume_carreiras.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ViewsAssincronasTests(CenarioRadarMixin, TransactionTestCase):
+    """
+    Views ASGI do Radar: mesmas telas das síncronas, com a inferência no executor.
+    TransactionTestCase: as threads do executor abrem a própria conexão e só enxergam o que foi gravado.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Depois dos mocks do mixin: sem transação do teste, o on_commit dos sinais roda na hora
+        self.setUpTestData()
+        self.async_client.force_login(self.usuario_recrutador)
+
+    async def test_radar(self):
+        resposta = await self.async_client.post(reverse('radar_de_talentos'), {'vaga_id': self.vaga.id})
+        self.assertEqual(resposta.status_code, 200)
+        candidatos = resposta.context['candidatos_ordenados']
+        self.assertTrue(candidatos)
+        self.assertEqual(candidatos[0]['candidato'].pk, self.candidatos[0].pk)
+        self.assertFalse(resposta.context['incompleto'])
+
+    async def test_stream(self):
+        resposta = await self.async_client.get(reverse('radar_de_talentos_stream'), {'vaga_id': self.vaga.id})
+        self.assertEqual(resposta['Content-Type'], 'application/x-ndjson')
+        corpo = b''.join([parte async for parte in resposta.streaming_content]).decode()
+        linhas = [json.loads(linha) for linha in corpo.splitlines()]
+        self.assertTrue(linhas[-1]['fim'])
+        self.assertEqual(linhas[-1]['candidatos'][0]['email'], 'candidato0@exemplo.com')
+
+    async def test_radar_em_lote(self):
+        resposta = await self.async_client.get(reverse('radar_em_lote'))
+        self.assertEqual(resposta.status_code, 200)
+        (item,) = resposta.context['resultados']
+        self.assertEqual(item['vaga'].pk, self.vaga.pk)
+        self.assertTrue(item['candidatos'])
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.matching import engine
+from apps.matching.models import EmbeddingCandidato, EmbeddingVaga
+from apps.matching.tarefas import AtualizadorEmbeddings, atualizador_embeddings
+from apps.usuarios.models import Candidato
+from apps.vagas.models import Candidatura
+
+from .base import CenarioRadarMixin
+
+
+class SignalsTests(CenarioRadarMixin, TestCase):
+    """
+    Edição de perfil/vaga: marca o vetor e agenda a recodificação, só depois do commit.
+    """
+
+    def setUp(self):
+        super().setUp()
+        engine.vetores_dos_candidatos(self.candidatos, modelo=engine.modelo_ativo())
+        engine.vetor_da_vaga(self.vaga, modelo=engine.modelo_ativo())
+        self.agendar.reset_mock()
+
+    def test_perfil_alterado_so_depois_do_commit(self):
+        candidato = self.candidatos[0]
+        with self.captureOnCommitCallbacks() as callbacks:
+            candidato.resumo_profissional.texto = 'Professor de matemática'
+            candidato.resumo_profissional.save()
+            self.agendar.assert_not_called()
+        self.assertFalse(EmbeddingCandidato.objects.get(candidato=candidato).desatualizado)
+
+        for callback in callbacks:
+            callback()
+        self.assertTrue(EmbeddingCandidato.objects.get(candidato=candidato).desatualizado)
+        self.agendar.assert_called_once_with(candidato_ids=[candidato.pk], vaga_ids=())
+
+    def test_vaga_alterada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vaga.titulo = 'Desenvolvedor Java'
+            self.vaga.save()
+        self.assertTrue(EmbeddingVaga.objects.get(vaga=self.vaga).desatualizado)
+        self.agendar.assert_called_once_with(candidato_ids=(), vaga_ids=[self.vaga.pk])
+
+    def test_candidatura_nova_agenda_o_score(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            candidatura = Candidatura.objects.create(vaga=self.vaga, candidato=self.candidatos[1])
+        self.agendar.assert_called_once_with(candidatura_ids=[candidatura.pk])
+
+
+class AtualizadorEmbeddingsTests(CenarioRadarMixin, TestCase):
+    """
+    Fila sem repetição e o processamento em lote (o mesmo que a thread faz).
+    """
+
+    def test_agendar_junta_os_ids(self):
+        atualizador = AtualizadorEmbeddings()
+        with mock.patch.object(AtualizadorEmbeddings, '_loop'):
+            atualizador.agendar(candidato_ids=[1, 2])
+            atualizador.agendar(candidato_ids=[2, 3], vaga_ids=[7])
+            atualizador.agendar()
+        self.assertEqual(atualizador.pendentes(), (3, 1, 0, 0))
+
+    def test_processar_recodifica_e_apaga_perfil_vazio(self):
+        modelo = engine.modelo_ativo()
+        engine.vetores_dos_candidatos(self.candidatos, modelo=modelo)
+        alterado, esvaziado = self.candidatos[0], self.candidatos[1]
+        alterado.resumo_profissional.texto = 'Professor de matemática'
+        alterado.resumo_profissional.save()
+        esvaziado.resumo_profissional.delete()
+        EmbeddingCandidato.objects.filter(candidato__in=[alterado, esvaziado]).update(desatualizado=True)
+        self.codificar.reset_mock()
+
+        atualizador_embeddings.processar({alterado.pk, esvaziado.pk, self.candidatos[2].pk}, {self.vaga.pk})
+
+        salvo = EmbeddingCandidato.objects.get(candidato=alterado)
+        self.assertFalse(salvo.desatualizado)
+        self.assertEqual(salvo.hash_texto, engine.chave_candidato(Candidato.objects.get(pk=alterado.pk))[1])
+        self.assertIn(['Professor de matemática'], [c.args[0] for c in self.codificar.call_args_list])
+        self.assertFalse(EmbeddingCandidato.objects.filter(candidato=esvaziado).exists())
+        self.assertTrue(EmbeddingVaga.objects.filter(vaga=self.vaga, modelo=modelo, desatualizado=False).exists())
+        self.agendar.assert_not_called()
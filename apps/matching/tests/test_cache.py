@@ -0,0 +1,70 @@
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache as cache_django
+from django.test import SimpleTestCase, override_settings
+
+from apps.matching import engine
+from apps.matching.cache import CacheEmbeddings
+
+from .base import DIMENSOES, codificar_falso
+
+MODELO = 'modelo-teste'
+
+
+def vetor(valor):
+    return np.full(DIMENSOES, valor, dtype=np.float32)
+
+
+@override_settings(MATCHING_CACHE_DJANGO=False)
+class CacheEmbeddingsTests(SimpleTestCase):
+    """
+    LRU limitado em bytes e os contadores que o status do matching mostra.
+    """
+
+    def test_contadores_e_taxa_de_acerto(self):
+        cache = CacheEmbeddings(limite_bytes=1024 * 1024)
+        cache.guardar_varios({(MODELO, 'a'): vetor(1)})
+
+        encontrados = cache.obter_varios([(MODELO, 'a'), (MODELO, 'b'), (MODELO, 'c')])
+        self.assertEqual(list(encontrados), [(MODELO, 'a')])
+        estatisticas = cache.estatisticas()
+        self.assertEqual(estatisticas['acertos_memoria'], 1)
+        self.assertEqual(estatisticas['faltas'], 2)
+        self.assertEqual(estatisticas['taxa_acerto'], round(1 / 3, 4))
+        self.assertEqual(estatisticas['bytes_usados'], DIMENSOES * 4)
+
+    def test_limite_em_bytes_descarta_o_menos_usado(self):
+        cache = CacheEmbeddings(limite_bytes=2 * DIMENSOES * 4)
+        cache.guardar_varios({(MODELO, 'a'): vetor(1), (MODELO, 'b'): vetor(2)})
+        cache.obter_varios([(MODELO, 'a')])  # 'a' usado por último: 'b' é o próximo a sair
+        cache.guardar_varios({(MODELO, 'c'): vetor(3)})
+
+        self.assertEqual(set(cache.obter_varios([(MODELO, k) for k in 'abc'])), {(MODELO, 'a'), (MODELO, 'c')})
+        self.assertEqual(cache.estatisticas()['itens'], 2)
+        self.assertLessEqual(cache.estatisticas()['bytes_usados'], cache.limite_bytes)
+
+    @override_settings(MATCHING_CACHE_DJANGO=True)
+    def test_segundo_nivel_no_cache_do_django(self):
+        cache_django.clear()
+        CacheEmbeddings(limite_bytes=1024 * 1024).guardar_varios({(MODELO, 'a'): vetor(1)})
+
+        outro_worker = CacheEmbeddings(limite_bytes=1024 * 1024)
+        encontrados = outro_worker.obter_varios([(MODELO, 'a')])
+        np.testing.assert_array_equal(encontrados[(MODELO, 'a')], vetor(1))
+        self.assertEqual(outro_worker.estatisticas()['acertos_django'], 1)
+        # Depois do primeiro acesso, o vetor fica na memória do processo
+        outro_worker.obter_varios([(MODELO, 'a')])
+        self.assertEqual(outro_worker.estatisticas()['acertos_memoria'], 1)
+
+    def test_codificar_textos_so_chama_o_modelo_para_o_que_falta(self):
+        cache = CacheEmbeddings(limite_bytes=1024 * 1024)
+        with mock.patch.object(engine, 'cache_embeddings', cache), \
+                mock.patch.object(engine, '_codificar_sem_cache', side_effect=codificar_falso) as modelo:
+            engine.codificar_textos(['python django', 'python django', 'java'], modelo=MODELO)
+            self.assertEqual(modelo.call_args.args[0], ['python django', 'java'])
+
+            matriz = engine.codificar_textos(['java', 'go'], modelo=MODELO)
+            self.assertEqual(modelo.call_args.args[0], ['go'])
+        np.testing.assert_allclose(matriz, codificar_falso(['java', 'go']))
+        self.assertEqual(cache.estatisticas()['acertos_memoria'], 1)
@@ -0,0 +1,30 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.matching.compartilhada import _travar_sem_esperar
+
+
+class TravaMesclagemTests(SimpleTestCase):
+    """
+    Só um worker mescla o delta; sem trava na plataforma, ninguém mescla.
+    """
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.caminho = Path(pasta.name) / 'mesclagem.lock'
+
+    def test_segundo_processo_nao_trava(self):
+        with open(self.caminho, 'w') as primeiro, open(self.caminho, 'w') as segundo:
+            self.assertTrue(_travar_sem_esperar(primeiro))
+            self.assertFalse(_travar_sem_esperar(segundo))
+        # Arquivo fechado: a trava foi liberada
+        with open(self.caminho, 'w') as terceiro:
+            self.assertTrue(_travar_sem_esperar(terceiro))
+
+    def test_sem_fcntl_nem_msvcrt(self):
+        with mock.patch.dict('sys.modules', {'fcntl': None, 'msvcrt': None}), open(self.caminho, 'w') as arquivo:
+            self.assertIsNone(_travar_sem_esperar(arquivo))
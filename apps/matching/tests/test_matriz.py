@@ -0,0 +1,136 @@
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from apps.matching import matriz, vetores
+from apps.matching.matriz import MatrizCandidatos, estimar_total, pontuar_segmentos
+
+from .base import DIMENSOES, agrupados, criar_candidato, normalizar
+
+MODELO = 'modelo-teste'
+
+
+class PontuarSegmentosTests(SimpleTestCase):
+    """
+    Um produto matriz-vetor pontua o banco inteiro: mesmo resultado do cosseno um a um.
+    """
+
+    def setUp(self):
+        self.matriz = agrupados(2000)
+        self.ids = np.arange(10, 2010, dtype=np.int64)
+        self.vaga = self.matriz[3]
+
+    def test_ranking_e_total_iguais_ao_laco(self):
+        ranking, total = pontuar_segmentos(self.vaga, [(self.ids, self.matriz, None, None)], top_k=20, limiar=20)
+        esperados = [
+            (int(candidato_id), int(np.rint(max(float(vetor @ self.vaga), 0) * 100)))
+            for candidato_id, vetor in zip(self.ids, self.matriz)
+        ]
+        acima = [item for item in esperados if item[1] > 20]
+        self.assertEqual(total, len(acima))
+        self.assertEqual([score for _, score in ranking], sorted((s for _, s in acima), reverse=True)[:20])
+        self.assertEqual(ranking[0][0], 13)
+
+    def test_segmentos_mascara_e_restricao(self):
+        metade = 1000
+        escalas = np.ones(metade, dtype=np.float32)
+        segmentos = [
+            (self.ids[:metade], self.matriz[:metade], escalas, np.arange(metade) != 3),  # linha 3 desativada
+            (self.ids[metade:], self.matriz[metade:], escalas, None),
+        ]
+        ranking, _ = pontuar_segmentos(self.vaga, segmentos, top_k=5)
+        self.assertNotIn(13, [candidato_id for candidato_id, _ in ranking])
+
+        restritos = np.array([15, 1500], dtype=np.int64)
+        ranking, total = pontuar_segmentos(self.vaga, segmentos, top_k=5, limiar=-1, restringir_a=restritos)
+        self.assertEqual({candidato_id for candidato_id, _ in ranking}, {15, 1500})
+        self.assertEqual(total, 2)
+
+
+class EstimarTotalTests(SimpleTestCase):
+    """
+    Total do banco inteiro por amostra, para o Radar com pré-seleção léxica.
+    """
+
+    def setUp(self):
+        self.matriz = agrupados(20000, semente=3)
+        self.ids = np.arange(1, 20001, dtype=np.int64)
+
+    def test_exato_com_banco_menor_que_a_amostra(self):
+        segmentos = [(self.ids[:3000], self.matriz[:3000], None, None)]
+        _, exato = pontuar_segmentos(self.matriz[0], segmentos, top_k=1, limiar=30)
+        self.assertEqual(estimar_total(self.matriz[0], segmentos, limiar=30, amostra=4096), exato)
+
+    def test_estimativa_perto_do_total(self):
+        escalas = np.ones(10000, dtype=np.float32)
+        ativos = np.arange(10000) % 7 != 0
+        segmentos = [
+            (self.ids[:10000], self.matriz[:10000], escalas, ativos),
+            (self.ids[10000:], self.matriz[10000:], escalas, None),
+        ]
+        erros = []
+        for vaga in self.matriz[:20]:
+            _, exato = pontuar_segmentos(vaga, segmentos, top_k=1, limiar=30)
+            estimado = estimar_total(vaga, segmentos, limiar=30, amostra=2000)
+            erros.append(abs(estimado - exato) / max(exato, 1))
+        self.assertLess(np.median(erros), 0.15)
+
+
+class MatrizCandidatosTests(TestCase):
+    """
+    Cache da matriz: depois da carga inicial, só as linhas alteradas são lidas do banco.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidatos = [criar_candidato(i) for i in range(5)]
+
+    def setUp(self):
+        self.vetores = normalizar(np.random.default_rng(0).standard_normal((10, DIMENSOES)))
+        self.salvar(self.candidatos, self.vetores[:5])
+        self.cache = MatrizCandidatos(formato='i8')
+
+    def salvar(self, candidatos, lista):
+        vetores.salvar_embeddings_candidatos([(c.pk, 'hash', v) for c, v in zip(candidatos, lista)], MODELO)
+
+    def linha(self, candidato):
+        ids, compacta, escalas = self.cache.obter(MODELO)
+        i = int(np.searchsorted(ids, candidato.pk))
+        self.assertEqual(ids[i], candidato.pk)
+        return compacta[i].astype(np.float32) * escalas[i]
+
+    def test_sem_alteracao_uma_consulta_so(self):
+        self.cache.obter(MODELO)
+        with self.assertNumQueries(1):
+            ids, _, _ = self.cache.obter(MODELO)
+        self.assertEqual(list(ids), sorted(c.pk for c in self.candidatos))
+
+    def test_alteracao_gravada_no_lugar(self):
+        _, compacta, _ = self.cache.obter(MODELO)
+        self.salvar(self.candidatos[2:3], self.vetores[7:8])
+        _, atualizada, _ = self.cache.obter(MODELO)
+        self.assertIs(atualizada, compacta)
+        np.testing.assert_allclose(self.linha(self.candidatos[2]), self.vetores[7], atol=0.01)
+
+    def test_candidato_novo_entra_em_ordem(self):
+        self.cache.obter(MODELO)
+        novo = criar_candidato(9)
+        self.salvar([novo], self.vetores[9:])
+        ids, compacta, escalas = self.cache.obter(MODELO)
+        self.assertEqual(list(ids), sorted(ids))
+        self.assertEqual(len(ids), 6)
+        np.testing.assert_allclose(self.linha(novo), self.vetores[9], atol=0.01)
+
+    def test_apagado_sai_na_conferencia_da_contagem(self):
+        self.cache.obter(MODELO)
+        apagado = self.candidatos[1]
+        apagado.usuario.delete()
+
+        ids, _, _ = self.cache.obter(MODELO)
+        self.assertIn(apagado.pk, ids)  # entre duas conferências ainda aparece (a view ignora)
+        with mock.patch.object(matriz, 'VERIFICAR_CONTAGEM_S', 0):
+            ids, compacta, escalas = self.cache.obter(MODELO)
+        self.assertNotIn(apagado.pk, ids)
+        self.assertEqual(len(ids), compacta.shape[0])
+        self.assertEqual(len(ids), len(escalas))
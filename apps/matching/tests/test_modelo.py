@@ -0,0 +1,66 @@
+import io
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from apps.matching import engine, vetores
+from apps.matching.models import VersaoModelo
+
+from .base import DIMENSOES, CenarioRadarMixin
+
+
+class IdDoModeloTests(CenarioRadarMixin, TestCase):
+    """
+    O runtime faz parte do id do modelo: trocar de backend é trocar de modelo.
+    """
+
+    def test_id_com_o_runtime(self):
+        self.assertEqual(engine.id_do_modelo('m', backend='torch'), 'm')
+        self.assertEqual(engine.id_do_modelo('m', backend='onnx', int8=False), 'm@onnx')
+        self.assertEqual(engine.id_do_modelo('m', backend='onnx', int8=True), 'm@onnx-int8')
+        self.assertEqual(engine.id_do_modelo('m@onnx', backend='torch'), 'm@onnx')
+        self.assertEqual(engine.id_do_modelo('m@torch', backend='onnx'), 'm')
+        self.assertEqual(engine.ler_id_do_modelo('org/m@onnx-int8'), ('org/m', 'onnx', True))
+        self.assertEqual(engine.ler_id_do_modelo('org/m'), ('org/m', 'torch', False))
+        with self.assertRaises(ValueError):
+            engine.ler_id_do_modelo('m@tensorrt')
+
+    @override_settings(MATCHING_BACKEND='onnx', MATCHING_ONNX_INT8=True)
+    def test_backend_onnx_muda_o_modelo_padrao(self):
+        engine._modelo_ativo = (None, 0.0)
+        self.addCleanup(setattr, engine, '_modelo_ativo', (None, 0.0))
+        self.assertEqual(engine.modelo_ativo(), f'{engine.MODELO_NOME}@onnx-int8')
+
+    def test_onnx_sem_exportacao_nao_cai_para_o_torch(self):
+        self.assertIsNone(engine.opcoes_do_modelo('m')['pasta_onnx'])
+        with self.assertRaises(FileNotFoundError):
+            engine.opcoes_do_modelo('m@onnx-int8')
+
+
+class ModeloEmbeddingsComandoTests(CenarioRadarMixin, TestCase):
+
+    def salvar(self, candidatos, modelo):
+        vetor = np.ones(DIMENSOES, dtype=np.float32) / np.sqrt(DIMENSOES)
+        vetores.salvar_embeddings_candidatos([(c.pk, 'hash', vetor) for c in candidatos], modelo)
+
+    def test_ativar_recusa_sem_cobertura_total(self):
+        atual = engine.modelo_ativo()
+        self.salvar(self.candidatos, atual)
+        self.salvar(self.candidatos[:-1], 'modelo-novo')
+
+        with self.assertRaises(CommandError):
+            call_command('modelo_embeddings', 'ativar', 'modelo-novo', stdout=io.StringIO())
+        self.assertFalse(VersaoModelo.objects.filter(status='ativo').exists())
+
+        self.salvar(self.candidatos[-1:], 'modelo-novo')
+        call_command('modelo_embeddings', 'ativar', 'modelo-novo', stdout=io.StringIO())
+        self.assertEqual(VersaoModelo.objects.get(status='ativo').nome, 'modelo-novo')
+        self.assertEqual(VersaoModelo.objects.get(nome=atual).status, 'aposentado')
+
+    @override_settings(MATCHING_BACKEND='onnx', MATCHING_ONNX_INT8=False)
+    def test_sombra_grava_o_runtime_no_nome(self):
+        call_command('modelo_embeddings', 'sombra', 'modelo-novo', stdout=io.StringIO())
+        self.assertEqual(VersaoModelo.objects.get(status='sombra').nome, 'modelo-novo@onnx')
+        with self.assertRaises(CommandError):
+            call_command('modelo_embeddings', 'sombra', 'modelo-novo@tensorrt', stdout=io.StringIO())
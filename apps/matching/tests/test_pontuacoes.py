@@ -0,0 +1,67 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.matching import engine, pontuacoes
+from apps.matching.models import EmbeddingCandidato
+from apps.vagas.models import Candidatura
+
+from .base import CenarioRadarMixin
+
+
+class ScoreMaterializadoTests(CenarioRadarMixin, TestCase):
+    """
+    Score gravado na Candidatura em segundo plano; a lista da vaga ordena e pagina no banco.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.modelo = engine.modelo_ativo()
+        self.candidaturas = [Candidatura.objects.create(vaga=self.vaga, candidato=c) for c in self.candidatos]
+
+    def pontuar(self):
+        pontuacoes.pontuar_candidaturas([c.pk for c in self.candidaturas], self.modelo)
+        for candidatura in self.candidaturas:
+            candidatura.refresh_from_db()
+
+    def test_score_igual_ao_cosseno(self):
+        self.pontuar()
+        vetor_vaga = engine.vetor_da_vaga(self.vaga, modelo=self.modelo)
+        vetores = engine.vetores_dos_candidatos(self.candidatos, modelo=self.modelo)
+        for candidatura, vetor in zip(self.candidaturas, vetores):
+            self.assertEqual(candidatura.score, engine.similaridade_percentual(vetor_vaga, vetor))
+            self.assertEqual(candidatura.score_modelo, self.modelo)
+            self.assertIsNotNone(candidatura.score_calculado_em)
+
+    def test_candidaturas_vencidas(self):
+        self.assertEqual(pontuacoes.candidaturas_vencidas(self.modelo, 100), {c.pk for c in self.candidaturas})
+        self.pontuar()
+        self.assertEqual(pontuacoes.candidaturas_vencidas(self.modelo, 100), set())
+
+        # Vetor do candidato regravado depois do score (ex.: reembed) e score de outro modelo
+        EmbeddingCandidato.objects.filter(candidato=self.candidatos[0], modelo=self.modelo).update(
+            atualizado_em=timezone.now() + datetime.timedelta(seconds=1)
+        )
+        Candidatura.objects.filter(pk=self.candidaturas[1].pk).update(score_modelo='modelo-antigo')
+        self.assertEqual(
+            pontuacoes.candidaturas_vencidas(self.modelo, 100), {self.candidaturas[0].pk, self.candidaturas[1].pk}
+        )
+        self.assertEqual(len(pontuacoes.candidaturas_vencidas('outro-modelo', 2)), 2)
+
+    def test_lista_da_vaga_ordenada_pelo_score(self):
+        self.pontuar()
+        sem_score = self.candidaturas[0]
+        Candidatura.objects.filter(pk=sem_score.pk).update(score=None)
+
+        self.client.force_login(self.usuario_recrutador)
+        resposta = self.client.get(reverse('ver_candidatos_vaga', args=[self.vaga.id]))
+        self.assertEqual(resposta.status_code, 200)
+
+        lista = list(resposta.context['candidaturas'])
+        scores = [c.score for c in lista[:-1]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(lista[-1].pk, sem_score.pk)  # sem score vai para o fim
+        self.assertTrue(resposta.context['incompleto'])
+        self.agendar.assert_called_once_with(candidatura_ids=[sem_score.pk])
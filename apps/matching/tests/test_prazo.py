@@ -0,0 +1,49 @@
+import time
+
+from django.test import TestCase
+
+from apps.matching import engine
+from apps.usuarios.models import Skill
+
+from .base import CenarioRadarMixin, codificar_falso, criar_candidato
+
+
+class RadarComPrazoTests(CenarioRadarMixin, TestCase):
+    """
+    Radar com prazo: perfis novos sem vetor são codificados até o prazo; o resto vai para o segundo plano.
+    """
+
+    def test_sem_prazo_ranking_completo(self):
+        ranking, total, completo = engine.ranquear_com_prazo(self.vaga, top_k=10, pendentes=10)
+        self.assertTrue(completo)
+        self.assertEqual(total, len(ranking))
+        self.assertEqual(ranking[0][0], self.candidatos[0].pk)
+        self.assertEqual([score for _, score in ranking], sorted((score for _, score in ranking), reverse=True))
+        self.agendar.assert_not_called()
+
+    def test_prazo_esgotado_marca_incompleto(self):
+        def codificar_lento(textos, batch_size=32, modelo=None):
+            time.sleep(0.05)
+            return codificar_falso(textos)
+
+        self.codificar.side_effect = codificar_lento
+        _, _, completo = engine.ranquear_com_prazo(self.vaga, top_k=10, prazo_ms=1, pendentes=10)
+        self.assertFalse(completo)
+        adiados = self.agendar.call_args.kwargs['candidato_ids']
+        self.assertTrue(adiados)
+        self.assertLessEqual(set(adiados), {c.pk for c in self.candidatos})
+
+    def test_perfil_vazio_nao_ocupa_o_limite(self):
+        so_skill = criar_candidato(20)
+        Skill.objects.create(candidato=so_skill, nome='Python', tipo='hard')
+        vazios = [criar_candidato(i) for i in range(10, 14)]  # mais novos: ocupariam o limite inteiro
+
+        novos, adiados = engine.codificar_candidatos_pendentes(limite=len(vazios))
+        self.assertEqual(adiados, [])
+        self.assertIn(so_skill.pk, novos)
+        self.assertFalse(set(novos) & {c.pk for c in vazios})
+
+        # Na rodada seguinte os vazios continuam de fora: só sobra quem tem texto e ainda não tem vetor
+        restantes = {c.pk for c in self.candidatos} - set(novos)
+        novos, _ = engine.codificar_candidatos_pendentes(limite=20)
+        self.assertEqual(set(novos), restantes)
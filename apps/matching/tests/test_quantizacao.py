@@ -0,0 +1,54 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.matching import vetores
+from apps.matching.matriz import pontuar_segmentos
+from apps.matching.quantizacao import desquantizar_matriz, produto_matriz_vetor, quantizar_matriz
+
+from .base import agrupados
+
+
+class QuantizacaoTests(SimpleTestCase):
+    """
+    A matriz compacta (float16/int8) tem que ranquear como a float32.
+    """
+
+    def setUp(self):
+        self.matriz = agrupados(3000)
+        self.ids = np.arange(1, 3001, dtype=np.int64)
+        self.vaga = self.matriz[7]
+
+    def test_bytes_do_banco_ida_e_volta(self):
+        for formato, tolerancia in (('f32', 0), ('f16', 1e-3), ('i8', 1e-2)):
+            dados, salvo, escala = vetores.para_bytes(self.vaga, formato)
+            self.assertEqual(salvo, formato)
+            lido = vetores.de_bytes(dados, formato, escala)
+            self.assertEqual(lido.dtype, np.float32)
+            self.assertLessEqual(np.abs(lido - self.vaga).max(), tolerancia, formato)
+        self.assertEqual(len(vetores.para_bytes(self.vaga, 'i8')[0]), self.vaga.size)
+
+    def test_produto_matriz_vetor_proximo_do_float(self):
+        exato = self.matriz @ self.vaga
+        for formato, tolerancia in (('f16', 1e-3), ('i8', 1e-2)):
+            compacta, escalas = quantizar_matriz(self.matriz, formato)
+            # bloco pequeno: passa pelo laço de conversão várias vezes
+            scores = produto_matriz_vetor(compacta, escalas, self.vaga, bloco=100)
+            self.assertLess(np.abs(scores - exato).max(), tolerancia, formato)
+            np.testing.assert_allclose(desquantizar_matriz(compacta, escalas), self.matriz, atol=tolerancia)
+            # Várias vagas de uma vez (D x V): mesma coisa que uma por uma
+            varias = produto_matriz_vetor(compacta, escalas, self.matriz[[7, 0, 1]].T, bloco=100)
+            np.testing.assert_allclose(varias[:, 0], scores, atol=1e-5)
+
+    def test_ranking_quantizado_igual_ao_float(self):
+        referencia, total_ref = pontuar_segmentos(self.vaga, [(self.ids, self.matriz, None, None)], top_k=50)
+        scores_ref = dict(referencia)
+        for formato in ('f16', 'i8'):
+            compacta, escalas = quantizar_matriz(self.matriz, formato)
+            ranking, total = pontuar_segmentos(self.vaga, [(self.ids, compacta, escalas, None)], top_k=50)
+            # Scores são inteiros de 0 a 100: no máximo 1 ponto de diferença por arredondamento
+            for candidato_id, score in ranking:
+                if candidato_id in scores_ref:
+                    self.assertLessEqual(abs(score - scores_ref[candidato_id]), 1, formato)
+            comuns = len(set(scores_ref) & {candidato_id for candidato_id, _ in ranking})
+            self.assertGreaterEqual(comuns / len(referencia), 0.9, formato)
+            self.assertLessEqual(abs(total - total_ref), 0.01 * total_ref + 5, formato)
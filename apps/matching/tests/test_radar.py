@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.matching import engine
+
+from .base import CenarioRadarMixin
+
+
+class RadarPreSelecaoTests(CenarioRadarMixin, TestCase):
+    """
+    Com a pré-seleção léxica, só os pré-selecionados são pontuados, mas o total é do banco todo.
+    """
+
+    def test_total_conta_o_banco_inteiro(self):
+        engine.vetores_dos_candidatos(self.candidatos, modelo=engine.modelo_ativo())
+        ranking_completo, total_completo = engine.ranquear_candidatos_para_vaga(self.vaga, top_k=10, limiar=0)
+        self.assertEqual(total_completo, len(self.candidatos))
+
+        pre_selecionados = np.array(sorted(c.pk for c in self.candidatos[:2]), dtype=np.int64)
+        with override_settings(MATCHING_PREFILTRO_ATIVO=True), \
+                mock.patch.object(engine.indice_lexico, 'pre_selecionar', return_value=pre_selecionados):
+            ranking, total = engine.ranquear_candidatos_para_vaga(self.vaga, top_k=10, limiar=0)
+        self.assertEqual({cid for cid, _ in ranking}, set(pre_selecionados.tolist()))
+        self.assertEqual(total, total_completo)
+
+
+class RadarStreamTests(CenarioRadarMixin, TestCase):
+    """
+    Radar em NDJSON: uma linha por etapa, a última marcada com fim.
+    """
+
+    def test_linhas_ndjson_terminam_com_fim(self):
+        self.client.force_login(self.usuario_recrutador)
+        resposta = self.client.get(reverse('radar_de_talentos_stream'), {'vaga_id': self.vaga.id})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'application/x-ndjson')
+
+        corpo = b''.join(resposta.streaming_content).decode()
+        self.assertTrue(corpo.endswith('\n'))
+        linhas = [json.loads(linha) for linha in corpo.splitlines()]
+        self.assertGreaterEqual(len(linhas), 2)
+        self.assertTrue(linhas[-1]['fim'])
+        self.assertFalse(any(linha['fim'] for linha in linhas[:-1]))
+        self.assertNotIn('erro', linhas[-1])
+        self.assertTrue(linhas[-1]['completo'])
+        self.assertEqual(linhas[-1]['candidatos'][0]['email'], 'candidato0@exemplo.com')
+
+
+class RadarEmLoteTests(CenarioRadarMixin, TestCase):
+    """
+    Radar em lote: uma passada vagas x candidatos, mesmo ranking do Radar de cada vaga.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vaga_dados = cls.criar_vaga('Engenheiro de Dados', 'Pipelines em Python', 'SQL Python')
+
+    def test_igual_ao_radar_de_cada_vaga(self):
+        engine.vetores_dos_candidatos(self.candidatos, modelo=engine.modelo_ativo())
+        rankings = engine.ranquear_candidatos_para_vagas([self.vaga, self.vaga_dados], top_k=4, limiar=0)
+        for vaga in (self.vaga, self.vaga_dados):
+            self.assertEqual(rankings[vaga.id], engine.ranquear_candidatos_para_vaga(vaga, top_k=4, limiar=0))
+        self.assertEqual(rankings[self.vaga.id][0][0][0], self.candidatos[0].pk)
+
+    def test_tela_com_candidatos_em_varias_vagas(self):
+        self.client.force_login(self.usuario_recrutador)
+        resposta = self.client.get(reverse('radar_em_lote'))
+        self.assertEqual(resposta.status_code, 200)
+
+        resultados = {item['vaga'].pk: item for item in resposta.context['resultados']}
+        self.assertEqual(set(resultados), {self.vaga.pk, self.vaga_dados.pk})
+        self.assertTrue(resultados[self.vaga.pk]['candidatos'])
+        for item in resposta.context['multiplas_vagas']:
+            self.assertGreaterEqual(len(item['vagas']), 2)
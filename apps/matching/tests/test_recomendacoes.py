@@ -0,0 +1,70 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.matching import engine, recomendacoes
+from apps.matching.models import EmbeddingCandidato
+
+from .base import CenarioRadarMixin
+
+
+class RecomendacoesTests(CenarioRadarMixin, TestCase):
+    """
+    Vagas recomendadas: top-N calculado em segundo plano; o painel só lê e pagina.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vaga_dados = cls.criar_vaga('Engenheiro de Dados', 'Pipelines de dados', 'SQL Python')
+        cls.vaga_design = cls.criar_vaga('Designer', 'Interfaces e protótipos', 'Figma')
+
+    def setUp(self):
+        super().setUp()
+        self.modelo = engine.modelo_ativo()
+        self.candidato = self.candidatos[0]
+        engine.vetores_dos_candidatos(self.candidatos, modelo=self.modelo)
+        engine.vetores_das_vagas([self.vaga, self.vaga_dados, self.vaga_design], modelo=self.modelo)
+
+    def test_lista_ordenada_so_com_vagas_abertas(self):
+        self.vaga_design.status = False
+        self.vaga_design.save()
+        recomendacoes.recalcular([self.candidato.pk], self.modelo)
+
+        lista, em_dia = recomendacoes.obter(self.candidato.pk, self.modelo)
+        self.assertTrue(em_dia)
+        self.assertEqual({vaga_id for vaga_id, _ in lista}, {self.vaga.pk, self.vaga_dados.pk})
+        self.assertEqual(lista[0][0], self.vaga.pk)
+        self.assertEqual([score for _, score in lista], sorted((score for _, score in lista), reverse=True))
+
+    def test_lista_vence(self):
+        recomendacoes.recalcular([self.candidato.pk], self.modelo)
+        self.assertTrue(recomendacoes.obter(self.candidato.pk, self.modelo)[1])
+
+        # Vetor do candidato regravado depois do cálculo
+        EmbeddingCandidato.objects.filter(candidato=self.candidato, modelo=self.modelo).update(
+            atualizado_em=timezone.now() + datetime.timedelta(seconds=1)
+        )
+        self.assertFalse(recomendacoes.obter(self.candidato.pk, self.modelo)[1])
+
+        # Vaga fechada: muda o carimbo das vagas abertas
+        recomendacoes.recalcular([self.candidato.pk], self.modelo)
+        self.vaga_dados.status = False
+        self.vaga_dados.save()
+        self.assertFalse(recomendacoes.obter(self.candidato.pk, self.modelo)[1])
+
+    def test_painel_sem_lista_agenda_e_com_lista_mostra_o_score(self):
+        self.client.force_login(self.candidato.usuario)
+        resposta = self.client.get(reverse('home_candidato'))
+        self.assertEqual(resposta.status_code, 200)
+        self.agendar.assert_called_once_with(candidato_ids=[self.candidato.pk], recomendacao_ids=[self.candidato.pk])
+
+        recomendacoes.recalcular([self.candidato.pk], self.modelo)
+        self.agendar.reset_mock()
+        resposta = self.client.get(reverse('home_candidato'))
+        vagas = list(resposta.context['vagas'])
+        self.assertEqual(vagas[0], self.vaga)
+        self.assertTrue(all(hasattr(vaga, 'score') for vaga in vagas))
+        self.agendar.assert_not_called()
@@ -0,0 +1,61 @@
+import io
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.matching import engine, paralelo
+from apps.matching.models import EmbeddingCandidato, EmbeddingVaga
+
+from .base import CenarioRadarMixin, ModeloFalso
+
+
+class ReembedTests(CenarioRadarMixin, TestCase):
+    """
+    manage.py reembed em um processo só (o pool usa as mesmas funções de paralelo.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.modelo_falso = mock.Mock(wraps=ModeloFalso())
+        inicializar = mock.patch.object(
+            paralelo, 'inicializar_processo',
+            side_effect=lambda opcoes, threads: setattr(paralelo, '_modelo', self.modelo_falso),
+        )
+        inicializar.start()
+        self.addCleanup(inicializar.stop)
+
+    def reembed(self, **opcoes):
+        call_command('reembed', processos=1, stdout=io.StringIO(), **opcoes)
+
+    def gravados(self, classe, campo_id):
+        return set(classe.objects.filter(modelo=engine.modelo_ativo()).values_list(campo_id, flat=True))
+
+    @override_settings(MATCHING_VETOR_POR_SECAO=False)
+    def test_grava_todos_e_nao_recodifica_texto_igual(self):
+        self.reembed()
+        self.assertEqual(self.gravados(EmbeddingCandidato, 'candidato_id'), {c.pk for c in self.candidatos})
+        self.assertEqual(self.gravados(EmbeddingVaga, 'vaga_id'), {self.vaga.pk})
+        self.assertFalse(list(settings.MATCHING_DIR.glob('reembed_*.json')))  # terminou: sem checkpoint
+
+        self.modelo_falso.encode.reset_mock()
+        self.reembed()
+        self.modelo_falso.encode.assert_not_called()
+
+    def test_por_secao_retoma_do_checkpoint(self):
+        caminho = settings.MATCHING_DIR / f'reembed_{engine.modelo_ativo()}.json'
+        caminho.write_text(json.dumps({'candidatos': self.candidatos[2].pk, 'vagas': self.vaga.pk}))
+        self.reembed()
+        self.assertEqual(self.gravados(EmbeddingCandidato, 'candidato_id'), {c.pk for c in self.candidatos[3:]})
+        self.assertEqual(self.gravados(EmbeddingVaga, 'vaga_id'), set())
+
+
+class NucleosDisponiveisTests(SimpleTestCase):
+
+    def test_sem_sched_getaffinity_usa_cpu_count(self):
+        with mock.patch.object(paralelo, 'os', mock.Mock(spec=['cpu_count'], cpu_count=lambda: 3)):
+            self.assertEqual(paralelo.nucleos_disponiveis(), 3)
+        with mock.patch.object(paralelo, 'os', mock.Mock(spec=['cpu_count'], cpu_count=lambda: None)):
+            self.assertEqual(paralelo.nucleos_disponiveis(), 1)
@@ -0,0 +1,67 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.matching.rerank import ReordenadorCrossEncoder
+
+from .base import CenarioRadarMixin
+
+
+class CrossEncoderFalso:
+    """
+    Mesma interface do CrossEncoder.predict: score = palavras em comum entre vaga e candidato.
+    """
+
+    def __init__(self, espera_s=0.0):
+        self.espera_s = espera_s
+        self.pares = 0
+
+    def predict(self, pares, batch_size=8, show_progress_bar=False):
+        time.sleep(self.espera_s)
+        self.pares += len(pares)
+        return [len(set(vaga.lower().split()) & set(candidato.lower().split())) for vaga, candidato in pares]
+
+
+class ReordenadorTests(CenarioRadarMixin, TestCase):
+    """
+    Cross-encoder só no topo e dentro do orçamento; sem ele, fica a ordem dos embeddings.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.reordenador = ReordenadorCrossEncoder('cross-encoder-falso', lote=2)
+        # Ordem "dos embeddings" de propósito invertida: o melhor candidato por último
+        self.itens = [(c.pk, 50 - i) for i, c in enumerate(reversed(self.candidatos))]
+
+    def test_reordena_so_o_topo(self):
+        self.reordenador._modelo = CrossEncoderFalso()
+        resultado = self.reordenador.reordenar(self.vaga, self.itens, top=len(self.itens) - 1, orcamento_ms=5000)
+        self.assertEqual(resultado[-1], self.itens[-1])  # fora do topo: não se mexe
+        self.assertEqual(sorted(resultado[:-1]), sorted(self.itens[:-1]))
+        self.assertNotEqual(resultado[:-1], self.itens[:-1])
+        self.assertEqual(self.reordenador.reordenados, 1)
+
+    def test_pares_ja_pontuados_vem_do_cache(self):
+        modelo = self.reordenador._modelo = CrossEncoderFalso()
+        primeira = self.reordenador.reordenar(self.vaga, self.itens, top=6, orcamento_ms=5000)
+        pares = modelo.pares
+        segunda = self.reordenador.reordenar(self.vaga, self.itens, top=6, orcamento_ms=5000)
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(modelo.pares, pares)
+
+    def test_orcamento_estourado_mantem_a_ordem(self):
+        self.reordenador._modelo = CrossEncoderFalso(espera_s=0.05)
+        inicio = time.perf_counter()
+        resultado = self.reordenador.reordenar(self.vaga, self.itens, top=6, orcamento_ms=20)
+        self.assertEqual(resultado, self.itens)
+        self.assertEqual(self.reordenador.desistencias, 1)
+        # Desiste no lote em que o relógio estoura, não depois de pontuar todos
+        self.assertLess(time.perf_counter() - inicio, 0.15)
+
+    def test_modelo_carregando_nao_espera(self):
+        with mock.patch('apps.matching.rerank.threading.Thread') as thread:
+            resultado = self.reordenador.reordenar(self.vaga, self.itens, top=6, orcamento_ms=5000)
+            self.reordenador.reordenar(self.vaga, self.itens, top=6, orcamento_ms=5000)
+        self.assertEqual(resultado, self.itens)
+        thread.return_value.start.assert_called_once()  # a segunda requisição não dispara outra carga
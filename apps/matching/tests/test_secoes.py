@@ -0,0 +1,81 @@
+import datetime
+
+import numpy as np
+from django.test import TestCase, override_settings
+
+from apps.matching import engine, secoes
+from apps.matching.models import EmbeddingSecao
+from apps.usuarios.models import Candidato, Experiencia
+
+from .base import CenarioRadarMixin, codificar_falso
+
+
+@override_settings(MATCHING_VETOR_POR_SECAO=True)
+class SecoesTests(CenarioRadarMixin, TestCase):
+    """
+    Vetor por seção: editar uma experiência recodifica só aquela experiência.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.candidato = self.candidatos[0]
+        self.experiencias = [
+            Experiencia.objects.create(
+                candidato=self.candidato, cargo=cargo, empresa='Acme', descricao=descricao,
+                data_inicio=datetime.date(2020, 1, 1),
+            )
+            for cargo, descricao in (('Desenvolvedor', 'APIs em Django'), ('Analista', 'Relatórios em SQL'))
+        ]
+
+    def vetor(self, aceitar_desatualizado=False):
+        return engine.vetores_dos_candidatos(
+            [Candidato.objects.get(pk=self.candidato.pk)],
+            aceitar_desatualizado=aceitar_desatualizado, modelo=engine.modelo_ativo(),
+        )[0]
+
+    def chaves_salvas(self):
+        return set(EmbeddingSecao.objects.filter(candidato=self.candidato).values_list('chave', flat=True))
+
+    def test_vetor_e_a_media_ponderada_das_secoes(self):
+        vetor = self.vetor()
+        lista = secoes.secoes_do_candidato(Candidato.objects.get(pk=self.candidato.pk))
+        por_tipo = {}
+        for _, tipo, texto, _ in lista:
+            por_tipo.setdefault(tipo, []).append(codificar_falso([texto])[0])
+        pesos = secoes.pesos_por_tipo()
+        esperado = sum(pesos[tipo] * secoes._normalizar(np.mean(v, axis=0)) for tipo, v in por_tipo.items())
+        np.testing.assert_allclose(vetor, secoes._normalizar(esperado), atol=0.01)
+        self.assertEqual(self.chaves_salvas(), {'resumo', *(f'exp:{e.pk}' for e in self.experiencias)})
+
+    def test_editar_uma_experiencia_recodifica_so_ela(self):
+        antes = self.vetor()
+        editada = self.experiencias[1]
+        editada.descricao = 'Dashboards em Power BI'
+        editada.save()
+        self.codificar.reset_mock()
+
+        depois = self.vetor()
+        self.codificar.assert_called_once()
+        self.assertEqual(self.codificar.call_args.args[0], ['Experiência como Analista em Acme: Dashboards em Power BI'])
+        self.assertFalse(np.allclose(antes, depois))
+
+    def test_experiencia_apagada_sai_da_tabela(self):
+        self.vetor()
+        self.experiencias[0].delete()
+        self.codificar.reset_mock()
+
+        self.vetor()
+        self.codificar.assert_not_called()  # as seções que sobraram já estão salvas
+        self.assertEqual(self.chaves_salvas(), {'resumo', f'exp:{self.experiencias[1].pk}'})
+
+    def test_requisicao_usa_o_vetor_anterior_e_agenda(self):
+        antes = self.vetor()
+        self.experiencias[0].descricao = 'Outra coisa'
+        self.experiencias[0].save()
+        self.codificar.reset_mock()
+
+        with override_settings(MATCHING_ATUALIZACAO_ASSINCRONA=True):
+            vetor = self.vetor(aceitar_desatualizado=None)
+        np.testing.assert_allclose(vetor, antes, atol=1e-3)  # o salvo (float16), não um recalculado
+        self.codificar.assert_not_called()
+        self.agendar.assert_called_with(candidato_ids=[self.candidato.pk])
@@ -0,0 +1,49 @@
+import numpy as np
+from django.test import TestCase
+
+from apps.matching import engine, skills
+from apps.matching.models import EmbeddingSkill
+from apps.usuarios.models import Candidato, Skill
+
+from .base import CenarioRadarMixin
+
+
+class SkillsTests(CenarioRadarMixin, TestCase):
+    """
+    Cache global de skills: cada nome é codificado uma vez para a plataforma inteira.
+    """
+
+    def vetor(self, candidato):
+        # Instância nova (o prefetch das skills da anterior está velho), como no atualizador
+        return engine.vetores_dos_candidatos(
+            [Candidato.objects.get(pk=candidato.pk)], aceitar_desatualizado=False, modelo=engine.modelo_ativo()
+        )[0]
+
+    def textos_codificados(self):
+        return [texto for chamada in self.codificar.call_args_list for texto in chamada.args[0]]
+
+    def test_nome_normalizado_e_peso_da_soft_skill(self):
+        candidato = self.candidatos[0]
+        Skill.objects.create(candidato=candidato, nome='  Python   3 ', tipo='hard')
+        Skill.objects.create(candidato=candidato, nome='Comunicação', tipo='soft')
+        Skill.objects.create(candidato=candidato, nome='python 3', tipo='soft')
+        self.assertEqual(
+            skills.skills_do_candidato(candidato), [('comunicação', 0.5), ('python 3', 1.0)]
+        )
+
+    def test_skill_conhecida_nao_chama_o_modelo(self):
+        primeiro, segundo = self.candidatos[0], self.candidatos[1]
+        Skill.objects.create(candidato=primeiro, nome='Kubernetes', tipo='hard')
+        self.vetor(primeiro)
+        self.assertEqual(self.textos_codificados().count('kubernetes'), 1)
+        self.assertTrue(EmbeddingSkill.objects.filter(nome='kubernetes', modelo=engine.modelo_ativo()).exists())
+
+        self.vetor(segundo)
+        self.codificar.reset_mock()
+        engine.cache_embeddings.limpar()  # vem da tabela EmbeddingSkill, não só da memória
+        antes = self.vetor(segundo)
+        Skill.objects.create(candidato=segundo, nome=' KUBERNETES', tipo='hard')
+        depois = self.vetor(segundo)
+
+        self.codificar.assert_not_called()
+        self.assertFalse(np.allclose(antes, depois))
@@ -0,0 +1,8 @@
+# Arquivo: apps/matching/urls.py
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('status/', views.status_matching, name='status_matching'),
+]
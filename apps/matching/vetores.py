@@ -0,0 +1,198 @@
+# Arquivo: apps/matching/vetores.py
+#
+# Camada de persistência dos embeddings (tabelas EmbeddingCandidato/EmbeddingVaga/EmbeddingSecao).
+# Não carrega o modelo de IA: apenas lê e grava vetores já calculados pela engine.
+
+import hashlib
+
+import numpy as np
+from django.conf import settings
+
+from .models import EmbeddingCandidato, EmbeddingSecao, EmbeddingVaga
+from .quantizacao import FORMATOS, desquantizar, quantizar
+
+
+def hash_texto(texto: str) -> str:
+    """
+    Gera o SHA-256 do texto do perfil. Se o hash mudar, o vetor salvo está velho.
+    """
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def para_bytes(vetor, formato=None):
+    """
+    Compacta o vetor no formato configurado (MATCHING_FORMATO_VETOR).
+    Retorna (bytes, formato, escala) — exatamente o que vai para o banco.
+    """
+    formato = formato or settings.MATCHING_FORMATO_VETOR
+    compacto, escala = quantizar(vetor, formato)
+    return compacto.tobytes(), formato, escala
+
+
+def de_bytes_compacto(dados, formato='f32'):
+    """
+    Lê os bytes no formato original (sem converter para float32).
+    """
+    return np.frombuffer(bytes(dados), dtype=FORMATOS[formato])
+
+
+def de_bytes(dados, formato='f32', escala=1.0) -> np.ndarray:
+    """
+    Lê os bytes do banco e devolve o vetor em float32.
+    """
+    return desquantizar(de_bytes_compacto(dados, formato), escala)
+
+
+def _campos(vetor):
+    dados, formato, escala = para_bytes(vetor)
+    # Vetor recém-calculado: deixa de estar desatualizado
+    return {'vetor': dados, 'formato': formato, 'escala': escala, 'desatualizado': False}
+
+
+def buscar_embedding_vaga(vaga_id, modelo):
+    """
+    Retorna (hash_texto, vetor) salvos para a vaga, ou None.
+    """
+    registro = (
+        EmbeddingVaga.objects.filter(vaga_id=vaga_id, modelo=modelo)
+        .values_list('hash_texto', 'vetor', 'formato', 'escala')
+        .first()
+    )
+    if registro is None:
+        return None
+    return registro[0], de_bytes(*registro[1:])
+
+
+def buscar_embeddings_vagas(vaga_ids, modelo):
+    """
+    Retorna {vaga_id: (hash_texto, vetor)} em UMA consulta só.
+    """
+    registros = EmbeddingVaga.objects.filter(
+        vaga_id__in=list(vaga_ids), modelo=modelo
+    ).values_list('vaga_id', 'hash_texto', 'vetor', 'formato', 'escala')
+    return {vid: (h, de_bytes(v, f, e)) for vid, h, v, f, e in registros}
+
+
+def buscar_embeddings_candidatos(candidato_ids, modelo):
+    """
+    Retorna {candidato_id: (hash_texto, vetor)} em UMA consulta só.
+    """
+    registros = EmbeddingCandidato.objects.filter(
+        candidato_id__in=list(candidato_ids), modelo=modelo
+    ).values_list('candidato_id', 'hash_texto', 'vetor', 'formato', 'escala')
+    return {cid: (h, de_bytes(v, f, e)) for cid, h, v, f, e in registros}
+
+
+def buscar_secoes(candidato_ids, modelo):
+    """
+    Retorna {candidato_id: {chave da seção: (hash_texto, vetor)}} em UMA consulta.
+    """
+    resultado = {}
+    registros = EmbeddingSecao.objects.filter(
+        candidato_id__in=list(candidato_ids), modelo=modelo
+    ).values_list('candidato_id', 'chave', 'hash_texto', 'vetor', 'formato', 'escala')
+    for cid, chave, h, v, f, e in registros:
+        resultado.setdefault(cid, {})[chave] = (h, de_bytes(v, f, e))
+    return resultado
+
+
+def salvar_embedding_vaga(vaga_id, modelo, hash_atual, vetor):
+    EmbeddingVaga.objects.update_or_create(
+        vaga_id=vaga_id,
+        modelo=modelo,
+        defaults={'hash_texto': hash_atual, **_campos(vetor)},
+    )
+
+
+def _salvar_em_lote(classe, campo_id, itens, modelo):
+    if not itens:
+        return
+    # Um registro por dono (o último vence): o ON CONFLICT não aceita a mesma chave duas vezes
+    registros = {
+        dono_id: classe(**{campo_id: dono_id}, modelo=modelo, hash_texto=hash_atual, **_campos(vetor))
+        for dono_id, hash_atual, vetor in itens
+    }
+    # Upsert em UMA instrução: o signal (requisição) e o atualizador em segundo plano podem gravar
+    # o mesmo perfil ao mesmo tempo; ler-e-depois-criar daria IntegrityError na chave (dono, modelo)
+    classe.objects.bulk_create(
+        list(registros.values()),
+        update_conflicts=True,
+        unique_fields=[campo_id, 'modelo'],
+        update_fields=['hash_texto', 'vetor', 'formato', 'escala', 'desatualizado', 'atualizado_em'],
+    )
+
+
+def salvar_embeddings_candidatos(itens, modelo):
+    """
+    Grava vários vetores de uma vez: itens = [(candidato_id, hash_texto, vetor), ...].
+    Atualiza os que já existem e cria os novos (upsert com bulk_create).
+    """
+    _salvar_em_lote(EmbeddingCandidato, 'candidato_id', itens, modelo)
+
+
+def salvar_embeddings_vagas(itens, modelo):
+    """
+    Igual ao salvar_embeddings_candidatos: itens = [(vaga_id, hash_texto, vetor), ...].
+    """
+    _salvar_em_lote(EmbeddingVaga, 'vaga_id', itens, modelo)
+
+
+def salvar_secoes(itens, modelo):
+    """
+    Grava os vetores das seções: itens = [(candidato_id, chave, hash_texto, vetor), ...].
+    """
+    if not itens:
+        return
+    registros = {}
+    for cid, chave, hash_atual, vetor in itens:
+        dados, formato, escala = para_bytes(vetor)
+        registros[(cid, chave)] = EmbeddingSecao(
+            candidato_id=cid, modelo=modelo, chave=chave,
+            hash_texto=hash_atual, vetor=dados, formato=formato, escala=escala,
+        )
+    # Mesmo upsert do _salvar_em_lote (gravações simultâneas do mesmo candidato)
+    EmbeddingSecao.objects.bulk_create(
+        list(registros.values()),
+        update_conflicts=True,
+        unique_fields=['candidato_id', 'modelo', 'chave'],
+        update_fields=['hash_texto', 'vetor', 'formato', 'escala', 'atualizado_em'],
+    )
+
+
+def remover_secoes_antigas(chaves_atuais, salvas, modelo):
+    """
+    Apaga as seções que não existem mais no perfil (ex.: experiência removida).
+    chaves_atuais = {candidato_id: [chaves]}; salvas = retorno do buscar_secoes (evita outra consulta).
+    """
+    for cid, chaves in chaves_atuais.items():
+        sobrando = set(salvas.get(cid, {})) - set(chaves)
+        if sobrando:
+            EmbeddingSecao.objects.filter(candidato_id=cid, modelo=modelo, chave__in=sobrando).delete()
+
+
+def marcar_desatualizados(candidato_ids=(), vaga_ids=()):
+    """
+    Marca os vetores como desatualizados (todas as versões de modelo).
+    Usa update(): não mexe no atualizado_em, então as matrizes em cache não recarregam à toa.
+    """
+    if candidato_ids:
+        EmbeddingCandidato.objects.filter(candidato_id__in=list(candidato_ids)).update(desatualizado=True)
+    if vaga_ids:
+        EmbeddingVaga.objects.filter(vaga_id__in=list(vaga_ids)).update(desatualizado=True)
+
+
+def cobertura(modelo_novo, modelo_atual):
+    """
+    Quantos perfis com vetor no modelo atual ainda NÃO têm vetor em dia no modelo novo.
+    Retorna {'candidatos': (faltando, total), 'vagas': (faltando, total)}.
+    """
+    resultado = {}
+    for tipo, classe, campo_id in (
+        ('candidatos', EmbeddingCandidato, 'candidato_id'),
+        ('vagas', EmbeddingVaga, 'vaga_id'),
+    ):
+        atuais = classe.objects.filter(modelo=modelo_atual)
+        prontos = classe.objects.filter(modelo=modelo_novo, desatualizado=False).values(campo_id)
+        faltando = atuais.exclude(**{f'{campo_id}__in': prontos}).count()
+        resultado[tipo] = (faltando, atuais.count())
+    return resultado
@@ -0,0 +1,13 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from .cache import cache_embeddings
+
+
+@staff_member_required
+def status_matching(request):
+    """
+    Contadores do matching DESTE worker (cada processo tem o seu), para ajuste fino.
+    """
+    return JsonResponse({
+        'cache_embeddings': cache_embeddings.estatisticas(),
+    })
@@ -19,7 +19,7 @@ class VagaAdmin(admin.ModelAdmin):
 
 @admin.register(Candidatura)
 class CandidaturaAdmin(admin.ModelAdmin):
-    list_display = ('vaga', 'candidato', 'data_candidatura', 'status')
+    list_display = ('vaga', 'candidato', 'data_candidatura', 'status', 'score')
     list_filter = ('status', 'data_candidatura', 'vaga__empresa')
     search_fields = ('vaga__titulo', 'candidato__usuario__email', 'candidato__usuario__first_name')
     date_hierarchy = 'data_candidatura'
@@ -27,6 +27,8 @@ class CandidaturaAdmin(admin.ModelAdmin):
     
     # Melhora a performance
     raw_id_fields = ('candidato', 'vaga')
+    # Calculado pelo matching em segundo plano
+    readonly_fields = ('score', 'score_modelo', 'score_calculado_em')
 
 # NOVO REGISTRO: Adiciona o modelo Plano ao Admin
 @admin.register(Plano)
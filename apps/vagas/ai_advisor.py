@@ -1,8 +1,15 @@
+import asyncio
+import time
+
 import google.generativeai as genai
 import os
 from django.conf import settings
 from google.api_core import exceptions
 
+# A lista de modelos da chave quase nunca muda: consulta a API no máximo 1x por hora
+MODELOS_TTL_S = 3600
+_modelos_cache = ([], 0.0)  # (nomes, quando foram listados)
+
 def configurar_ia():
     try:
         # LÊ DO SETTINGS.PY (CRUCIAL PARA O RAILWAY)
@@ -18,11 +25,8 @@ def configurar_ia():
         print(f"❌ Erro ao configurar IA: {e}")
         return False
 
-def gerar_dicas_perfil(perfil_texto):
-    if not configurar_ia():
-        return "<ul><li>Erro: Chave de API não configurada no painel.</li></ul>"
-
-    prompt = f"""
+def montar_prompt(perfil_texto):
+    return f"""
     Aja como um recrutador sênior. Analise o perfil abaixo e dê 3 dicas curtas e diretas.
     SAÍDA OBRIGATÓRIA: Apenas código HTML cru (tags <ul>, <li>, <strong>).
     NÃO use crases de markdown (```html). NÃO coloque introdução.
@@ -30,22 +34,44 @@ def gerar_dicas_perfil(perfil_texto):
     Perfil: "{perfil_texto}"
     """
 
+def listar_modelos():
+    """
+    Modelos 'gemini' que a chave pode usar (os mais recentes primeiro), com cache.
+    """
+    global _modelos_cache
+    nomes, listados_em = _modelos_cache
+    if nomes and time.monotonic() - listados_em < MODELOS_TTL_S:
+        return nomes
+
+    # --- MUDANÇA: BUSCA DINÂMICA DE MODELOS ---
+    print("🔍 Buscando modelos disponíveis na API...")
+    
+    # Lista todos os modelos que a sua chave tem acesso
+    modelos_disponiveis = []
+    for m in genai.list_models():
+        if 'generateContent' in m.supported_generation_methods:
+            # Prioriza modelos 'gemini'
+            if 'gemini' in m.name:
+                modelos_disponiveis.append(m.name)
+    
+    # Ordena para tentar os mais recentes primeiro (opcional, mas bom)
+    modelos_disponiveis.sort(reverse=True) 
+    
+    print(f"📋 Modelos encontrados: {modelos_disponiveis}")
+    _modelos_cache = (modelos_disponiveis, time.monotonic())
+    return modelos_disponiveis
+
+def limpar_resposta(texto):
+    return texto.replace("```html", "").replace("```", "")
+
+def gerar_dicas_perfil(perfil_texto):
+    if not configurar_ia():
+        return "<ul><li>Erro: Chave de API não configurada no painel.</li></ul>"
+
+    prompt = montar_prompt(perfil_texto)
+
     try:
-        # --- MUDANÇA: BUSCA DINÂMICA DE MODELOS ---
-        print("🔍 Buscando modelos disponíveis na API...")
-        
-        # Lista todos os modelos que a sua chave tem acesso
-        modelos_disponiveis = []
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                # Prioriza modelos 'gemini'
-                if 'gemini' in m.name:
-                    modelos_disponiveis.append(m.name)
-        
-        # Ordena para tentar os mais recentes primeiro (opcional, mas bom)
-        modelos_disponiveis.sort(reverse=True) 
-        
-        print(f"📋 Modelos encontrados: {modelos_disponiveis}")
+        modelos_disponiveis = listar_modelos()
 
         if not modelos_disponiveis:
             return "<ul><li>Nenhum modelo de IA disponível para esta chave.</li></ul>"
@@ -56,9 +82,7 @@ def gerar_dicas_perfil(perfil_texto):
                 print(f"Tentando usar: {modelo_nome}...")
                 model = genai.GenerativeModel(modelo_nome)
                 response = model.generate_content(prompt)
-                texto_limpo = response.text
-                texto_limpo = texto_limpo.replace("```html", "").replace("```", "")
-                return texto_limpo
+                return limpar_resposta(response.text)
             except Exception as e:
                 print(f"❌ Erro no modelo {modelo_nome}: {e}")
                 continue
@@ -67,4 +91,37 @@ def gerar_dicas_perfil(perfil_texto):
         print(f"Erro fatal ao listar modelos: {e}")
         return f"<ul><li>Erro de conexão com a IA: {e}</li></ul>"
             
-    return "<ul><li>IA temporariamente indisponível (Cota excedida ou erro interno).</li></ul>"
\ No newline at end of file
+    return "<ul><li>IA temporariamente indisponível (Cota excedida ou erro interno).</li></ul>"
+
+async def gerar_dicas_perfil_async(perfil_texto):
+    """
+    Mesma lógica do gerar_dicas_perfil para as views assíncronas (ASGI):
+    a chamada ao Gemini é aguardada (generate_content_async), sem bloquear o event loop.
+    """
+    if not configurar_ia():
+        return "<ul><li>Erro: Chave de API não configurada no painel.</li></ul>"
+
+    prompt = montar_prompt(perfil_texto)
+
+    try:
+        # A listagem só existe síncrona na biblioteca (e quase sempre vem do cache)
+        modelos_disponiveis = await asyncio.to_thread(listar_modelos)
+
+        if not modelos_disponiveis:
+            return "<ul><li>Nenhum modelo de IA disponível para esta chave.</li></ul>"
+
+        for modelo_nome in modelos_disponiveis:
+            try:
+                print(f"Tentando usar: {modelo_nome}...")
+                model = genai.GenerativeModel(modelo_nome)
+                response = await model.generate_content_async(prompt)
+                return limpar_resposta(response.text)
+            except Exception as e:
+                print(f"❌ Erro no modelo {modelo_nome}: {e}")
+                continue
+
+    except Exception as e:
+        print(f"Erro fatal ao listar modelos: {e}")
+        return f"<ul><li>Erro de conexão com a IA: {e}</li></ul>"
+
+    return "<ul><li>IA temporariamente indisponível (Cota excedida ou erro interno).</li></ul>"
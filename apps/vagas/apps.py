@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class VagasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.vagas'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from .busca import recriar_triggers_sqlite
+        post_migrate.connect(recriar_triggers_sqlite, sender=self)
@@ -0,0 +1,234 @@
+# Arquivo: apps/vagas/busca.py
+#
+# Busca textual das vagas (barra de pesquisa do explorar_vagas) com índice de texto completo,
+# ordenada por relevância. O índice é mantido pelo PRÓPRIO BANCO, via triggers criados na
+# migração 0005_busca_textual (nenhum código Python precisa lembrar de atualizá-lo):
+#   - PostgreSQL: campo Vaga.busca (SearchVectorField, configuração 'portuguese') com índice GIN,
+#     consultado pelo ORM (SearchQuery + SearchRank);
+#   - SQLite: tabela virtual FTS5 `vagas_vaga_busca` (rowid = id da vaga), único trecho em SQL cru.
+# Em outros bancos, volta para o icontains antigo (varredura completa).
+#
+# Campos indexados: título e nome da empresa (peso maior), descrição e requisitos.
+
+import re
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+TABELA_FTS_SQLITE = 'vagas_vaga_busca'
+
+# Pesos do bm25 do SQLite, na ordem das colunas da tabela FTS5 (titulo, empresa, descricao, requisitos)
+PESOS_SQLITE = (10.0, 5.0, 2.0, 1.0)
+
+
+# --- PostgreSQL: coluna tsvector (criada pelo AddField da migração) + GIN, preenchida por trigger ---
+# O nome da empresa está em outra tabela (não dá para usar coluna GENERATED): um trigger
+# na vaga monta o documento e outro, na empresa, refaz as vagas dela quando o nome muda.
+SQL_POSTGRES = [
+    """
+    CREATE OR REPLACE FUNCTION vagas_vaga_documento(titulo text, empresa text, descricao text, requisitos text)
+    RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A')
+            || setweight(to_tsvector('portuguese', coalesce(empresa, '')), 'A')
+            || setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'B')
+            || setweight(to_tsvector('portuguese', coalesce(requisitos, '')), 'C')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION vagas_vaga_atualizar_busca() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.busca := vagas_vaga_documento(
+            NEW.titulo, (SELECT nome FROM usuarios_empresa WHERE id = NEW.empresa_id), NEW.descricao, NEW.requisitos
+        );
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER vagas_vaga_busca_trg
+    BEFORE INSERT OR UPDATE OF titulo, descricao, requisitos, empresa_id ON vagas_vaga
+    FOR EACH ROW EXECUTE FUNCTION vagas_vaga_atualizar_busca()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION vagas_empresa_atualizar_busca() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE vagas_vaga SET busca = vagas_vaga_documento(titulo, NEW.nome, descricao, requisitos)
+        WHERE empresa_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER usuarios_empresa_busca_trg
+    AFTER UPDATE OF nome ON usuarios_empresa
+    FOR EACH ROW WHEN (OLD.nome IS DISTINCT FROM NEW.nome) EXECUTE FUNCTION vagas_empresa_atualizar_busca()
+    """,
+    # Vagas que já existiam
+    """
+    UPDATE vagas_vaga AS v SET busca = vagas_vaga_documento(v.titulo, e.nome, v.descricao, v.requisitos)
+    FROM usuarios_empresa AS e WHERE e.id = v.empresa_id
+    """,
+]
+
+
+def indice_postgres():
+    # GIN da coluna busca: criado pela migração só no PostgreSQL (não existe no SQLite)
+    return GinIndex(fields=['busca'], name='vagas_vaga_busca_gin')
+
+
+SQL_POSTGRES_REMOVER = [
+    "DROP TRIGGER IF EXISTS usuarios_empresa_busca_trg ON usuarios_empresa",
+    "DROP TRIGGER IF EXISTS vagas_vaga_busca_trg ON vagas_vaga",
+    "DROP FUNCTION IF EXISTS vagas_empresa_atualizar_busca()",
+    "DROP FUNCTION IF EXISTS vagas_vaga_atualizar_busca()",
+    "DROP FUNCTION IF EXISTS vagas_vaga_documento(text, text, text, text)",
+]
+
+
+# --- SQLite: tabela FTS5 sincronizada por triggers ---
+# remove_diacritics: 'programacao' acha 'programação'
+SQL_SQLITE_TABELA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS_SQLITE}
+    USING fts5(titulo, empresa, descricao, requisitos, tokenize = 'unicode61 remove_diacritics 2')
+    """,
+]
+
+_INSERIR_SQLITE = f"""
+    INSERT INTO {TABELA_FTS_SQLITE} (rowid, titulo, empresa, descricao, requisitos)
+    VALUES (NEW.id, NEW.titulo, (SELECT nome FROM usuarios_empresa WHERE id = NEW.empresa_id),
+            NEW.descricao, NEW.requisitos);
+"""
+
+SQL_SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vagas_vaga_busca_ai AFTER INSERT ON vagas_vaga BEGIN
+        {_INSERIR_SQLITE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vagas_vaga_busca_au
+    AFTER UPDATE OF titulo, descricao, requisitos, empresa_id ON vagas_vaga BEGIN
+        DELETE FROM {TABELA_FTS_SQLITE} WHERE rowid = OLD.id;
+        {_INSERIR_SQLITE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vagas_vaga_busca_ad AFTER DELETE ON vagas_vaga BEGIN
+        DELETE FROM {TABELA_FTS_SQLITE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS usuarios_empresa_busca_au AFTER UPDATE OF nome ON usuarios_empresa BEGIN
+        UPDATE {TABELA_FTS_SQLITE} SET empresa = NEW.nome
+        WHERE rowid IN (SELECT id FROM vagas_vaga WHERE empresa_id = NEW.id);
+    END
+    """,
+]
+
+SQL_SQLITE_PREENCHER = [
+    f"""
+    INSERT INTO {TABELA_FTS_SQLITE} (rowid, titulo, empresa, descricao, requisitos)
+    SELECT v.id, v.titulo, e.nome, v.descricao, v.requisitos
+    FROM vagas_vaga AS v LEFT JOIN usuarios_empresa AS e ON e.id = v.empresa_id
+    """,
+]
+
+SQL_SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS usuarios_empresa_busca_au",
+    "DROP TRIGGER IF EXISTS vagas_vaga_busca_ad",
+    "DROP TRIGGER IF EXISTS vagas_vaga_busca_au",
+    "DROP TRIGGER IF EXISTS vagas_vaga_busca_ai",
+    f"DROP TABLE IF EXISTS {TABELA_FTS_SQLITE}",
+]
+
+
+def _executar(conexao, comandos):
+    with conexao.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def instalar_indice(conexao):
+    """
+    Cria o índice de texto completo e indexa as vagas existentes (usado pela migração).
+    """
+    if conexao.vendor == 'postgresql':
+        _executar(conexao, SQL_POSTGRES)
+    elif conexao.vendor == 'sqlite':
+        _executar(conexao, SQL_SQLITE_TABELA + SQL_SQLITE_TRIGGERS + SQL_SQLITE_PREENCHER)
+
+
+def remover_indice(conexao):
+    if conexao.vendor == 'postgresql':
+        _executar(conexao, SQL_POSTGRES_REMOVER)
+    elif conexao.vendor == 'sqlite':
+        _executar(conexao, SQL_SQLITE_REMOVER)
+
+
+def recriar_triggers_sqlite(sender, using='default', **kwargs):
+    """
+    post_migrate: no SQLite, uma migração futura que altere vagas_vaga ou usuarios_empresa
+    RECRIA a tabela (e os triggers dela somem). Os triggers usam IF NOT EXISTS: rodar sempre é seguro.
+    """
+    from django.db import connections
+
+    conexao = connections[using]
+    if conexao.vendor != 'sqlite' or TABELA_FTS_SQLITE not in conexao.introspection.table_names():
+        return
+    _executar(conexao, SQL_SQLITE_TRIGGERS)
+
+
+def termos_da_busca(texto):
+    """
+    'Dev. Python (Sênior)' -> ['dev', 'python', 'sênior']. Só letras e números: o que o usuário
+    digitou nunca é interpretado como operador da sintaxe de busca do banco.
+    """
+    return re.findall(r'[^\W_]+', (texto or '').casefold())
+
+
+def _busca_postgres(vagas, termos):
+    # Prefixo em cada termo ('dev' acha 'developer'); o to_tsquery aplica o mesmo stemming do índice.
+    # search_type='raw' é seguro: os termos só têm letras e números (ver termos_da_busca)
+    consulta = SearchQuery(
+        ' & '.join(f"{termo}:*" for termo in termos), search_type='raw', config='portuguese'
+    )
+    return vagas.filter(busca=consulta).annotate(relevancia=SearchRank(F('busca'), consulta))
+
+
+def _busca_sqlite(vagas, termos):
+    # Cada termo entre aspas (literal) e com prefixo; termos separados = todos obrigatórios
+    consulta = ' '.join(f'"{termo}"*' for termo in termos)
+    pesos = ', '.join(str(peso) for peso in PESOS_SQLITE)
+    # O bm25 só existe dentro de uma consulta com MATCH na tabela FTS5: a relevância é uma
+    # subconsulta por vaga (o rowid = id faz o FTS5 ir direto à vaga, sem varrer o índice)
+    # e a vaga sem MATCH fica com relevância NULL.
+    # bm25 é "quanto menor, melhor": negado para ordenar igual ao ts_rank
+    relevancia = RawSQL(
+        f"SELECT -bm25({TABELA_FTS_SQLITE}, {pesos}) FROM {TABELA_FTS_SQLITE} "
+        f"WHERE {TABELA_FTS_SQLITE} MATCH %s AND {TABELA_FTS_SQLITE}.rowid = vagas_vaga.id",
+        (consulta,), output_field=FloatField(),
+    )
+    return vagas.annotate(relevancia=relevancia).filter(relevancia__isnull=False)
+
+
+def buscar_vagas(vagas, texto):
+    """
+    Filtra o queryset de vagas pelo texto digitado e ordena por relevância
+    (empate: mais recentes primeiro).
+    """
+    termos = termos_da_busca(texto)
+    if termos and connection.vendor == 'postgresql':
+        vagas = _busca_postgres(vagas, termos)
+    elif termos and connection.vendor == 'sqlite':
+        vagas = _busca_sqlite(vagas, termos)
+    else:
+        return vagas.filter(
+            Q(titulo__icontains=texto) |
+            Q(descricao__icontains=texto) |
+            Q(empresa__nome__icontains=texto)
+        )
+    return vagas.order_by('-relevancia', '-data_publicacao')
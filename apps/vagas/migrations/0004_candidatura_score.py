@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0007_alter_usuario_email'),
+        ('vagas', '0003_vaga_area_atuacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatura',
+            name='score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidatura',
+            name='score_calculado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidatura',
+            name='score_modelo',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='candidatura',
+            index=models.Index(fields=['vaga', '-score'], name='candidatura_vaga_score'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Índice de texto completo da busca de vagas (ver apps/vagas/busca.py).
+# PostgreSQL: coluna tsvector (Vaga.busca) + GIN; SQLite: tabela FTS5. Ambos mantidos por triggers.
+# A coluna existe em todos os bancos (o model é um só); fora do PostgreSQL fica sempre NULL.
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from apps.vagas import busca
+
+
+def instalar(apps, schema_editor):
+    busca.instalar_indice(schema_editor.connection)
+    # GIN só existe no PostgreSQL: por isso o índice não fica no Meta da Vaga
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('vagas', 'Vaga'), busca.indice_postgres())
+
+
+def remover(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('vagas', 'Vaga'), busca.indice_postgres())
+    busca.remover_indice(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0007_alter_usuario_email'),
+        ('vagas', '0004_candidatura_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vaga',
+            name='busca',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(instalar, remover),
+    ]
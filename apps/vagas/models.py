@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.usuarios.models import Candidato, Empresa, Recrutador
 
@@ -39,6 +40,10 @@ class Vaga(models.Model):
     status = models.BooleanField(default=True) # True = Aberta, False = Fechada
     data_publicacao = models.DateField(auto_now_add=True)
 
+    # Documento da busca textual (tsvector, só no PostgreSQL): preenchido pelo trigger do banco
+    # criado na migração 0005_busca_textual, nunca pelo Python (ver apps/vagas/busca.py)
+    busca = SearchVectorField(null=True, editable=False)
+
     def __str__(self):
         return self.titulo
 
@@ -49,10 +54,18 @@ class Candidatura(models.Model):
 
     data_candidatura = models.DateField(auto_now_add=True)
     status = models.CharField(max_length=50, default='Enviada') 
+
+    # Score de matching (0 a 100) calculado UMA vez, em segundo plano (apps/matching/pontuacoes.py),
+    # e recalculado quando o vetor do candidato ou da vaga muda. None = ainda não calculado
+    score = models.PositiveSmallIntegerField(null=True, blank=True)
+    score_modelo = models.CharField(max_length=100, blank=True, default='') # Modelo de IA que gerou o score
+    score_calculado_em = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         # Garante que um candidato não possa se aplicar 2x na mesma vaga
         unique_together = ('candidato', 'vaga')
+        # Lista de candidatos da vaga ordenada por score direto no banco
+        indexes = [models.Index(fields=['vaga', '-score'], name='candidatura_vaga_score')]
 
 class Plano(models.Model):
     NOME_PLANOS = [
@@ -1,3 +1,98 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.usuarios.models import Empresa, Recrutador, Usuario
+from apps.vagas.busca import TABELA_FTS_SQLITE, buscar_vagas, termos_da_busca
+from apps.vagas.models import Vaga
+
+
+class BuscaVagasTests(TestCase):
+    """
+    Busca textual do explorar_vagas: resultados ordenados por relevância e índice
+    (FTS5 no SQLite, tsvector no PostgreSQL) mantido pelos triggers do banco.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(nome='Acme Tecnologia', cnpj='00000000000100', setor='TI')
+        usuario = Usuario.objects.create_user(
+            username='recrutador', email='recrutador@acme.com', password='x', tipo_usuario='recrutador'
+        )
+        cls.recrutador = Recrutador.objects.create(usuario=usuario, empresa=cls.empresa)
+
+    def criar_vaga(self, titulo, descricao='', requisitos=''):
+        return Vaga.objects.create(
+            empresa=self.empresa, recrutador=self.recrutador, titulo=titulo,
+            descricao=descricao, requisitos=requisitos, tipo_contrato='CLT', localidade='São Paulo',
+        )
+
+    def buscar(self, texto):
+        return list(buscar_vagas(Vaga.objects.all(), texto))
+
+    def test_termos_da_busca_ignora_operadores(self):
+        self.assertEqual(termos_da_busca('Dev. Python (Sênior) OR "x"*'), ['dev', 'python', 'sênior', 'or', 'x'])
+
+    def test_resultados_ordenados_por_relevancia(self):
+        no_titulo = self.criar_vaga('Desenvolvedor Python', 'Backend com Django.', 'Python')
+        so_requisito = self.criar_vaga('Analista de Dados', 'Relatórios.', 'Python desejável')
+        self.criar_vaga('Designer', 'Interfaces.', 'Figma')
+
+        resultado = self.buscar('python')
+        self.assertEqual(resultado, [no_titulo, so_requisito])
+        self.assertGreater(resultado[0].relevancia, resultado[1].relevancia)
+
+    def test_todos_os_termos_e_prefixo(self):
+        vaga = self.criar_vaga('Desenvolvedor Python', 'Programação backend.')
+        self.criar_vaga('Desenvolvedor Java', 'Programação backend.')
+
+        self.assertEqual(self.buscar('desenv pyth'), [vaga])
+        self.assertEqual(self.buscar('python cobol'), [])
+
+    def test_busca_pelo_nome_da_empresa(self):
+        vaga = self.criar_vaga('Analista', 'Suporte.')
+        self.assertEqual(self.buscar('acme'), [vaga])
+
+    def test_triggers_insert_update_delete(self):
+        vaga = self.criar_vaga('Enfermeiro', 'Plantão noturno.')
+        self.assertEqual(self.buscar('enfermeiro'), [vaga])
+
+        vaga.titulo = 'Professor'
+        vaga.save()
+        self.assertEqual(self.buscar('enfermeiro'), [])
+        self.assertEqual(self.buscar('professor'), [vaga])
+
+        vaga.delete()
+        self.assertEqual(self.buscar('professor'), [])
+
+    def test_trigger_renomear_empresa(self):
+        vaga = self.criar_vaga('Analista', 'Suporte.')
+        self.empresa.nome = 'Globex'
+        self.empresa.save()
+
+        self.assertEqual(self.buscar('acme'), [])
+        self.assertEqual(self.buscar('globex'), [vaga])
+
+    @skipUnless(connection.vendor == 'sqlite', 'índice FTS5 do SQLite')
+    def test_sqlite_relevancia_vai_direto_a_vaga(self):
+        self.criar_vaga('Desenvolvedor Python')
+        self.criar_vaga('Cientista de Dados Python')
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = buscar_vagas(Vaga.objects.all(), 'python')
+            self.assertEqual(len(resultado), 2)
+        self.assertEqual(len(consultas), 1)
+        self.assertTrue(all(vaga.relevancia > 0 for vaga in resultado))
+        # Cada MATCH vem com o rowid da vaga: o FTS5 vai direto a ela, sem varrer o índice
+        sql = consultas.captured_queries[0]['sql']
+        self.assertEqual(
+            sql.count(f'{TABELA_FTS_SQLITE} MATCH'),
+            sql.count(f'{TABELA_FTS_SQLITE}.rowid = vagas_vaga.id'),
+        )
 
-# Create your tests here.
+    @skipUnless(connection.vendor == 'postgresql', 'coluna tsvector do PostgreSQL')
+    def test_postgres_stemming_portugues(self):
+        vaga = self.criar_vaga('Vendedora', 'Vendas de seguros.')
+        self.assertEqual(self.buscar('vendas'), [vaga])
@@ -1,8 +1,12 @@
 # Arquivo: apps/vagas/urls.py
 
+from django.conf import settings
 from django.urls import path
 from . import views  # Importa as views do app (views.py)
 
+# Servidor ASGI (uvicorn): as telas de IA usam as versões assíncronas (mesmos nomes de URL)
+assincronas = settings.VIEWS_ASSINCRONAS
+
 urlpatterns = [
     path('', views.landing_page, name='landing_page'),
     path('vagas/criar/', views.criar_vaga, name='criar_vaga'),
@@ -12,7 +16,9 @@ urlpatterns = [
     path('dashboard/candidato/', views.home_candidato, name='home_candidato'),
     path('dashboard/recrutador/', views.home_recrutador, name='home_recrutador'),
     path('vagas/<int:vaga_id>/candidatos/', views.ver_candidatos_vaga, name='ver_candidatos_vaga'),
-    path('radar-de-talentos/', views.radar_de_talentos, name='radar_de_talentos'),
+    path('radar-de-talentos/', views.radar_de_talentos_async if assincronas else views.radar_de_talentos, name='radar_de_talentos'),
+    path('radar-de-talentos/lote/', views.radar_em_lote_async if assincronas else views.radar_em_lote, name='radar_em_lote'),
+    path('radar-de-talentos/stream/', views.radar_de_talentos_stream_async if assincronas else views.radar_de_talentos_stream, name='radar_de_talentos_stream'),
     path('perfil_empresa/', views.perfil_empresa, name='perfil_empresa'),
     path("planos_empresa/", views.planos_empresa, name="planos_empresa"),
     path('painel-admin/', views.painel_admin, name='painel_admin'),
@@ -24,7 +30,7 @@ urlpatterns = [
     path('explorar/', views.explorar_vagas, name='explorar_vagas'),
     path('empresa/<int:empresa_id>/', views.ver_empresa, name='ver_empresa'),
     path('comentario/deletar/<int:comentario_id>/', views.deletar_comentario, name='deletar_comentario'),
-    path('ajax/analise-ia-perfil/', views.ajax_analise_ia_perfil, name='ajax_analise_ia_perfil'),
+    path('ajax/analise-ia-perfil/', views.ajax_analise_ia_perfil_async if assincronas else views.ajax_analise_ia_perfil, name='ajax_analise_ia_perfil'),
     path('painel-admin/toggle-status/<int:user_id>/', views.toggle_status_usuario, name='toggle_status_usuario'),
     path('vagas/detalhe/<int:vaga_id>/', views.ver_vaga_detalhe, name='ver_vaga_detalhe'),
     
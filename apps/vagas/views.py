@@ -1,11 +1,14 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.urls import reverse
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.db import IntegrityError
 from .models import Vaga, Candidatura, Plano
 from apps.usuarios.models import Recrutador, Candidato, Empresa
 from .forms import VagaForm
+from .busca import buscar_vagas
 from apps.usuarios.forms import (
     ExperienciaForm,
     FormacaoForm,
@@ -14,12 +17,24 @@ from apps.usuarios.forms import (
     PerfilUsuarioForm,
     PerfilCandidatoForm,
 )
-from apps.matching.engine import calcular_similaridade_tags
+from apps.matching import recomendacoes, rerank
+from apps.matching.executor import no_executor
+from apps.matching.engine import (
+    codificar_candidatos_pendentes,
+    modelo_ativo,
+    ranquear_candidatos_para_vagas,
+    ranquear_com_prazo,
+    ranquear_em_etapas,
+)
+from apps.matching.tarefas import atualizador_embeddings
+from django.conf import settings
 from apps.usuarios.models import Resumo_Profissional
 from django.db.models.functions import TruncMonth
 from django.db.models import Count
 from django.utils import timezone
 import datetime
+import json
+import time
 from apps.usuarios.models import (
     Resumo_Profissional,
     Skill,
@@ -32,8 +47,8 @@ from django.db.models import Avg
 from apps.usuarios.models import AvaliacaoEmpresa
 from django.db.models import Count
 from django.http import JsonResponse
-from .ai_advisor import gerar_dicas_perfil
-from django.db.models import Q
+from .ai_advisor import gerar_dicas_perfil, gerar_dicas_perfil_async
+from django.db.models import F, Q
 from django.core.paginator import Paginator
 
 
@@ -228,13 +243,39 @@ def home_candidato(request):
     texto_resumo = resumo.texto if resumo else "Nenhum resumo cadastrado."
 
     # --- PAGINAÇÃO DAS VAGAS RECOMENDADAS ---
-    vagas_list = Vaga.objects.filter(status=True).order_by("-data_publicacao")
-    
+    # Top-N por compatibilidade, calculado em segundo plano (apps/matching/recomendacoes.py)
+    recomendadas, em_dia = recomendacoes.obter(candidato.pk, modelo_ativo())
+    if not em_dia:
+        # Sem lista ainda: garante o vetor do candidato antes de calcular
+        atualizador_embeddings.agendar(
+            candidato_ids=[candidato.pk] if recomendadas is None else (),
+            recomendacao_ids=[candidato.pk],
+        )
+
+    if recomendadas is None:
+        # Enquanto a primeira lista não fica pronta: as vagas mais recentes
+        vagas_list = Vaga.objects.filter(status=True).order_by("-data_publicacao")
+    else:
+        vagas_list = recomendadas
+
     # Mostra 5 vagas por página no Dashboard (para não ficar muito longo)
     paginator = Paginator(vagas_list, 5) 
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    if recomendadas is not None:
+        # Só a página atual vai ao banco; vaga fechada depois do cálculo sai da lista
+        vagas_pagina = Vaga.objects.select_related("empresa").filter(status=True).in_bulk(
+            [vaga_id for vaga_id, _ in page_obj.object_list]
+        )
+        itens = []
+        for vaga_id, score in page_obj.object_list:
+            if vaga_id in vagas_pagina:
+                vaga = vagas_pagina[vaga_id]
+                vaga.score = score
+                itens.append(vaga)
+        page_obj.object_list = itens
+
     contexto = {
         "vagas": page_obj, # Agora paginado!
         # Forms
@@ -430,54 +471,50 @@ def ver_candidatos_vaga(request, vaga_id):
         messages.error(request, "Você não tem permissão para ver esta página.")
         return redirect("home_recrutador")
 
-    # --- CORREÇÃO BUG 0% ---
-    # Adicionando de volta a otimização de performance
-    candidaturas = (
+    # Score materializado na Candidatura (calculado em segundo plano pelo matching):
+    # ordena e pagina no banco, sem rodar o modelo a cada visita
+    candidaturas_list = (
         Candidatura.objects.filter(vaga=vaga)
-        .select_related("candidato", "candidato__resumo_profissional")
-        .prefetch_related(
-            "candidato__skills", "candidato__experiencias", "candidato__formacoes"
-        )
+        .select_related("candidato", "candidato__usuario")
+        .order_by(F("score").desc(nulls_last=True), "-data_candidatura", "pk")
     )
-    candidatos_com_score = []
-    for candidatura in candidaturas:
-        candidato = candidatura.candidato
-        score = calcular_similaridade_tags(vaga, candidato)
 
-        candidatos_com_score.append(
-            {
-                "candidato": candidato,
-                "score": score,
-                "data_aplicacao": candidatura.data_candidatura,
-                "status": candidatura.status,
-            }
-        )
+    # Mostra 20 candidatos por página
+    paginator = Paginator(candidaturas_list, 20)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
 
-    candidatos_ordenados = sorted(
-        candidatos_com_score, key=lambda item: item["score"], reverse=True
-    )
+    # Candidaturas que ainda não têm score (ex.: acabaram de chegar): pede o cálculo de novo
+    sem_score = [candidatura.pk for candidatura in page_obj if candidatura.score is None]
+    if sem_score:
+        atualizador_embeddings.agendar(candidatura_ids=sem_score)
+
+    # 1ª página (os melhores): o cross-encoder pode refinar a ordem, se estiver ligado
+    if page_obj.number == 1:
+        page_obj.object_list = rerank.reordenar(
+            vaga, page_obj.object_list, candidato_id=lambda candidatura: candidatura.candidato_id
+        )
 
-    contexto = {"vaga": vaga, "candidatos_ordenados": candidatos_ordenados}
+    contexto = {"vaga": vaga, "candidaturas": page_obj, "incompleto": bool(sem_score)}
 
     return render(request, "vagas/ver_candidatos_vaga.html", contexto)
 
 
-@login_required
-def radar_de_talentos(request):
+def _recrutador_do_radar(request):
     """
-    A nova tela de "Radar de Talentos" com a "Engine de IA".
-    AGORA RESTRITA AO PLANO PREMIUM.
+    Regras de acesso do Radar (simples e em lote): só recrutador com plano Premium.
+    Retorna (recrutador, None) ou (None, redirect).
     """
     if request.user.tipo_usuario != "recrutador":
         messages.error(request, "Acesso negado.")
-        return redirect("home_candidato")
+        return None, redirect("home_candidato")
 
     try:
         recrutador = request.user.recrutador
         empresa = recrutador.empresa
     except Recrutador.DoesNotExist:
         messages.error(request, "Você não possui um perfil de recrutador associado.")
-        return redirect("home_candidato")
+        return None, redirect("home_candidato")
 
     # --- TRAVA DE PLANO (NOVO) ---
     # Se o plano NÃO for Premium, bloqueia e manda para a tela de upgrade
@@ -487,13 +524,51 @@ def radar_de_talentos(request):
             "🔒 O Radar de Talentos com IA é exclusivo do Plano Premium. "
             "Faça o upgrade para desbloquear essa funcionalidade poderosa!"
         )
-        return redirect('planos_empresa')
+        return None, redirect('planos_empresa')
     # -----------------------------
+    return recrutador, None
+
+
+def _resultado_radar(vaga):
+    """
+    Parte pesada do Radar (inferência): usada pela view síncrona e pela assíncrona.
+    Retorna (candidatos ordenados, total encontrado, resultado incompleto?).
+    """
+    # Pontua o banco INTEIRO com uma única multiplicação matriz-vetor e, no tempo
+    # que sobrar do prazo, completa aos poucos os candidatos que ainda não têm vetor
+    ranking, total_encontrados, completo = ranquear_com_prazo(
+        vaga, top_k=settings.MATCHING_RADAR_TOP_K, limiar=20,
+        prazo_ms=settings.MATCHING_RADAR_PRAZO_MS,
+        pendentes=settings.MATCHING_CODIFICACOES_POR_REQUISICAO,
+    )
+    # Cross-encoder (opcional) só no topo, com orçamento de tempo
+    ranking = rerank.reordenar(vaga, ranking)
+    candidatos = Candidato.objects.select_related("usuario").in_bulk(
+        [candidato_id for candidato_id, _ in ranking]
+    )
+    candidatos_ordenados = [
+        {"candidato": candidatos[candidato_id], "score": score}
+        for candidato_id, score in ranking
+        if candidato_id in candidatos
+    ]
+    return candidatos_ordenados, total_encontrados, not completo
+
+
+@login_required
+def radar_de_talentos(request):
+    """
+    A nova tela de "Radar de Talentos" com a "Engine de IA".
+    AGORA RESTRITA AO PLANO PREMIUM.
+    """
+    recrutador, resposta = _recrutador_do_radar(request)
+    if resposta is not None:
+        return resposta
 
     minhas_vagas = Vaga.objects.filter(recrutador=recrutador, status=True)
     candidatos_ordenados = []
     total_encontrados = 0
     vaga_selecionada_id = None
+    incompleto = False
 
     if request.method == "POST":
         vaga_selecionada_id = request.POST.get("vaga_id")
@@ -501,22 +576,7 @@ def radar_de_talentos(request):
             vaga = get_object_or_404(
                 Vaga, id=vaga_selecionada_id, recrutador=recrutador
             )
-
-            # otimização pesada: Limita aos 20 últimos para não estourar a RAM (512MB)
-            todos_os_candidatos = Candidato.objects.select_related("usuario").order_by('-usuario__date_joined')[:20]
-            candidatos_com_score = []
-            for candidato in todos_os_candidatos:
-                score = calcular_similaridade_tags(vaga, candidato)
-
-                if score > 20:
-                    candidatos_com_score.append(
-                        {"candidato": candidato, "score": score}
-                    )
-
-            candidatos_ordenados = sorted(
-                candidatos_com_score, key=lambda item: item["score"], reverse=True
-            )
-            total_encontrados = len(candidatos_ordenados)
+            candidatos_ordenados, total_encontrados, incompleto = _resultado_radar(vaga)
             vaga_selecionada_id = int(vaga_selecionada_id)
 
     contexto = {
@@ -524,11 +584,147 @@ def radar_de_talentos(request):
         "candidatos_ordenados": candidatos_ordenados,
         "total_encontrados": total_encontrados,
         "vaga_selecionada_id": vaga_selecionada_id,
+        "incompleto": incompleto,
     }
 
     return render(request, "vagas/radar_de_talentos.html", contexto)
 
 
+@login_required
+def radar_de_talentos_stream(request):
+    """
+    Radar em modo streaming (NDJSON, uma linha JSON por etapa): o ranking com os
+    vetores já salvos sai logo na 1ª linha e a tela vai sendo atualizada conforme
+    os perfis novos são codificados. A última linha traz "fim": true.
+    """
+    recrutador, resposta = _recrutador_do_radar(request)
+    if resposta is not None:
+        return resposta
+
+    vaga = get_object_or_404(Vaga, id=request.GET.get("vaga_id"), recrutador=recrutador)
+    return _resposta_ndjson(_linhas_do_radar(vaga))
+
+
+def _linhas_do_radar(vaga):
+    """
+    Gera as linhas NDJSON do Radar em streaming (uma por etapa do ranquear_em_etapas).
+    """
+    prazo_ms = settings.MATCHING_RADAR_STREAM_PRAZO_MS
+    candidatos = {}
+
+    def linha(ranking, total, completo, fim=False):
+        faltando = [candidato_id for candidato_id, _ in ranking if candidato_id not in candidatos]
+        if faltando:
+            candidatos.update(Candidato.objects.select_related("usuario").in_bulk(faltando))
+        itens = [
+            {
+                "nome": candidatos[candidato_id].usuario.get_full_name(),
+                "headline": candidatos[candidato_id].headline or "Sem cargo",
+                "email": candidatos[candidato_id].usuario.email,
+                "perfil_url": reverse("perfil_publico", args=[candidatos[candidato_id].usuario.username]),
+                "score": score,
+            }
+            for candidato_id, score in ranking
+            if candidato_id in candidatos
+        ]
+        dados = {"candidatos": itens, "total": total, "completo": completo, "fim": fim}
+        return json.dumps(dados, ensure_ascii=False) + "\n"
+
+    try:
+        ranking, total, completo = [], 0, False
+        for ranking, total, completo in ranquear_em_etapas(
+            vaga, top_k=settings.MATCHING_RADAR_TOP_K, limiar=20,
+            pendentes=settings.MATCHING_CODIFICACOES_POR_REQUISICAO,
+            prazo=time.monotonic() + prazo_ms / 1000 if prazo_ms else None,
+        ):
+            yield linha(ranking, total, completo)
+        # Cross-encoder (opcional) só no topo, com orçamento de tempo
+        yield linha(rerank.reordenar(vaga, ranking), total, completo, fim=True)
+    except Exception as e:
+        print(f"Erro no Radar (streaming) da vaga {vaga.id}: {e}")
+        yield json.dumps({"erro": "Não foi possível concluir a busca.", "fim": True}) + "\n"
+
+
+def _resposta_ndjson(linhas):
+    # `linhas` pode ser um gerador comum (WSGI) ou assíncrono (ASGI)
+    resposta = StreamingHttpResponse(linhas, content_type="application/x-ndjson")
+    resposta["Cache-Control"] = "no-cache"
+    # Proxy (nginx) não pode segurar as linhas até o fim da resposta
+    resposta["X-Accel-Buffering"] = "no"
+    return resposta
+
+
+@login_required
+def radar_em_lote(request):
+    """
+    Radar de Talentos para TODAS as vagas abertas do recrutador de uma vez:
+    uma única passada vagas x candidatos, o top de cada vaga e os candidatos
+    que aparecem em mais de uma vaga.
+    """
+    recrutador, resposta = _recrutador_do_radar(request)
+    if resposta is not None:
+        return resposta
+
+    return render(request, "vagas/radar_em_lote.html", _resultado_radar_em_lote(recrutador))
+
+
+def _resultado_radar_em_lote(recrutador):
+    """
+    Parte pesada do Radar em lote (inferência): usada pela view síncrona e pela assíncrona.
+    Retorna o contexto do template.
+    """
+    minhas_vagas = list(Vaga.objects.filter(recrutador=recrutador, status=True).order_by("titulo"))
+
+    # Completa aos poucos os candidatos que ainda não têm vetor salvo (até o prazo; o resto em segundo plano)
+    prazo_ms = settings.MATCHING_RADAR_PRAZO_MS
+    _, adiados = codificar_candidatos_pendentes(
+        settings.MATCHING_CODIFICACOES_POR_REQUISICAO,
+        prazo=time.monotonic() + prazo_ms / 1000 if prazo_ms else None,
+    )
+
+    rankings = ranquear_candidatos_para_vagas(
+        minhas_vagas, top_k=settings.MATCHING_RADAR_LOTE_TOP_K, limiar=20
+    )
+    candidatos = Candidato.objects.select_related("usuario").in_bulk(
+        {candidato_id for ranking, _ in rankings.values() for candidato_id, _ in ranking}
+    )
+
+    resultados = []
+    por_candidato = {}
+    for vaga in minhas_vagas:
+        ranking, total = rankings[vaga.id]
+        itens = [
+            {"candidato": candidatos[candidato_id], "score": score}
+            for candidato_id, score in ranking
+            if candidato_id in candidatos
+        ]
+        resultados.append({"vaga": vaga, "candidatos": itens, "total": total})
+        for item in itens:
+            por_candidato.setdefault(item["candidato"].pk, []).append((vaga, item["score"]))
+
+    # Candidatos que estão no top de 2+ vagas: mais vagas primeiro, depois a média do score
+    multiplas_vagas = sorted(
+        (
+            {
+                "candidato": candidatos[candidato_id],
+                "vagas": sorted(vagas, key=lambda par: -par[1]),
+                "media": round(sum(score for _, score in vagas) / len(vagas)),
+            }
+            for candidato_id, vagas in por_candidato.items()
+            if len(vagas) > 1
+        ),
+        key=lambda item: (-len(item["vagas"]), -item["media"]),
+    )
+
+    contexto = {
+        "resultados": resultados,
+        "multiplas_vagas": multiplas_vagas,
+        "top_k": settings.MATCHING_RADAR_LOTE_TOP_K,
+        "incompleto": bool(adiados),
+    }
+    return contexto
+
+
 @login_required
 def planos_empresa(request):
     """
@@ -629,13 +825,10 @@ def explorar_vagas(request):
     vagas_list = Vaga.objects.filter(status=True).order_by('-data_publicacao')
 
     # 2. Lógica da Barra de Pesquisa (parametro 'q')
+    # Índice de texto completo (título, empresa, descrição e requisitos), ordenado por relevância
     query = request.GET.get('q')
     if query:
-        vagas_list = vagas_list.filter(
-            Q(titulo__icontains=query) |          # Busca no título
-            Q(descricao__icontains=query) |       # Busca na descrição
-            Q(empresa__nome__icontains=query)     # Busca pelo nome da empresa
-        )
+        vagas_list = buscar_vagas(vagas_list, query)
 
     # 3. Lógica das Categorias (parametro 'categoria')
     categoria = request.GET.get('categoria')
@@ -860,4 +1053,97 @@ def ver_vaga_detalhe(request, vaga_id):
     Exibe os detalhes completos de uma vaga pública.
     """
     vaga = get_object_or_404(Vaga, id=vaga_id)
-    return render(request, 'vagas/ver_vaga_detalhe.html', {'vaga': vaga})
\ No newline at end of file
+    return render(request, 'vagas/ver_vaga_detalhe.html', {'vaga': vaga})
+
+
+# ===================================================================
+# VIEWS ASSÍNCRONAS (servidor ASGI: uvicorn), ligadas com VIEWS_ASSINCRONAS=True
+# Mesmas telas e regras das versões síncronas acima. A inferência roda no executor
+# limitado do matching (apps/matching/executor.py) e a chamada ao Gemini é aguardada:
+# uma requisição lenta não prende um worker inteiro.
+# ===================================================================
+
+@login_required
+async def radar_de_talentos_async(request):
+    recrutador, resposta = await sync_to_async(_recrutador_do_radar)(request)
+    if resposta is not None:
+        return resposta
+
+    candidatos_ordenados = []
+    total_encontrados = 0
+    vaga_selecionada_id = None
+    incompleto = False
+
+    if request.method == "POST":
+        vaga_selecionada_id = request.POST.get("vaga_id")
+        if vaga_selecionada_id:
+            vaga = await aget_object_or_404(
+                Vaga, id=vaga_selecionada_id, recrutador=recrutador
+            )
+            candidatos_ordenados, total_encontrados, incompleto = await no_executor(_resultado_radar)(vaga)
+            vaga_selecionada_id = int(vaga_selecionada_id)
+
+    contexto = {
+        "minhas_vagas": Vaga.objects.filter(recrutador=recrutador, status=True),
+        "candidatos_ordenados": candidatos_ordenados,
+        "total_encontrados": total_encontrados,
+        "vaga_selecionada_id": vaga_selecionada_id,
+        "incompleto": incompleto,
+    }
+
+    return await sync_to_async(render)(request, "vagas/radar_de_talentos.html", contexto)
+
+
+@login_required
+async def radar_de_talentos_stream_async(request):
+    recrutador, resposta = await sync_to_async(_recrutador_do_radar)(request)
+    if resposta is not None:
+        return resposta
+
+    vaga = await aget_object_or_404(Vaga, id=request.GET.get("vaga_id"), recrutador=recrutador)
+    return _resposta_ndjson(_linhas_do_radar_async(vaga))
+
+
+async def _linhas_do_radar_async(vaga):
+    # Cada etapa (banco + inferência) roda no executor; entre uma e outra o event loop fica livre
+    linhas = _linhas_do_radar(vaga)
+    proxima = no_executor(lambda: next(linhas, None))
+    while (linha := await proxima()) is not None:
+        yield linha
+
+
+@login_required
+async def radar_em_lote_async(request):
+    recrutador, resposta = await sync_to_async(_recrutador_do_radar)(request)
+    if resposta is not None:
+        return resposta
+
+    contexto = await no_executor(_resultado_radar_em_lote)(recrutador)
+    return await sync_to_async(render)(request, "vagas/radar_em_lote.html", contexto)
+
+
+@login_required
+async def ajax_analise_ia_perfil_async(request):
+    if request.method == "POST":
+        try:
+            usuario = await request.auser()
+
+            # 1. Pega todo o texto do perfil (Resumo + XP + Skills)
+            texto_completo = await sync_to_async(lambda: get_texto_candidato(usuario.candidato))()
+
+            # 2. Validação simples para não gastar IA à toa
+            if len(texto_completo) < 50:
+                return JsonResponse({
+                    'status': 'error', 
+                    'message': 'Seu perfil está muito vazio! Preencha Resumo e Experiências antes de pedir ajuda à IA.'
+                })
+
+            # 3. Chama o Gemini (sem bloquear o event loop)
+            dicas_html = await gerar_dicas_perfil_async(texto_completo)
+
+            return JsonResponse({'status': 'success', 'dicas': dicas_html})
+
+        except Exception as e:
+            return JsonResponse({'status': 'error', 'message': str(e)})
+
+    return JsonResponse({'status': 'error', 'message': 'Método inválido'})
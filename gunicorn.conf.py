@@ -0,0 +1,7 @@
+# Arquivo: gunicorn.conf.py (lido automaticamente pelo gunicorn na raiz do projeto)
+import os
+
+# Com MATCHING_PRELOAD_MODELO=True a aplicação (e o modelo de IA, via wsgi.py) é
+# carregada UMA vez no master antes do fork: os workers compartilham as páginas
+# dos pesos por copy-on-write em vez de cada um carregar sua própria cópia.
+preload_app = os.environ.get('MATCHING_PRELOAD_MODELO', 'False') == 'True'
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vagalume_carreiras.settings')
 
 application = get_asgi_application()
+
+# Pré-carregamento opcional do modelo de IA (igual ao wsgi.py)
+from django.conf import settings
+
+if settings.MATCHING_PRELOAD_MODELO:
+    from apps.matching.engine import preload_modelo
+    preload_modelo()
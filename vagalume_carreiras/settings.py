@@ -129,6 +129,97 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
 }
 
+# MATCHING (Radar de Talentos)
+# Modelo usado enquanto nenhum estiver marcado como ativo (manage.py modelo_embeddings)
+MATCHING_MODELO_PADRAO = os.environ.get('MATCHING_MODELO_PADRAO', 'distiluse-base-multilingual-cased-v1')
+# De quanto em quanto tempo cada worker confere no banco qual é o modelo ativo
+MATCHING_MODELO_VERIFICAR_S = int(os.environ.get('MATCHING_MODELO_VERIFICAR_S', 30))
+# Backend de inferência dos modelos sem runtime no id: 'torch' (sentence-transformers) ou 'onnx'
+# (onnxruntime, exportar antes com `manage.py exportar_onnx`; MATCHING_ONNX_INT8 usa a versão quantizada).
+# O runtime entra no id do modelo (ex.: "<nome>@onnx-int8"): trocar de backend exige reembed e ativar
+MATCHING_BACKEND = os.environ.get('MATCHING_BACKEND', 'torch')
+MATCHING_ONNX_INT8 = os.environ.get('MATCHING_ONNX_INT8', 'True') == 'True'
+MATCHING_ONNX_THREADS = int(os.environ.get('MATCHING_ONNX_THREADS', 0))
+# Carrega o modelo de IA no master do gunicorn (preload_app) para os workers compartilharem os pesos
+MATCHING_PRELOAD_MODELO = os.environ.get('MATCHING_PRELOAD_MODELO', 'False') == 'True'
+# Quantos candidatos aparecem no resultado do Radar
+MATCHING_RADAR_TOP_K = int(os.environ.get('MATCHING_RADAR_TOP_K', 50))
+# Radar em lote (todas as vagas do recrutador de uma vez): candidatos listados por vaga
+MATCHING_RADAR_LOTE_TOP_K = int(os.environ.get('MATCHING_RADAR_LOTE_TOP_K', 10))
+# Cross-encoder (opcional): reordena só os MATCHING_RERANK_TOP primeiros do Radar e da lista de
+# candidatos da vaga, com orçamento de tempo por requisição; estourou = ordem dos embeddings
+MATCHING_RERANK_ATIVO = os.environ.get('MATCHING_RERANK_ATIVO', 'False') == 'True'
+MATCHING_RERANK_MODELO = os.environ.get('MATCHING_RERANK_MODELO', 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1')
+MATCHING_RERANK_TOP = int(os.environ.get('MATCHING_RERANK_TOP', 30))
+MATCHING_RERANK_ORCAMENTO_MS = int(os.environ.get('MATCHING_RERANK_ORCAMENTO_MS', 300))
+# Quantos perfis sem embedding o Radar pode codificar por requisição
+MATCHING_CODIFICACOES_POR_REQUISICAO = int(os.environ.get('MATCHING_CODIFICACOES_POR_REQUISICAO', 20))
+# Prazo (ms) do Radar para codificar perfis novos: o que não couber vai para o atualizador em
+# segundo plano e o resultado aparece como parcial. 0 = sem prazo
+MATCHING_RADAR_PRAZO_MS = int(os.environ.get('MATCHING_RADAR_PRAZO_MS', 1500))
+# No Radar em streaming a tela já mostra o ranking parcial: o prazo para os perfis novos pode ser maior
+MATCHING_RADAR_STREAM_PRAZO_MS = int(os.environ.get('MATCHING_RADAR_STREAM_PRAZO_MS', 10000))
+# Servidor ASGI (uvicorn): liga as versões assíncronas das telas de IA (Radar e análise do Gemini).
+# A inferência roda em um executor com no máximo MATCHING_EXECUTOR_THREADS threads
+VIEWS_ASSINCRONAS = os.environ.get('VIEWS_ASSINCRONAS', 'False') == 'True'
+MATCHING_EXECUTOR_THREADS = int(os.environ.get('MATCHING_EXECUTOR_THREADS', 2))
+# Servidor local de embeddings (manage.py servidor_embeddings). Vazio = codifica no próprio worker.
+# Ex.: MATCHING_SERVIDOR_URL=http://127.0.0.1:8765
+MATCHING_SERVIDOR_URL = os.environ.get('MATCHING_SERVIDOR_URL', '')
+MATCHING_SERVIDOR_TIMEOUT = float(os.environ.get('MATCHING_SERVIDOR_TIMEOUT', 10))
+# Micro-lotes dentro do worker: junta por alguns ms os encodes de threads concorrentes.
+# 0 = desligado (útil só com workers de várias threads, ex.: gunicorn --threads 4)
+MATCHING_AGRUPAR_JANELA_MS = int(os.environ.get('MATCHING_AGRUPAR_JANELA_MS', 0))
+MATCHING_AGRUPAR_LOTE_MAX = int(os.environ.get('MATCHING_AGRUPAR_LOTE_MAX', 64))
+# Cache de embeddings por hash do texto: LRU em memória (limite em MB por processo)
+# e, opcionalmente, um 2º nível no cache do Django compartilhado entre workers
+MATCHING_CACHE_MB = int(os.environ.get('MATCHING_CACHE_MB', 32))
+MATCHING_CACHE_DJANGO = os.environ.get('MATCHING_CACHE_DJANGO', 'False') == 'True'
+MATCHING_CACHE_DJANGO_TIMEOUT = int(os.environ.get('MATCHING_CACHE_DJANGO_TIMEOUT', 60 * 60 * 24))
+# Formato compacto dos vetores: 'f32' (2KB/perfil), 'f16' (1KB) ou 'i8' (512B + escala)
+# FORMATO_VETOR = como é gravado no banco; FORMATO_MATRIZ = como fica na memória do Radar
+MATCHING_FORMATO_VETOR = os.environ.get('MATCHING_FORMATO_VETOR', 'f16')
+MATCHING_FORMATO_MATRIZ = os.environ.get('MATCHING_FORMATO_MATRIZ', 'i8')
+# Pasta dos arquivos gerados pelo matching (índices, matrizes exportadas)
+MATCHING_DIR = Path(os.environ.get('MATCHING_DIR', BASE_DIR / 'matching_data'))
+# Índice aproximado (IVF) no Radar: construir antes com `manage.py construir_indice_ann`
+MATCHING_ANN_ATIVO = os.environ.get('MATCHING_ANN_ATIVO', 'False') == 'True'
+MATCHING_ANN_SONDAS = int(os.environ.get('MATCHING_ANN_SONDAS', 8))
+# Reconstrói o índice na varredura do atualizador quando as inserções/remoções passam desta fração do índice
+MATCHING_ANN_RECONSTRUIR_FRACAO = float(os.environ.get('MATCHING_ANN_RECONSTRUIR_FRACAO', 0.2))
+# Pré-seleção léxica (BM25 em skills/experiências) antes dos embeddings no Radar.
+# Só entra em ação com pelo menos MATCHING_PREFILTRO_MINIMO candidatos indexados
+MATCHING_PREFILTRO_ATIVO = os.environ.get('MATCHING_PREFILTRO_ATIVO', 'True') == 'True'
+MATCHING_PREFILTRO_TOP = int(os.environ.get('MATCHING_PREFILTRO_TOP', 300))
+MATCHING_PREFILTRO_MINIMO = int(os.environ.get('MATCHING_PREFILTRO_MINIMO', 2000))
+# Com a pré-seleção, o total do Radar é estimado por uma amostra desse tamanho do banco inteiro
+MATCHING_PREFILTRO_AMOSTRA_TOTAL = int(os.environ.get('MATCHING_PREFILTRO_AMOSTRA_TOTAL', 4096))
+MATCHING_LEXICO_VERIFICAR_S = int(os.environ.get('MATCHING_LEXICO_VERIFICAR_S', 60))
+MATCHING_LEXICO_TTL_S = int(os.environ.get('MATCHING_LEXICO_TTL_S', 900))
+# Matriz compartilhada (np.memmap) entre os workers: exportar antes com `manage.py exportar_matriz`
+MATCHING_MATRIZ_MMAP = os.environ.get('MATCHING_MATRIZ_MMAP', 'True') == 'True'
+# Acima de tantas linhas alteradas desde a exportação, um worker refaz a exportação sozinho
+MATCHING_DELTA_MAX = int(os.environ.get('MATCHING_DELTA_MAX', 5000))
+# Perfis/vagas editados são recodificados em segundo plano (signals + thread por worker).
+# Enquanto isso, as telas usam o vetor anterior; só perfis SEM vetor são codificados na hora
+MATCHING_ATUALIZACAO_ASSINCRONA = os.environ.get('MATCHING_ATUALIZACAO_ASSINCRONA', 'True') == 'True'
+MATCHING_ATUALIZADOR_JANELA_S = float(os.environ.get('MATCHING_ATUALIZADOR_JANELA_S', 2))
+MATCHING_ATUALIZADOR_LOTE_MAX = int(os.environ.get('MATCHING_ATUALIZADOR_LOTE_MAX', 64))
+MATCHING_ATUALIZADOR_VARREDURA_S = int(os.environ.get('MATCHING_ATUALIZADOR_VARREDURA_S', 300))
+# Vetor do candidato por SEÇÃO: um embedding para o resumo, um por experiência, um para as formações e um
+# para as skills (cada skill codificada UMA vez para a plataforma inteira, tabela EmbeddingSkill).
+# Só a seção editada é recodificada; incluir/remover skill refaz o vetor sem rodar o modelo.
+# Os pesos são relativos entre as seções. Ao mudar estes valores, rode `manage.py reembed`
+MATCHING_VETOR_POR_SECAO = os.environ.get('MATCHING_VETOR_POR_SECAO', 'True') == 'True'
+MATCHING_PESO_RESUMO = float(os.environ.get('MATCHING_PESO_RESUMO', 1.0))
+MATCHING_PESO_EXPERIENCIAS = float(os.environ.get('MATCHING_PESO_EXPERIENCIAS', 1.0))
+MATCHING_PESO_FORMACOES = float(os.environ.get('MATCHING_PESO_FORMACOES', 0.5))
+MATCHING_PESO_SKILLS = float(os.environ.get('MATCHING_PESO_SKILLS', 0.75))
+MATCHING_PESO_SOFT_SKILL = float(os.environ.get('MATCHING_PESO_SOFT_SKILL', 0.5))  # peso de uma soft skill na média (hard = 1)
+# Vagas recomendadas no painel do candidato: top-N guardado por candidato (tabela RecomendacoesCandidato),
+# recalculado em segundo plano quando o perfil ou o conjunto de vagas abertas muda
+MATCHING_RECOMENDACOES_TOP_N = int(os.environ.get('MATCHING_RECOMENDACOES_TOP_N', 100))
+
 # API KEYs (Lê do Railway)
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
 
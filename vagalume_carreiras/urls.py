@@ -11,6 +11,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('contas/', include('apps.usuarios.urls')),
     path('', include('apps.vagas.urls')),
+    path('matching/', include('apps.matching.urls')),
 
     # Rota direta para o template estático
     path('sobre-nos/', TemplateView.as_view(template_name='sobre_nos.html'), name='sobre_nos'),
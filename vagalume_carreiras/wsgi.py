@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vagalume_carreiras.settings')
 
 application = get_wsgi_application()
+
+# Pré-carregamento opcional do modelo de IA (ver gunicorn.conf.py).
+# Sem isso o modelo é carregado sob demanda, na primeira codificação de cada worker.
+from django.conf import settings
+
+if settings.MATCHING_PRELOAD_MODELO:
+    from apps.matching.engine import preload_modelo
+    preload_modelo()